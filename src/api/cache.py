@@ -0,0 +1,155 @@
+# api/cache.py
+from __future__ import annotations
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+
+from src.backtester.data.loaders.cached_csv_loader import file_fingerprint
+
+
+class ContentFingerprints:
+    """sha256 of source files, recomputed only when size or mtime change."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._known: Dict[str, Tuple[int, int, str]] = {}
+
+    def get(self, path: str) -> str:
+        real = os.path.realpath(path)
+        st = os.stat(real)
+        with self._lock:
+            known = self._known.get(real)
+        if known and known[:2] == (st.st_size, st.st_mtime_ns):
+            return known[2]
+        sha = file_fingerprint(real, hash_contents=True)["sha256"]
+        with self._lock:
+            self._known[real] = (st.st_size, st.st_mtime_ns, sha)
+        return sha
+
+
+def cache_key(spec: Dict[str, Any], data_fingerprint: str) -> str:
+    normalized = dict(spec)
+    normalized["csv_path"] = os.path.realpath(spec["csv_path"])
+    normalized["initial_cash"] = float(spec["initial_cash"])
+    payload = orjson.dumps(normalized, option=orjson.OPT_SORT_KEYS) + data_fingerprint.encode()
+    return hashlib.sha256(payload).hexdigest()
+
+
+class ResultCache:
+    """Bounded cache of serialized results: in-memory LRU + optional on-disk tier.
+
+    Both tiers evict by total byte size (least recently used first).
+    A memory miss that hits disk promotes the entry back to memory.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 2**20,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 2 * 2**30,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._mem: "OrderedDict[str, bytes]" = OrderedDict()
+        self._mem_bytes = 0
+        self.counters = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._mem.get(key)
+            if value is not None:
+                self._mem.move_to_end(key)
+                self.counters["hits"] += 1
+                self.counters["memory_hits"] += 1
+                return value
+        value = self._disk_get(key)
+        with self._lock:
+            if value is None:
+                self.counters["misses"] += 1
+                return None
+            self.counters["hits"] += 1
+            self.counters["disk_hits"] += 1
+            self._mem_put(key, value)
+        return value
+
+    def put(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._mem_put(key, value)
+        self._disk_put(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            self._mem_bytes = 0
+        if self.disk_dir:
+            for f in self.disk_dir.glob("*.json"):
+                f.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self.counters)
+            out.update(memory_entries=len(self._mem), memory_bytes=self._mem_bytes, memory_max_bytes=self.max_bytes)
+        if self.disk_dir:
+            files = list(self.disk_dir.glob("*.json"))
+            out.update(
+                disk_entries=len(files),
+                disk_bytes=sum(f.stat().st_size for f in files),
+                disk_max_bytes=self.disk_max_bytes,
+            )
+        return out
+
+    # ---- memory tier (caller holds the lock)
+    def _mem_put(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._mem_bytes -= len(old)
+        self._mem[key] = value
+        self._mem_bytes += len(value)
+        while self._mem_bytes > self.max_bytes:
+            _, evicted = self._mem.popitem(last=False)
+            self._mem_bytes -= len(evicted)
+            self.counters["evictions"] += 1
+
+    # ---- disk tier
+    def _disk_get(self, key: str) -> Optional[bytes]:
+        if not self.disk_dir:
+            return None
+        path = self.disk_dir / f"{key}.json"
+        try:
+            value = path.read_bytes()
+            os.utime(path)  # mtime = last use, drives disk LRU
+        except OSError:
+            return None
+        return value
+
+    def _disk_put(self, key: str, value: bytes) -> None:
+        if not self.disk_dir or len(value) > self.disk_max_bytes:
+            return
+        with self._disk_lock:
+            tmp = self.disk_dir / f"{key}.tmp"
+            tmp.write_bytes(value)
+            os.replace(tmp, self.disk_dir / f"{key}.json")
+            entries = sorted(
+                ((st.st_mtime_ns, st.st_size, f) for f in self.disk_dir.glob("*.json") for st in [f.stat()]),
+                key=lambda e: e[0],
+            )
+            total = sum(size for _, size, _ in entries)
+            for _, size, f in entries:
+                if total <= self.disk_max_bytes:
+                    break
+                total -= size
+                f.unlink(missing_ok=True)
+                with self._lock:
+                    self.counters["evictions"] += 1
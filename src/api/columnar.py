@@ -0,0 +1,271 @@
+# api/columnar.py
+from __future__ import annotations
+import importlib
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+import orjson
+import pandas as pd
+
+from src.backtester.analytics.downsample import downsample
+from src.backtester.core.engine import BacktestEngine
+from src.backtester.core.events import MarketEvent, SignalEvent, OrderEvent, FillEvent
+from src.backtester.portfolio.portfolio import SimplePortfolio
+
+FORMATS = {
+    "frames": "application/json",
+    "columnar": "application/json",
+    "msgpack": "application/msgpack",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+# ---------- per-bar frames (no app state: also used by bench.suite)
+def to_iso(ts) -> str:
+    if isinstance(ts, pd.Timestamp):
+        ts = ts.to_pydatetime()
+    if isinstance(ts, datetime):
+        return ts.isoformat()
+    return str(ts)
+
+def serialize_market_events(events: List[MarketEvent]) -> List[Dict[str, Any]]:
+    return [{"symbol": e.symbol, "timestamp": to_iso(e.timestamp), "data": e.data} for e in events]
+
+def serialize_signals(signals: List[SignalEvent]) -> List[Dict[str, Any]]:
+    out = []
+    for s in signals:
+        d = asdict(s)
+        d["timestamp"] = to_iso(s.timestamp)
+        out.append(d)
+    return out
+
+def serialize_orders(orders: List[OrderEvent]) -> List[Dict[str, Any]]:
+    out = []
+    for o in orders:
+        d = asdict(o)
+        d["timestamp"] = to_iso(o.timestamp)
+        out.append(d)
+    return out
+
+def serialize_fills(fills: List[FillEvent]) -> List[Dict[str, Any]]:
+    out = []
+    for f in fills:
+        d = asdict(f)
+        d["timestamp"] = to_iso(f.timestamp)
+        out.append(d)
+    return out
+
+def snapshot_portfolio(ts: datetime, p: SimplePortfolio) -> Dict[str, Any]:
+    return {
+        "timestamp": to_iso(ts),
+        "cash": p.cash,
+        "net_liquidation_value": p.net_liquidation_value,
+        "total_value": p.cash + p.net_liquidation_value,
+        "positions": [
+            {
+                "symbol": sym,
+                "qty": pos.qty,
+                "avg_price": pos.avg_price,
+                "current_value": pos.current_value,
+            }
+            for sym, pos in p.positions.items()
+        ],
+    }
+
+def iter_frames(engine: BacktestEngine) -> Iterator[Dict[str, Any]]:
+    """Yields one frame per engine step, as soon as the step is done."""
+    iterator = engine.clock if engine.clock else iter(int, 1)
+    for i, _ in enumerate(iterator):
+        if engine.step() is None:
+            break
+        market_events, signals, orders, fills = engine.last_bar
+
+        ts = market_events[0].timestamp
+        yield {
+            "idx": i,
+            "t": to_iso(ts),
+            "market_events": serialize_market_events(market_events),
+            "signals": serialize_signals(signals),
+            "orders": serialize_orders(orders),
+            "fills": serialize_fills(fills),
+            "portfolio": snapshot_portfolio(ts, engine.portfolio),
+        }
+
+
+# ---------- columnar
+def _epoch_ms(ts) -> int:
+    return pd.Timestamp(ts).value // 1_000_000
+
+
+def _sparse(names: Tuple[str, ...]) -> Dict[str, List[Any]]:
+    return {name: [] for name in ("idx",) + names}
+
+
+def collect_columnar(engine: BacktestEngine) -> Dict[str, Any]:
+    """Runs the engine and returns the replay as parallel arrays.
+
+    - bars: one entry per bar (t in epoch ms, cash, nlv, close per symbol with None when missing)
+    - signals / orders / fills: struct-of-arrays, `idx` points into the bar arrays
+    - positions: only the (idx, symbol) pairs whose qty or avg_price changed
+    """
+    t: List[int] = []
+    cash: List[float] = []
+    nlv: List[float] = []
+    prices: Dict[str, List[Any]] = {}
+    signals = _sparse(("symbol", "direction", "qty"))
+    orders = _sparse(("symbol", "direction", "qty", "order_type", "limit_price"))
+    fills = _sparse(("symbol", "direction", "fill_price", "qty", "commission", "slippage"))
+    positions = _sparse(("symbol", "qty", "avg_price"))
+    last_pos: Dict[str, Tuple[float, float]] = {}
+
+    iterator = engine.clock if engine.clock else iter(int, 1)
+    for i, _ in enumerate(iterator):
+        if engine.step() is None:
+            break
+        market_events, sigs, ords, fls = engine.last_bar
+
+        t.append(_epoch_ms(market_events[0].timestamp))
+        cash.append(engine.portfolio.cash)
+        nlv.append(engine.portfolio.net_liquidation_value)
+        for e in market_events:
+            column = prices.get(e.symbol)
+            if column is None:
+                column = prices[e.symbol] = [None] * i
+            column.append(e.data.get("close"))
+        for column in prices.values():
+            if len(column) == i:
+                column.append(None)
+
+        for table, events in ((signals, sigs), (orders, ords), (fills, fls)):
+            for ev in events:
+                table["idx"].append(i)
+                for name in table:
+                    if name != "idx":
+                        table[name].append(getattr(ev, name))
+
+        for sym, pos in engine.portfolio.positions.items():
+            state = (pos.qty, pos.avg_price)
+            if last_pos.get(sym) != state:
+                last_pos[sym] = state
+                positions["idx"].append(i)
+                positions["symbol"].append(sym)
+                positions["qty"].append(pos.qty)
+                positions["avg_price"].append(pos.avg_price)
+
+    return {
+        "bars": {"t": t, "cash": cash, "net_liquidation_value": nlv, "close": prices},
+        "signals": signals,
+        "orders": orders,
+        "fills": fills,
+        "positions": positions,
+        "time_unit": "ms",
+    }
+
+
+def to_ns(ts: str | None) -> int | None:
+    return None if ts is None else pd.Timestamp(ts).value
+
+
+def select_rows(table: Dict[str, Any], idx: np.ndarray) -> Dict[str, List[Any]]:
+    """Rows of a sparse table whose bar is in `idx` (sorted), with `idx` remapped to positions in it."""
+    rows = np.asarray(table["idx"], dtype=np.int64)
+    pos = np.searchsorted(idx, rows)
+    hit = np.flatnonzero((pos < len(idx)) & (idx[np.minimum(pos, len(idx) - 1)] == rows)) if len(idx) else rows[:0]
+    out = {name: np.asarray(values)[hit].tolist() for name, values in table.items() if name != "idx"}
+    out["idx"] = pos[hit].tolist()
+    return out
+
+
+def _float_array(values: List[Any]) -> np.ndarray:
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+
+def downsample_columnar(
+    replay: Dict[str, Any], points: int | None, start: str | None = None, end: str | None = None, method: str = "lttb"
+) -> Dict[str, Any]:
+    """Columnar replay reduced to about `points` bars (None: all) in [start, end] (close of each symbol and equity
+    keep their shape, bars with a signal or a fill are always kept). `bars.bar_index` holds the
+    original bar numbers; sparse tables point into the reduced arrays."""
+    bars = replay["bars"]
+    t = np.asarray(bars["t"], dtype=np.int64) * 1_000_000
+    series = {f"close:{sym}": _float_array(values) for sym, values in bars["close"].items()}
+    series["equity"] = np.asarray(bars["cash"], dtype=float) + np.asarray(bars["net_liquidation_value"], dtype=float)
+    keep = np.concatenate([np.asarray(replay[k]["idx"], dtype=np.int64) for k in ("signals", "fills")])
+    idx = downsample(t, series, points, to_ns(start), to_ns(end), keep, method)
+    out = {k: select_rows(replay[k], idx) for k in ("signals", "orders", "fills", "positions")}
+    out["bars"] = {
+        "t": np.asarray(bars["t"])[idx].tolist(),
+        "bar_index": idx.tolist(),
+        "cash": np.asarray(bars["cash"])[idx].tolist(),
+        "net_liquidation_value": np.asarray(bars["net_liquidation_value"])[idx].tolist(),
+        "close": {sym: [values[i] for i in idx] for sym, values in bars["close"].items()},
+    }
+    out["time_unit"] = replay["time_unit"]
+    return out
+
+
+def downsample_frames(
+    frames: List[Dict[str, Any]], points: int | None, start: str | None = None, end: str | None = None, method: str = "lttb"
+) -> List[Dict[str, Any]]:
+    """Same selection as downsample_columnar on per-bar frames (each frame keeps its original `idx`)."""
+    if not frames:
+        return frames
+    t = pd.to_datetime([f["t"] for f in frames]).as_unit("ns").asi8
+    series = {
+        "close": np.array([f["market_events"][0]["data"].get("close", np.nan) for f in frames], dtype=float),
+        "equity": np.array([f["portfolio"]["total_value"] for f in frames], dtype=float),
+    }
+    keep = np.array([i for i, f in enumerate(frames) if f["signals"] or f["fills"]], dtype=np.int64)
+    return [frames[i] for i in downsample(t, series, points, to_ns(start), to_ns(end), keep, method)]
+
+
+class MissingDependency(RuntimeError):
+    """The optional package behind a format (msgpack, pyarrow) is not installed."""
+
+
+_OPTIONAL = {"msgpack": "msgpack", "arrow": "pyarrow"}
+
+
+def require(fmt: str):
+    """Imports the optional package needed by `fmt` (None if it needs none); MissingDependency otherwise."""
+    package = _OPTIONAL.get(fmt)
+    if package is None:
+        return None
+    try:
+        return importlib.import_module(package)
+    except ImportError:
+        raise MissingDependency(f"format={fmt} requires the '{package}' package") from None
+
+
+def encode(payload: Dict[str, Any], fmt: str) -> bytes:
+    """Encodes a {"spec", "replay", ...} payload in one of FORMATS (except "frames")."""
+    if fmt == "columnar":
+        return orjson.dumps(payload)
+    if fmt == "msgpack":
+        return require(fmt).packb(payload, use_bin_type=True)
+    if fmt == "arrow":
+        return _encode_arrow(payload)
+    raise ValueError(f"Unknown format '{fmt}'")
+
+
+def _encode_arrow(payload: Dict[str, Any]) -> bytes:
+    """Bars as an Arrow IPC stream; the sparse tables travel in the schema metadata (JSON)."""
+    pa = require("arrow")
+    replay = payload["replay"]
+    bars = replay["bars"]
+    columns = {
+        "t": pa.array(bars["t"], pa.timestamp("ms")),
+        "cash": pa.array(bars["cash"], pa.float64()),
+        "net_liquidation_value": pa.array(bars["net_liquidation_value"], pa.float64()),
+    }
+    for sym, values in bars["close"].items():
+        columns[f"close:{sym}"] = pa.array(values, pa.float64())
+    rest = {k: v for k, v in payload.items() if k != "replay"}
+    rest["replay"] = {k: v for k, v in replay.items() if k != "bars"}
+    table = pa.table(columns).replace_schema_metadata({"replay": orjson.dumps(rest)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
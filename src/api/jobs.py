@@ -0,0 +1,338 @@
+# api/jobs.py
+from __future__ import annotations
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Union
+
+from src.backtester.io.logger import RunLogger
+from src.backtester.io.persistence import RunStore
+
+TERMINAL = ("done", "failed", "cancelled", "timeout")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobTimeout(Exception):
+    pass
+
+
+class QueueFull(Exception):
+    pass
+
+
+@dataclass
+class Job:
+    id: str
+    spec: Dict[str, Any]
+    timeout: Optional[float]
+    submitted: float = field(default_factory=time.time)
+    future: Optional[Future] = None
+    state: str = "queued"
+    finished: Optional[float] = None
+    run_id: Optional[str] = None
+    error: Optional[str] = None
+    data_fingerprint: Optional[str] = None
+
+
+def _run_job(
+    job_id: str,
+    spec: Dict[str, Any],
+    timeout: Optional[float],
+    store_root: str,
+    data_fingerprint: Optional[str],
+    shared: Any,
+    progress_every: int,
+) -> str:
+    """Worker side: runs the backtest, reports progress through `shared`, stores the result.
+
+    `shared` is a Manager dict: shared[job_id] holds progress, shared["cancel:" + job_id] the cancel flag.
+    Cancellation and timeout are checked before and after building the engine and every
+    `progress_every` bars; the parent enforces the same deadline by terminating the process.
+    """
+    from src.backtester.config.specs import build_engine   # lazy: keeps the worker's startup light
+
+    started = time.time()
+    deadline = started + timeout if timeout else None
+
+    def check(done: int) -> None:
+        if shared.get("cancel:" + job_id):
+            raise JobCancelled()
+        if deadline is not None and time.time() > deadline:
+            raise JobTimeout(f"timed out after {timeout}s ({done} bars)")
+
+    check(0)
+    shared[job_id] = {"state": "running", "started": started, "done": 0, "total": None}
+    engine = build_engine(
+        spec["symbol"], spec["strategy"], spec["loader"], spec["handler"], spec["initial_cash"], spec["csv_path"]
+    )
+    check(0)
+    frame = getattr(engine.data, "_df", None)
+    total = len(frame) if frame is not None else None
+    shared[job_id] = {"state": "running", "started": started, "done": 0, "total": total}
+
+    logger = RunLogger()
+    done = 0
+    while engine.step() is not None:
+        logger.log(engine)
+        done += 1
+        if done % progress_every == 0:
+            shared[job_id] = {"state": "running", "started": started, "done": done, "total": total}
+            check(done)
+    logger.seconds = time.time() - started
+    shared[job_id] = {"state": "running", "started": started, "done": done, "total": done}
+    return RunStore(store_root).save(
+        logger.arrays(), spec, data_fingerprint=data_fingerprint, timings={"run_seconds": logger.seconds}
+    )
+
+
+def _job_process(job_id: str, *args: Any) -> None:
+    """Entry point of a job's process (same arguments as _run_job): the outcome goes to
+    shared["result:" + job_id], read by the parent's watchdog once the process has exited."""
+    shared = args[4]
+    try:
+        outcome = ("done", _run_job(job_id, *args))
+    except JobCancelled:
+        outcome = ("cancelled", None)
+    except JobTimeout as exc:
+        outcome = ("timeout", str(exc))
+    except BaseException as exc:
+        outcome = ("failed", f"{type(exc).__name__}: {exc}")
+    shared["result:" + job_id] = outcome
+
+
+@dataclass
+class _Running:
+    process: Any
+    deadline: Optional[float]
+    cancel_requested: Optional[float] = None
+
+
+class JobManager:
+    """Backtest jobs, each in its own process (at most `max_workers` at once).
+
+    - at most `max_queue` jobs wait beyond the running ones; submit raises QueueFull past that
+    - progress, cancel flags and outcomes go through a Manager dict (started lazily on first submit)
+    - queued jobs are cancelled right away; running ones stop at their next progress check, and a
+      watchdog thread terminates the process if it has not stopped `grace` seconds later
+    - the timeout is enforced from the parent as well: a job still running `grace` seconds after its
+      deadline (slow CSV load, strategy stuck inside a bar) is terminated and marked "timeout"
+    - results are persisted in the RunStore; a job's result is its run_id
+    - workers and the Manager use the "spawn" start method: forking a server process with live
+      threads (uvicorn's threadpool, the watchdog) risks inheriting locks held mid-operation
+    """
+
+    def __init__(
+        self,
+        store: Union[RunStore, str, Path],
+        max_workers: int = 2,
+        max_queue: int = 16,
+        default_timeout: Optional[float] = 600.0,
+        progress_every: int = 100,
+        max_history: int = 1000,
+        grace: float = 2.0,
+        poll: float = 0.1,
+    ) -> None:
+        # only the path is kept: each worker opens its own RunStore
+        self.store_root = str(store.root if isinstance(store, RunStore) else store)
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.default_timeout = default_timeout
+        self.progress_every = progress_every
+        self.max_history = max_history
+        self.grace = grace
+        self.poll = poll
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._queue: Deque[Job] = deque()
+        self._running: Dict[str, _Running] = {}
+        self._manager = None
+        self._shared = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._context = multiprocessing.get_context("spawn")
+
+    def _ensure_started(self) -> None:
+        if self._manager is None:
+            self._manager = self._context.Manager()
+            self._shared = self._manager.dict()
+            self._stop.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="job-watchdog", daemon=True)
+            self._watchdog.start()
+
+    def _pending(self) -> int:
+        return sum(1 for j in self._jobs.values() if j.state not in TERMINAL)
+
+    def submit(self, spec: Dict[str, Any], timeout: Optional[float] = None, data_fingerprint: Optional[str] = None) -> Job:
+        with self._lock:
+            if self._pending() >= self.max_workers + self.max_queue:
+                raise QueueFull(f"{self._pending()} jobs pending")
+            self._ensure_started()
+            dropped = self._prune()
+            job = Job(uuid.uuid4().hex, spec, timeout if timeout is not None else self.default_timeout)
+            job.future = Future()
+            job.data_fingerprint = data_fingerprint
+            self._jobs[job.id] = job
+            self._queue.append(job)
+            self._dispatch()
+        for job_id in dropped:
+            self._shared.pop(job_id, None)
+        return job
+
+    # ---------- scheduling (called with the lock held)
+    def _dispatch(self) -> None:
+        while self._queue and len(self._running) < self.max_workers:
+            job = self._queue.popleft()
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            process = self._context.Process(
+                target=_job_process,
+                args=(job.id, job.spec, job.timeout, self.store_root, job.data_fingerprint, self._shared,
+                      self.progress_every),
+                daemon=True,
+            )
+            process.start()
+            job.state = "running"
+            self._running[job.id] = _Running(process, time.time() + job.timeout if job.timeout else None)
+
+    def _watch(self) -> None:
+        # the lock only guards the bookkeeping: terminating a process and Manager IPC happen outside
+        while not self._stop.wait(self.poll):
+            with self._lock:
+                running = [(job_id, run, self._jobs[job_id].timeout) for job_id, run in self._running.items()]
+            outcomes = [o for o in (self._check(*r) for r in running) if o is not None]
+            with self._lock:
+                for job_id, state, detail in outcomes:
+                    self._finish(job_id, state, detail)
+                self._dispatch()
+
+    def _check(self, job_id: str, run: _Running, timeout: Optional[float]) -> Optional[tuple]:
+        """Outcome of a running job if it is over (exited, or terminated here), else None."""
+        now = time.time()
+        if not run.process.is_alive():
+            run.process.join()
+            state, detail = self._shared.pop("result:" + job_id, ("failed", None))
+            if state == "failed" and detail is None:
+                detail = f"worker exited with code {run.process.exitcode}"
+        elif run.deadline is not None and now > run.deadline + self.grace:
+            self._kill(run)
+            state, detail = "timeout", f"terminated after {timeout}s"
+        elif run.cancel_requested is not None and now > run.cancel_requested + self.grace:
+            self._kill(run)
+            state, detail = "cancelled", None
+        else:
+            return None
+        self._shared.pop("result:" + job_id, None)
+        self._shared.pop("cancel:" + job_id, None)
+        return job_id, state, detail
+
+    @staticmethod
+    def _kill(run: _Running) -> None:
+        run.process.terminate()
+        run.process.join(1.0)
+        if run.process.is_alive():
+            run.process.kill()
+            run.process.join()
+
+    def _finish(self, job_id: str, state: str, detail: Optional[str]) -> None:
+        self._running.pop(job_id, None)
+        job = self._jobs[job_id]
+        job.finished = time.time()
+        job.state = state
+        if state == "done":
+            job.run_id = detail
+            job.future.set_result(detail)
+        else:
+            job.error = detail
+            job.future.set_exception(
+                JobCancelled() if state == "cancelled" else JobTimeout(detail) if state == "timeout"
+                else RuntimeError(detail)
+            )
+
+    def _prune(self) -> List[str]:
+        """Drops the oldest finished jobs beyond max_history; returns their ids (progress to forget)."""
+        done = [j for j in self._jobs.values() if j.state in TERMINAL]
+        dropped = [j.id for j in sorted(done, key=lambda j: j.finished or 0)[: max(0, len(self._jobs) - self.max_history)]]
+        for job_id in dropped:
+            del self._jobs[job_id]
+        return dropped
+
+    def get(self, job_id: str) -> Job:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return job
+
+    def status(self, job_id: str) -> Dict[str, Any]:
+        job = self.get(job_id)
+        progress = self._shared.get(job.id) if self._shared is not None else None
+        state = job.state
+        out: Dict[str, Any] = {
+            "id": job.id,
+            "state": state,
+            "spec": job.spec,
+            "submitted": job.submitted,
+            "finished": job.finished,
+            "timeout": job.timeout,
+            "run_id": job.run_id,
+            "error": job.error,
+            "done": None,
+            "total": None,
+            "progress": None,
+        }
+        if progress:
+            out["started"] = progress["started"]
+            out["done"], out["total"] = progress["done"], progress["total"]
+            if progress["total"]:
+                out["progress"] = progress["done"] / progress["total"]
+        if state == "done":
+            out["progress"] = 1.0
+        return out
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            ids = list(self._jobs)
+        return [self.status(i) for i in ids]
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        job = self.get(job_id)
+        running = False
+        with self._lock:
+            if job.state == "queued":
+                self._queue.remove(job)
+                job.future.cancel()
+                job.state, job.finished = "cancelled", time.time()
+            elif job.id in self._running:
+                run = self._running[job.id]
+                run.cancel_requested = run.cancel_requested or time.time()
+                running = True
+        if running:
+            self._shared["cancel:" + job.id] = True    # cooperative stop; the watchdog enforces it
+        return self.status(job_id)
+
+    def shutdown(self) -> None:
+        if self._manager is None:
+            return
+        self._stop.set()
+        self._watchdog.join()
+        with self._lock:
+            for job in list(self._queue):
+                job.future.cancel()
+                job.state, job.finished = "cancelled", time.time()
+            self._queue.clear()
+            running = list(self._running.items())
+        for _, run in running:
+            self._kill(run)
+        with self._lock:
+            for job_id, _ in running:
+                self._finish(job_id, "cancelled", None)
+        self._manager.shutdown()
+        self._manager = self._shared = self._watchdog = None
@@ -1,96 +1,30 @@
 # api/main.py
 from __future__ import annotations
-from typing import Any, Dict, List, Callable
-from datetime import datetime
-from dataclasses import asdict
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List
+import os
 
-import pandas as pd
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import ORJSONResponse
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+import orjson
 import uvicorn
 
-# ---- your backtester bits
-from src.backtester.core.engine import BacktestEngine, EngineConfig
-from src.backtester.core.clock import TradingClock
-from src.backtester.core.events import MarketEvent, SignalEvent, OrderEvent, FillEvent
-from src.backtester.data.loaders.csv_loader import CSVLoader
-from src.backtester.data.csv_handler import (
-    PERatioSingleCSVDataHandler,
-    MultipleAssetsSingleSymbolCSVHandler,
+from src.api.cache import ContentFingerprints, ResultCache, cache_key
+from src.api.columnar import (
+    FORMATS, MissingDependency, collect_columnar, downsample_columnar, downsample_frames, encode, iter_frames,
+    require, select_rows, to_ns,
 )
-from src.backtester.strategy.pe_ratio_strategy import PERatioStrategy, PEParams
-from src.backtester.portfolio.portfolio import SimplePortfolio
-from src.backtester.execution.broker_sim import SimulatedBroker
-
-# ---------- tiny helpers ----------
-def to_iso(ts) -> str:
-    if isinstance(ts, pd.Timestamp):
-        ts = ts.to_pydatetime()
-    if isinstance(ts, datetime):
-        return ts.isoformat()
-    return str(ts)
-
-def serialize_market_events(events: List[MarketEvent]) -> List[Dict[str, Any]]:
-    return [{"symbol": e.symbol, "timestamp": to_iso(e.timestamp), "data": e.data} for e in events]
-
-def serialize_signals(signals: List[SignalEvent]) -> List[Dict[str, Any]]:
-    out = []
-    for s in signals:
-        d = asdict(s)
-        d["timestamp"] = to_iso(s.timestamp)
-        out.append(d)
-    return out
-
-def serialize_orders(orders: List[OrderEvent]) -> List[Dict[str, Any]]:
-    out = []
-    for o in orders:
-        d = asdict(o)
-        d["timestamp"] = to_iso(o.timestamp)
-        out.append(d)
-    return out
-
-def serialize_fills(fills: List[FillEvent]) -> List[Dict[str, Any]]:
-    out = []
-    for f in fills:
-        d = asdict(f)
-        d["timestamp"] = to_iso(f.timestamp)
-        out.append(d)
-    return out
-
-def snapshot_portfolio(ts: datetime, p: SimplePortfolio) -> Dict[str, Any]:
-    return {
-        "timestamp": to_iso(ts),
-        "cash": p.cash,
-        "net_liquidation_value": p.net_liquidation_value,
-        "total_value": p.cash + p.net_liquidation_value,
-        "positions": [
-            {
-                "symbol": sym,
-                "qty": pos.qty,
-                "avg_price": pos.avg_price,
-                "current_value": pos.current_value,
-            }
-            for sym, pos in p.positions.items()
-        ],
-    }
-
-# ---------- factories (whitelist for safety) ----------
-STRATEGIES: Dict[str, Callable[[float], Any]] = {
-    "PERatioStrategy": lambda initial_cash: PERatioStrategy(PEParams(), initial_cash),
-}
+from src.api.jobs import JobManager, QueueFull
 
-LOADERS: Dict[str, Callable[..., Any]] = {
-    # For now only CSV
-    "CSVLoader": lambda csv_path, **_: CSVLoader(csv_path),
-}
-
-HANDLERS: Dict[str, Callable[..., Any]] = {
-    # Handler needs (loader, symbol)
-    "PERatioSingleCSVDataHandler": lambda loader, symbol, **_: PERatioSingleCSVDataHandler(loader, symbol),
-    "MultipleAssetsSingleSymbolCSVHandler": lambda loader, symbol, **_: MultipleAssetsSingleSymbolCSVHandler(loader, symbol),
-}
+# ---- your backtester bits
+from src.backtester.core.engine import BacktestEngine
+from src.backtester.io.persistence import RunStore
+from src.backtester.config.specs import STRATEGIES, LOADERS, HANDLERS, spec_dict
+from src.backtester.config.specs import build_engine as _build_engine
 
+# ---------- factories (whitelist for safety) ----------
+# Registries live in src.backtester.config.specs (shared with jobs and the CLI, no FastAPI import there).
 def build_engine(
     symbol: str,
     strategy_name: str,
@@ -98,48 +32,51 @@ def build_engine(
     handler_name: str,
     initial_cash: float,
     csv_path: str,
+    profile: bool = False,
 ) -> BacktestEngine:
-    if strategy_name not in STRATEGIES:
-        raise HTTPException(400, f"Unknown strategy '{strategy_name}'")
-    if loader_name not in LOADERS:
-        raise HTTPException(400, f"Unknown loader '{loader_name}'")
-    if handler_name not in HANDLERS:
-        raise HTTPException(400, f"Unknown handler '{handler_name}'")
-
-    loader = LOADERS[loader_name](csv_path=csv_path)
-    data = HANDLERS[handler_name](loader=loader, symbol=symbol)
-    clock = TradingClock(data._df.index)  # drive by CSV index
-    strategy = STRATEGIES[strategy_name](initial_cash)
-    broker = SimulatedBroker(commission_per_trade=0.0, slippage_bp=0.0)
-    portfolio = SimplePortfolio(cash=initial_cash)
-    return BacktestEngine(data, strategy, portfolio, broker, clock, EngineConfig(verbose=False))
+    try:
+        return _build_engine(symbol, strategy_name, loader_name, handler_name, initial_cash, csv_path, profile)
+    except ValueError as exc:
+        raise HTTPException(400, str(exc)) from exc
 
 def run_and_collect(engine: BacktestEngine) -> List[Dict[str, Any]]:
-    frames: List[Dict[str, Any]] = []
-    iterator = engine.clock if engine.clock else iter(int, 1)
-    for i, _ in enumerate(iterator):
-        if not engine.data.has_next():
-            break
-        market_events: List[MarketEvent] = engine.data.get_next()
-        signals: List[SignalEvent] = engine.strategy.on_market_event(market_events)
-        orders: List[OrderEvent] = engine.portfolio.generate_orders(signals, market_events)
-        fills: List[FillEvent] = engine.broker.execute(orders, market_events)
-        engine.portfolio.update_on_fill(fills, market_events)
-
-        ts = market_events[0].timestamp
-        frames.append({
-            "idx": i,
-            "t": to_iso(ts),
-            "market_events": serialize_market_events(market_events),
-            "signals": serialize_signals(signals),
-            "orders": serialize_orders(orders),
-            "fills": serialize_fills(fills),
-            "portfolio": snapshot_portfolio(ts, engine.portfolio),
-        })
-    return frames
+    return list(iter_frames(engine))
+
+def ndjson_lines(spec: Dict[str, Any], frames: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    yield orjson.dumps({"spec": spec}) + b"\n"
+    for frame in frames:
+        yield orjson.dumps(frame) + b"\n"
+    yield orjson.dumps({"final": True}) + b"\n"
+
+def sse_events(spec: Dict[str, Any], frames: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    yield b"event: spec\ndata: " + orjson.dumps(spec) + b"\n\n"
+    for frame in frames:
+        yield b"event: frame\nid: " + str(frame["idx"]).encode() + b"\ndata: " + orjson.dumps(frame) + b"\n\n"
+    yield b"event: end\ndata: {}\n\n"
 
 # ---------- FastAPI app ----------
 app = FastAPI(default_response_class=ORJSONResponse)
+
+RESULT_CACHE = ResultCache(
+    max_bytes=int(os.environ.get("BACKTESTER_CACHE_MB", "256")) * 2**20,
+    disk_dir=os.environ.get("BACKTESTER_CACHE_DIR") or None,
+    disk_max_bytes=int(os.environ.get("BACKTESTER_CACHE_DISK_MB", "2048")) * 2**20,
+)
+FINGERPRINTS = ContentFingerprints()
+RUNS_DIR = os.environ.get("BACKTESTER_RUNS_DIR", "runs")
+
+@lru_cache(maxsize=None)
+def run_store() -> RunStore:
+    # opened on first use, not at import: importing the app must not create directories in the CWD
+    return RunStore(RUNS_DIR)
+
+JOBS = JobManager(
+    RUNS_DIR,
+    max_workers=int(os.environ.get("BACKTESTER_JOB_WORKERS", "2")),
+    max_queue=int(os.environ.get("BACKTESTER_JOB_QUEUE", "16")),
+    default_timeout=float(os.environ.get("BACKTESTER_JOB_TIMEOUT", "600")),
+)
+app.router.on_shutdown.append(JOBS.shutdown)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # tighten for prod
@@ -156,25 +93,242 @@ def replay_all(
     handler: str = Query("PERatioSingleCSVDataHandler"),
     initial_cash: float = Query(100_000.0),
     csv_path: str = Query("src/backtester/data/csv/pe_ratio_full_sp500.csv"),
+    use_cache: bool = Query(True, alias="cache"),
+    format: str = Query("frames", pattern="^(frames|columnar|msgpack|arrow)$"),
+    profile: bool = Query(False),
+    points: int | None = Query(None, ge=3, description="Target number of bars (downsampled)"),
+    start: str | None = Query(None, description="Window start (ISO date)"),
+    end: str | None = Query(None, description="Window end (ISO date)"),
+    method: str = Query("lttb", pattern="^(lttb|minmax)$"),
 ):
     """
     Example:
       GET /replay-all?symbol=SP500&strategy=PERatioStrategy&loader=CSVLoader&handler=PERatioSingleCSVDataHandler
+    Results are cached by (normalized spec, sha256 of the CSV); pass cache=false to force a rerun.
+    format=frames (default) returns one object per bar; columnar/msgpack/arrow return
+    parallel arrays (see api/columnar.py).
+    profile=true adds per-stage engine timings under "profile" (always a fresh run, not cached).
+    points/start/end: only bars in [start, end], reduced to about `points` with LTTB or min/max
+    buckets on close and equity; bars carrying signals or fills are always kept.
     """
-    engine = build_engine(symbol, strategy, loader, handler, initial_cash, csv_path)
-    frames = run_and_collect(engine)
-    return {
-        "spec": {
-            "symbol": symbol,
-            "strategy": strategy,
-            "loader": loader,
-            "handler": handler,
-            "initial_cash": initial_cash,
-            "csv_path": csv_path,
-        },
-        "frames": frames,
-        "final": True,
+    spec = spec_dict(symbol, strategy, loader, handler, initial_cash, csv_path)
+    media_type = FORMATS[format]
+    try:
+        require(format)                     # before running anything
+    except MissingDependency as exc:
+        raise HTTPException(501, str(exc))
+    view = {"points": points, "start": start, "end": end, "method": method} if points or start or end else {}
+    try:
+        to_ns(start), to_ns(end)
+    except ValueError as exc:
+        raise HTTPException(400, f"Invalid start/end: {exc}")
+    try:
+        key = cache_key({**spec, "format": format, **view}, FINGERPRINTS.get(csv_path))
+    except OSError:
+        raise HTTPException(404, f"CSV not found: '{csv_path}'")
+    if use_cache and not profile:
+        cached = RESULT_CACHE.get(key)
+        if cached is not None:
+            return Response(cached, media_type=media_type, headers={"X-Cache": "hit"})
+
+    engine = build_engine(symbol, strategy, loader, handler, initial_cash, csv_path, profile=profile)
+    if format == "frames":
+        frames = run_and_collect(engine)
+        payload = {"spec": spec, "frames": downsample_frames(frames, **view) if view else frames, "final": True}
+    else:
+        replay = collect_columnar(engine)
+        payload = {"spec": spec, "replay": downsample_columnar(replay, **view) if view else replay, "final": True}
+    if profile:
+        engine.profiler.stop()
+        payload["profile"] = engine.profiler.summary()
+    body = orjson.dumps(payload) if format == "frames" else encode(payload, format)
+    if not profile:
+        RESULT_CACHE.put(key, body)
+    return Response(body, media_type=media_type, headers={"X-Cache": "miss"})
+
+@app.get("/cache/stats")
+def cache_stats():
+    return RESULT_CACHE.stats()
+
+@app.delete("/cache")
+def cache_clear():
+    RESULT_CACHE.clear()
+    return {"cleared": True}
+
+@app.post("/runs")
+def runs_create(
+    symbol: str = Query(...),
+    strategy: str = Query("PERatioStrategy"),
+    loader: str = Query("CSVLoader"),
+    handler: str = Query("PERatioSingleCSVDataHandler"),
+    initial_cash: float = Query(100_000.0),
+    csv_path: str = Query("src/backtester/data/csv/pe_ratio_full_sp500.csv"),
+    profile: bool = Query(False),
+):
+    """Runs a backtest and persists it in the run store; returns its metadata (without arrays)."""
+    spec = spec_dict(symbol, strategy, loader, handler, initial_cash, csv_path)
+    try:
+        fingerprint = FINGERPRINTS.get(csv_path)
+    except OSError:
+        raise HTTPException(404, f"CSV not found: '{csv_path}'")
+    engine = build_engine(symbol, strategy, loader, handler, initial_cash, csv_path, profile=profile)
+    run_id = run_store().record(engine, spec, data_fingerprint=fingerprint)
+    meta = run_store().meta(run_id)
+    meta.pop("columns")
+    return meta
+
+@app.get("/runs")
+def runs_list(
+    sort_by: str = Query("sharpe"),
+    top: int = Query(20, ge=1),
+    ascending: bool = Query(False),
+    symbol: str | None = Query(None),
+    strategy: str | None = Query(None),
+):
+    """Stored runs ranked by a summary metric (reads the index only, no arrays)."""
+    def where(row: Dict[str, Any]) -> bool:
+        spec = row["spec"]
+        return (symbol is None or spec.get("symbol") == symbol) and (strategy is None or spec.get("strategy") == strategy)
+
+    return {"runs": run_store().query(sort_by, top, ascending, where)}
+
+@app.get("/runs/{run_id}")
+def runs_get(
+    run_id: str,
+    tables: str = Query("bars,fills,orders,positions", description="Comma-separated tables to return"),
+):
+    """A stored run as parallel arrays (same layout as the RunLogger tables); t in epoch ns."""
+    try:
+        run = run_store().load(run_id, tables=[t for t in tables.split(",") if t])
+    except KeyError:
+        raise HTTPException(404, f"Unknown run '{run_id}'")
+    meta = dict(run.meta)
+    meta.pop("columns")
+    body = {
+        "meta": meta,
+        "tables": {name: {col: values.tolist() for col, values in cols.items()} for name, cols in run.tables.items()},
+        "time_unit": "ns",
+    }
+    return Response(orjson.dumps(body), media_type="application/json")
+
+@app.get("/runs/{run_id}/lod")
+def runs_lod(
+    run_id: str,
+    points: int = Query(2000, ge=3, description="Target number of bars"),
+    start: str | None = Query(None, description="Window start (ISO date)"),
+    end: str | None = Query(None, description="Window end (ISO date)"),
+    method: str = Query("lttb", pattern="^(lttb|minmax)$"),
+):
+    """Zoom/pan view of a stored run: bars in [start, end] reduced to about `points` from the run's
+    precomputed resolution pyramid (no rerun); bars with signals or fills are always kept.
+    bars.bar_index holds the original bar numbers, signals/fills idx point into the returned bars."""
+    try:
+        run = run_store().load(run_id, tables=["bars", "signals", "fills"])
+        pyramid = run_store().pyramid(run_id)
+    except (KeyError, OSError):
+        raise HTTPException(404, f"Unknown run '{run_id}'")
+    try:
+        t0, t1 = to_ns(start), to_ns(end)
+    except ValueError as exc:
+        raise HTTPException(400, f"Invalid start/end: {exc}")
+    bars = run.tables["bars"]
+    series = {k: bars[k] for k in ("close", "equity") if k in bars}
+    idx = pyramid.query(bars["t"], series, points, t0, t1, run.keep_indices(), method)
+    body = {
+        "run_id": run_id,
+        "n_bars": pyramid.n,
+        "bars": {"bar_index": idx.tolist(), **{col: values[idx].tolist() for col, values in bars.items()}},
+        **{name: select_rows(run.tables[name], idx) for name in ("signals", "fills") if name in run.tables},
+        "time_unit": "ns",
     }
+    return Response(orjson.dumps(body), media_type="application/json")
+
+@app.delete("/runs/{run_id}")
+def runs_delete(run_id: str):
+    try:
+        run_store().meta(run_id)
+    except (KeyError, OSError):
+        raise HTTPException(404, f"Unknown run '{run_id}'")
+    run_store().delete(run_id)
+    return {"deleted": run_id}
+
+@app.post("/jobs", status_code=202)
+def jobs_submit(
+    symbol: str = Query(...),
+    strategy: str = Query("PERatioStrategy"),
+    loader: str = Query("CSVLoader"),
+    handler: str = Query("PERatioSingleCSVDataHandler"),
+    initial_cash: float = Query(100_000.0),
+    csv_path: str = Query("src/backtester/data/csv/pe_ratio_full_sp500.csv"),
+    timeout: float | None = Query(None, gt=0, description="Seconds; defaults to BACKTESTER_JOB_TIMEOUT"),
+):
+    """
+    Queues a backtest on the worker pool and returns at once with its id.
+    Poll GET /jobs/{id} for state/progress, fetch GET /jobs/{id}/result, cancel with DELETE /jobs/{id}.
+    """
+    if strategy not in STRATEGIES or loader not in LOADERS or handler not in HANDLERS:
+        raise HTTPException(400, f"Unknown strategy, loader or handler ({strategy}, {loader}, {handler})")
+    spec = spec_dict(symbol, strategy, loader, handler, initial_cash, csv_path)
+    try:
+        fingerprint = FINGERPRINTS.get(csv_path)
+    except OSError:
+        raise HTTPException(404, f"CSV not found: '{csv_path}'")
+    try:
+        job = JOBS.submit(spec, timeout=timeout, data_fingerprint=fingerprint)
+    except QueueFull as exc:
+        raise HTTPException(429, f"Job queue is full ({exc})")
+    return JOBS.status(job.id)
+
+@app.get("/jobs")
+def jobs_list():
+    return {"jobs": JOBS.list()}
+
+@app.get("/jobs/{job_id}")
+def jobs_status(job_id: str):
+    try:
+        return JOBS.status(job_id)
+    except KeyError:
+        raise HTTPException(404, f"Unknown job '{job_id}'")
+
+@app.get("/jobs/{job_id}/result")
+def jobs_result(job_id: str, tables: str = Query("bars,fills,orders,positions")):
+    """The stored run of a finished job (same body as GET /runs/{run_id}); 409 while not done."""
+    status = jobs_status(job_id)
+    if status["state"] != "done":
+        raise HTTPException(409, f"Job '{job_id}' is {status['state']}")
+    return runs_get(status["run_id"], tables)
+
+@app.delete("/jobs/{job_id}")
+def jobs_cancel(job_id: str):
+    try:
+        return JOBS.cancel(job_id)
+    except KeyError:
+        raise HTTPException(404, f"Unknown job '{job_id}'")
+
+@app.get("/replay-stream")
+def replay_stream(
+    symbol: str = Query(...),
+    strategy: str = Query("PERatioStrategy"),
+    loader: str = Query("CSVLoader"),
+    handler: str = Query("PERatioSingleCSVDataHandler"),
+    initial_cash: float = Query(100_000.0),
+    csv_path: str = Query("src/backtester/data/csv/pe_ratio_full_sp500.csv"),
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+):
+    """
+    Same run as /replay-all, streamed frame by frame (constant server memory).
+      format=ndjson: one JSON object per line: {"spec": ...}, frames..., {"final": true}
+      format=sse:    Server-Sent Events "spec", "frame" (id = idx), "end"
+    """
+    engine = build_engine(symbol, strategy, loader, handler, initial_cash, csv_path)
+    spec = spec_dict(symbol, strategy, loader, handler, initial_cash, csv_path)
+    if format == "sse":
+        return StreamingResponse(
+            sse_events(spec, iter_frames(engine)),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    return StreamingResponse(ndjson_lines(spec, iter_frames(engine)), media_type="application/x-ndjson")
 
 if __name__ == "__main__":
     uvicorn.run("api.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+from dataclasses import dataclass
+
+import numpy as np
+
+METHODS = ("lttb", "minmax")
+
+
+def _ffill(y: np.ndarray) -> np.ndarray:
+    """NaN remplacés par la dernière valeur connue, ceux d'avant la première par la première valeur valide
+    (un 0 écraserait l'échelle, ex. warm-up d'une moyenne mobile); zéros si tout est NaN."""
+    y = np.asarray(y, dtype=float)
+    missing = np.isnan(y)
+    if not missing.any():
+        return y
+    if missing.all():
+        return np.zeros_like(y)
+    first = int(np.argmax(~missing))
+    last = np.where(missing, first, np.arange(len(y)))
+    np.maximum.accumulate(last, out=last)
+    return y[last]
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices de `points` points qui gardent la forme de (x, y).
+
+    Premier et dernier points gardés; pour chaque seau intermédiaire, le point qui forme le plus grand
+    triangle avec le point retenu précédent et le barycentre du seau suivant. Une boucle par seau
+    (vectorisée dans le seau): O(n), à réserver à quelques milliers de seaux.
+    """
+    n = len(y)
+    if points >= n or points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = _ffill(y)
+    edges = np.append((1 + np.arange(points - 1) * (n - 2) / (points - 2)).astype(np.int64), n)
+    # barycentres de tous les seaux (le dernier "seau" est le point final) via sommes cumulées
+    cx, cy = np.concatenate(([0.0], np.cumsum(x))), np.concatenate(([0.0], np.cumsum(y)))
+    size = np.diff(edges)
+    mean_x = (cx[edges[1:]] - cx[edges[:-1]]) / size
+    mean_y = (cy[edges[1:]] - cy[edges[:-1]]) / size
+
+    out = np.empty(points, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - mean_x[i + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (mean_y[i + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def minmax(y: np.ndarray, points: int) -> np.ndarray:
+    """Min et max de chaque seau (points // 2 seaux), plus le premier et le dernier point; vectorisé."""
+    n = len(y)
+    if points >= n:
+        return np.arange(n)
+    y = _ffill(y)
+    starts = np.unique(np.linspace(0, n, max(1, points // 2) + 1).astype(np.int64)[:-1])
+    bucket = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n)))
+    picked = [np.array([0, n - 1])]
+    for extreme in (np.minimum.reduceat(y, starts), np.maximum.reduceat(y, starts)):
+        hits = np.flatnonzero(y == extreme[bucket])
+        picked.append(hits[np.unique(bucket[hits], return_index=True)[1]])   # premier atteint par seau
+    return np.unique(np.concatenate(picked))
+
+
+def window(t: np.ndarray, start: int | None = None, end: int | None = None) -> tuple[int, int]:
+    """Plage [i0, i1) des barres dont t est dans [start, end] (t croissant)."""
+    i0 = 0 if start is None else int(np.searchsorted(t, start, side="left"))
+    i1 = len(t) if end is None else int(np.searchsorted(t, end, side="right"))
+    return i0, max(i0, i1)
+
+
+def downsample(
+    t: np.ndarray,
+    series: dict[str, np.ndarray],
+    points: int | None,
+    start: int | None = None,
+    end: int | None = None,
+    keep: np.ndarray | None = None,
+    method: str = "lttb",
+    candidates: np.ndarray | None = None,
+) -> np.ndarray:
+    """Indices (croissants) des barres à afficher dans la fenêtre [start, end].
+
+    `points` est partagé entre les séries (ex: prix et equity); l'union des points retenus pour
+    chacune est renvoyée (None: toutes les barres de la fenêtre). Les barres de `keep` (signaux, fills) dans la fenêtre sont toujours
+    ajoutées, au-delà de `points` si besoin. `candidates`: indices déjà présélectionnés (une couche
+    de LODPyramid), sinon toutes les barres de la fenêtre.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}' (expected one of {METHODS})")
+    i0, i1 = window(t, start, end)
+    if candidates is None:
+        candidates = np.arange(i0, i1)
+    else:
+        candidates = candidates[np.searchsorted(candidates, i0):np.searchsorted(candidates, i1)]
+    picked = [np.array([i0, i1 - 1] if i1 > i0 else [], dtype=np.int64)]   # bornes de la fenêtre
+    if points is None or len(candidates) <= points:
+        picked.append(candidates)
+    else:
+        budget = max(3, points // max(1, len(series)))
+        for y in series.values():
+            values = np.asarray(y)[candidates]
+            sel = lttb(t[candidates], values, budget) if method == "lttb" else minmax(values, budget)
+            picked.append(candidates[sel])
+    if keep is not None and len(keep):
+        keep = np.asarray(keep, dtype=np.int64)
+        picked.append(keep[(keep >= i0) & (keep < i1)])
+    return np.unique(np.concatenate(picked))
+
+
+@dataclass
+class LODPyramid:
+    """Couches de résolution d'un run: indices de barres (croissants), de la plus grossière à la plus fine.
+
+    Couche k: min/max de chaque série sur ~base_points * factor**k points (calcul vectorisé, fait une
+    fois). Une requête prend la première couche assez dense dans la fenêtre puis la réduit à `points`:
+    le coût dépend de la taille de la fenêtre dans cette couche, pas de la longueur du run.
+    """
+    levels: list[np.ndarray]
+    n: int
+
+    @classmethod
+    def build(cls, series: dict[str, np.ndarray], base_points: int = 1024, factor: int = 4) -> LODPyramid:
+        n = len(next(iter(series.values()))) if series else 0
+        levels = []
+        p = base_points
+        while p < n:
+            levels.append(np.unique(np.concatenate([minmax(y, p // len(series)) for y in series.values()])))
+            p *= factor
+        return cls(levels, n)
+
+    def candidates(self, i0: int, i1: int, points: int) -> np.ndarray | None:
+        """Couche la plus grossière avec au moins `points` points dans [i0, i1); None: barres brutes."""
+        for level in self.levels:
+            a, b = np.searchsorted(level, (i0, i1))
+            if b - a >= points:
+                return level
+        return None
+
+    def query(
+        self,
+        t: np.ndarray,
+        series: dict[str, np.ndarray],
+        points: int,
+        start: int | None = None,
+        end: int | None = None,
+        keep: np.ndarray | None = None,
+        method: str = "lttb",
+    ) -> np.ndarray:
+        i0, i1 = window(t, start, end)
+        level = self.candidates(i0, i1, points)
+        return downsample(t, series, points, start, end, keep, method, candidates=level)
@@ -4,4 +4,25 @@ import pandas as pd
 
 def sharpe_ratio(returns: pd.Series, risk_free_rate: float = 0.0, periods_per_year: int = 252) -> float:
     excess = returns - risk_free_rate / periods_per_year
-    return np.sqrt(periods_per_year) * excess.mean() / excess.std(ddof=1)
\ No newline at end of file
+    return np.sqrt(periods_per_year) * excess.mean() / excess.std(ddof=1)
+
+def max_drawdown(equity: np.ndarray) -> float:
+    """Plus forte baisse relative depuis un plus haut (valeur négative ou 0)."""
+    equity = np.asarray(equity, dtype=float)
+    if equity.size == 0:
+        return 0.0
+    peak = np.maximum.accumulate(equity)
+    return float(np.min(equity / peak - 1.0))
+
+
+def summary_metrics(equity: pd.Series, periods_per_year: int = 252) -> dict[str, float]:
+    """Métriques de synthèse d'une courbe d'equity (une valeur par barre)."""
+    returns = equity.pct_change().dropna()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = sharpe_ratio(returns, periods_per_year=periods_per_year) if len(returns) > 1 else np.nan
+    return {
+        "final_equity": float(equity.iloc[-1]),
+        "total_return": float(equity.iloc[-1] / equity.iloc[0] - 1.0),
+        "sharpe": float(sharpe),
+        "max_drawdown": max_drawdown(equity.to_numpy()),
+    }
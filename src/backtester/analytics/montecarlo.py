@@ -0,0 +1,136 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.backtester.analytics.online import batch_metrics
+from src.backtester.core.events import FillEvent
+
+
+@dataclass
+class MonteCarloResult:
+    """Une valeur par rééchantillonnage."""
+    final_equity: np.ndarray
+    max_drawdown: np.ndarray
+    sharpe: np.ndarray
+
+    def quantiles(self, qs: tuple[float, ...] = (0.05, 0.25, 0.5, 0.75, 0.95)) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "final_equity": np.nanquantile(self.final_equity, qs),
+                "max_drawdown": np.nanquantile(self.max_drawdown, qs),
+                "sharpe": np.nanquantile(self.sharpe, qs),
+            },
+            index=pd.Index(qs, name="quantile"),
+        )
+
+
+def record_run(engine) -> tuple[list[FillEvent], np.ndarray]:
+    """Déroule `engine` barre à barre; retourne ses fills et l'equity du portefeuille (une valeur par barre)."""
+    fills: list[FillEvent] = []
+    while engine.step() is not None:
+        fills.extend(engine.last_bar[3])
+    return fills, np.asarray(engine.portfolio.equity_curve, dtype=float)
+
+
+def returns_from_equity(equity) -> np.ndarray:
+    equity = np.asarray(equity, dtype=float)
+    return equity[1:] / equity[:-1] - 1.0
+
+
+def trade_pnl(fills: list[FillEvent]) -> np.ndarray:
+    """PnL réalisé de chaque vente (prix de revient moyen, frais de la vente déduits)."""
+    book: dict[str, tuple[float, float]] = {}
+    pnl = []
+    for f in fills:
+        qty, avg = book.get(f.symbol, (0.0, 0.0))
+        if f.direction > 0:
+            new_qty = qty + f.qty
+            book[f.symbol] = (new_qty, (avg * qty + f.fill_price * f.qty) / new_qty if new_qty else 0.0)
+        elif f.direction < 0:
+            pnl.append((f.fill_price - avg) * f.qty - f.commission - f.slippage)
+            new_qty = max(0.0, qty - f.qty)
+            book[f.symbol] = (new_qty, avg if new_qty else 0.0)
+    return np.asarray(pnl, dtype=float)
+
+
+def resample_indices(rng: np.random.Generator, n_sims: int, length: int, block: int = 1) -> np.ndarray:
+    """Indices (n_sims, length): bootstrap i.i.d. si block == 1, sinon block bootstrap circulaire."""
+    if block <= 1:
+        return rng.integers(0, length, (n_sims, length))
+    n_blocks = -(-length // block)
+    starts = rng.integers(0, length, (n_sims, n_blocks, 1))
+    return ((starts + np.arange(block)) % length).reshape(n_sims, n_blocks * block)[:, :length]
+
+
+def _run_chunk(args) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    kind, sample, n, block, initial, periods_per_year, seed_seq = args
+    rng = np.random.default_rng(seed_seq)
+    draws = sample[resample_indices(rng, n, len(sample), block)]
+    if kind == "returns":
+        equity = initial * np.cumprod(1.0 + draws, axis=1)
+    else:
+        equity = initial + np.cumsum(draws, axis=1)
+    equity = np.concatenate((np.full((n, 1), float(initial)), equity), axis=1)
+    m = batch_metrics(equity, periods_per_year)
+    return equity[:, -1], m["max_drawdown"], m["sharpe"]
+
+
+def _simulate(
+    kind: str,
+    sample: np.ndarray,
+    n_sims: int,
+    block: int,
+    initial: float,
+    periods_per_year: int,
+    seed: int,
+    mem_cap_mb: float,
+    workers: int,
+) -> MonteCarloResult:
+    sample = np.asarray(sample, dtype=float)
+    if sample.size == 0:
+        raise ValueError("Nothing to resample (empty sample)")
+    # ~6 tableaux (n, T) float64/int64 vivants par chunk (indices, tirages, equity, pics, ...)
+    per_sim = 6 * 8 * (len(sample) + 1)
+    chunk = max(1, min(n_sims, int(mem_cap_mb * 2**20 // per_sim)))
+    sizes = [min(chunk, n_sims - i) for i in range(0, n_sims, chunk)]
+    # un flux RNG indépendant par chunk: résultat identique quel que soit le nombre de workers
+    streams = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(kind, sample, n, block, initial, periods_per_year, s) for n, s in zip(sizes, streams)]
+
+    if workers and workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_run_chunk, tasks))
+    else:
+        parts = [_run_chunk(t) for t in tasks]
+    final, dd, sharpe = (np.concatenate(p) for p in zip(*parts))
+    return MonteCarloResult(final, dd, sharpe)
+
+
+def bootstrap_returns(
+    returns,
+    n_sims: int = 10_000,
+    block: int = 1,
+    initial: float = 1.0,
+    periods_per_year: int = 252,
+    seed: int = 0,
+    mem_cap_mb: float = 256,
+    workers: int = 0,
+) -> MonteCarloResult:
+    """Rééchantillonne les rendements barre à barre (`block` > 1: blocs consécutifs, garde l'autocorrélation)."""
+    return _simulate("returns", returns, n_sims, block, initial, periods_per_year, seed, mem_cap_mb, workers)
+
+
+def bootstrap_trades(
+    pnl,
+    initial: float,
+    n_sims: int = 10_000,
+    block: int = 1,
+    seed: int = 0,
+    mem_cap_mb: float = 256,
+    workers: int = 0,
+) -> MonteCarloResult:
+    """Rééchantillonne l'ordre et la composition des trades (PnL en devise); Sharpe par trade, non annualisé."""
+    return _simulate("pnl", pnl, n_sims, block, initial, 1, seed, mem_cap_mb, workers)
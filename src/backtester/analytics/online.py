@@ -0,0 +1,219 @@
+from __future__ import annotations
+import math
+from typing import Mapping, Sequence
+
+import numpy as np
+
+from src.backtester.core.events import FillEvent, MarketEvent
+
+NAN = float("nan")
+
+
+class OnlineMetrics:
+    """Statistiques de performance mises à jour en O(1) par barre, sans garder l'historique.
+
+    - rendements barre à barre: moyenne/variance (Welford), Sharpe, Sortino (cible 0)
+    - drawdown max et plus longue durée sous un plus haut (en barres)
+    - exposition: moyenne de |NLV| / equity
+    - turnover: notionnel traité / equity moyenne
+    - hit rate: part des ventes réalisées au-dessus du prix de revient moyen
+
+    À brancher sur BacktestEngine (`analytics=`), ou à alimenter via `update(...)`.
+    """
+
+    def __init__(self, periods_per_year: int = 252):
+        self.periods_per_year = periods_per_year
+        self.n_bars = 0
+        self._prev_equity = NAN
+        self._n = 0                          # nombre de rendements
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._down_sq = 0.0
+        self._peak = NAN
+        self.max_drawdown = 0.0
+        self._dd_bars = 0
+        self.max_drawdown_duration = 0
+        self._exposure_sum = 0.0
+        self._equity_sum = 0.0
+        self.traded_notional = 0.0
+        self._cost: dict[str, tuple[float, float]] = {}   # symbole -> (qty, prix moyen)
+        self.closing_trades = 0
+        self.winning_trades = 0
+
+    # ---------- alimentation
+    def on_bar(self, market_events: list[MarketEvent], fills: list[FillEvent], portfolio) -> None:
+        self.update(portfolio.cash + portfolio.net_liquidation_value, portfolio.net_liquidation_value, fills)
+
+    def update(self, equity: float, gross_exposure: float = 0.0, fills: list[FillEvent] | None = None) -> None:
+        for fill in fills or ():
+            self._on_fill(fill)
+
+        self.n_bars += 1
+        if not math.isnan(self._prev_equity) and self._prev_equity != 0.0:
+            r = equity / self._prev_equity - 1.0
+            self._n += 1
+            delta = r - self._mean
+            self._mean += delta / self._n
+            self._m2 += delta * (r - self._mean)
+            if r < 0.0:
+                self._down_sq += r * r
+        self._prev_equity = equity
+
+        if math.isnan(self._peak) or equity >= self._peak:
+            self._peak = equity
+            self._dd_bars = 0
+        else:
+            self._dd_bars += 1
+            self.max_drawdown = min(self.max_drawdown, equity / self._peak - 1.0)
+            self.max_drawdown_duration = max(self.max_drawdown_duration, self._dd_bars)
+
+        self._equity_sum += equity
+        if equity != 0.0:
+            self._exposure_sum += abs(gross_exposure) / equity
+
+    def _on_fill(self, fill: FillEvent) -> None:
+        self.traded_notional += abs(fill.fill_price * fill.qty)
+        qty, avg = self._cost.get(fill.symbol, (0.0, 0.0))
+        if fill.direction > 0:
+            new_qty = qty + fill.qty
+            avg = (avg * qty + fill.fill_price * fill.qty) / new_qty if new_qty else 0.0
+            self._cost[fill.symbol] = (new_qty, avg)
+        elif fill.direction < 0:
+            self.closing_trades += 1
+            if fill.fill_price > avg:
+                self.winning_trades += 1
+            new_qty = max(0.0, qty - fill.qty)
+            self._cost[fill.symbol] = (new_qty, avg if new_qty else 0.0)
+
+    # ---------- lecture
+    @property
+    def mean_return(self) -> float:
+        return self._mean if self._n else NAN
+
+    @property
+    def volatility(self) -> float:
+        return math.sqrt(self._m2 / (self._n - 1)) if self._n > 1 else NAN
+
+    @property
+    def sharpe(self) -> float:
+        vol = self.volatility
+        return math.sqrt(self.periods_per_year) * self._mean / vol if vol and not math.isnan(vol) else NAN
+
+    @property
+    def sortino(self) -> float:
+        if not self._n or self._down_sq == 0.0:
+            return NAN
+        return math.sqrt(self.periods_per_year) * self._mean / math.sqrt(self._down_sq / self._n)
+
+    @property
+    def exposure(self) -> float:
+        return self._exposure_sum / self.n_bars if self.n_bars else NAN
+
+    @property
+    def turnover(self) -> float:
+        return self.traded_notional / (self._equity_sum / self.n_bars) if self._equity_sum else NAN
+
+    @property
+    def hit_rate(self) -> float:
+        return self.winning_trades / self.closing_trades if self.closing_trades else NAN
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "n_bars": self.n_bars,
+            "mean_return": self.mean_return,
+            "volatility": self.volatility,
+            "sharpe": self.sharpe,
+            "sortino": self.sortino,
+            "max_drawdown": self.max_drawdown,
+            "max_drawdown_duration": self.max_drawdown_duration,
+            "exposure": self.exposure,
+            "turnover": self.turnover,
+            "hit_rate": self.hit_rate,
+        }
+
+
+def _hit_counts(symbol: np.ndarray, direction: np.ndarray, qty: np.ndarray, price: np.ndarray) -> tuple[int, int]:
+    """(ventes, ventes au-dessus du prix de revient moyen) d'une table de fills, même règle
+    qu'OnlineMetrics._on_fill. Séquentiel (le prix de revient dépend des fills précédents)."""
+    cost: dict[str, tuple[float, float]] = {}
+    closing = winning = 0
+    for sym, d, q, p in zip(symbol.tolist(), direction.tolist(), qty.tolist(), price.tolist()):
+        held, avg = cost.get(sym, (0.0, 0.0))
+        if d > 0:
+            new_qty = held + q
+            cost[sym] = (new_qty, (avg * held + p * q) / new_qty if new_qty else 0.0)
+        elif d < 0:
+            closing += 1
+            winning += p > avg
+            new_qty = max(0.0, held - q)
+            cost[sym] = (new_qty, avg if new_qty else 0.0)
+    return closing, winning
+
+
+def batch_metrics(
+    equity: np.ndarray,
+    periods_per_year: int = 252,
+    gross_exposure: np.ndarray | None = None,
+    fills: Sequence[Mapping[str, np.ndarray]] | None = None,
+) -> dict[str, np.ndarray]:
+    """Mêmes définitions qu'OnlineMetrics pour N courbes d'equity à la fois.
+
+    `equity` est de forme (N, T) (une ligne par run); `gross_exposure` optionnel, même forme.
+    `fills` optionnel: une table de fills par courbe (colonnes symbol, direction, qty, fill_price,
+    comme la table "fills" de RunLogger), pour turnover et hit_rate (NaN sans).
+    Retourne un tableau de longueur N par métrique.
+    """
+    equity = np.atleast_2d(np.asarray(equity, dtype=float))
+    n_curves, t = equity.shape
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = equity[:, 1:] / equity[:, :-1] - 1.0
+        n = r.shape[1]
+        mean = r.mean(axis=1) if n else np.full(n_curves, np.nan)
+        vol = r.std(axis=1, ddof=1) if n > 1 else np.full(n_curves, np.nan)
+        sharpe = np.sqrt(periods_per_year) * mean / np.where(vol > 0, vol, np.nan)
+        down = np.sqrt((np.minimum(r, 0.0) ** 2).sum(axis=1) / n) if n else np.full(n_curves, np.nan)
+        sortino = np.sqrt(periods_per_year) * mean / np.where(down > 0, down, np.nan)
+
+        peak = np.maximum.accumulate(equity, axis=1)
+        max_dd = np.minimum((equity / peak - 1.0).min(axis=1), 0.0)
+        exposure = (
+            (np.abs(gross_exposure) / equity).mean(axis=1) if gross_exposure is not None
+            else np.full(n_curves, np.nan)
+        )
+
+    # plus longue série de barres sous le plus haut: t - (dernier index non sous l'eau)
+    underwater = equity < peak
+    steps = np.arange(t)
+    last_high = np.maximum.accumulate(np.where(underwater, -1, steps), axis=1)
+    dd_duration = np.where(underwater, steps - last_high, 0).max(axis=1) if t else np.zeros(n_curves, int)
+
+    turnover = np.full(n_curves, np.nan)
+    hit_rate = np.full(n_curves, np.nan)
+    if fills is not None:
+        if len(fills) != n_curves:
+            raise ValueError(f"Expected {n_curves} fill tables, got {len(fills)}")
+        for i, table in enumerate(fills):
+            qty = np.asarray(table["qty"], dtype=float)
+            price = np.asarray(table["fill_price"], dtype=float)
+            equity_sum = equity[i].sum()
+            if equity_sum:
+                turnover[i] = np.abs(price * qty).sum() / (equity_sum / t)
+            closing, winning = _hit_counts(
+                np.asarray(table["symbol"]), np.asarray(table["direction"]), qty, price
+            )
+            if closing:
+                hit_rate[i] = winning / closing
+
+    return {
+        "n_bars": np.full(n_curves, t),
+        "mean_return": mean,
+        "volatility": vol,
+        "sharpe": sharpe,
+        "sortino": sortino,
+        "max_drawdown": max_dd,
+        "max_drawdown_duration": dd_duration,
+        "exposure": exposure,
+        "turnover": turnover,
+        "hit_rate": hit_rate,
+        "total_return": equity[:, -1] / equity[:, 0] - 1.0,
+    }
@@ -0,0 +1,230 @@
+from __future__ import annotations
+import platform
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from src.backtester.bench.synthetic import pe_frame, synthetic_bars
+from src.backtester.core.batch_engine import BatchEngine
+from src.backtester.core.engine import BacktestEngine
+from src.backtester.core.events import MarketEvent, OrderEvent, FillEvent
+from src.backtester.data.columnar_handler import ColumnarMultiSymbolHandler
+from src.backtester.data.csv_handler import PERatioSingleCSVDataHandler
+from src.backtester.data.loaders.cached_csv_loader import CachedCSVLoader
+from src.backtester.data.loaders.csv_loader import CSVLoader
+from src.backtester.data.loaders.frame_loader import FrameLoader
+from src.backtester.execution.broker_sim import SimulatedBroker
+from src.backtester.portfolio.array_portfolio import ArrayPortfolio
+from src.backtester.portfolio.portfolio import SimplePortfolio
+from src.backtester.strategy.pe_ratio_strategy import PERatioStrategy, PEParams
+from src.backtester.strategy.pe_universe_strategy import PEUniverseStrategy
+
+SIZES = {
+    "small": {"bars": 5_000, "symbols": 50},
+    "medium": {"bars": 100_000, "symbols": 500},
+    "large": {"bars": 1_000_000, "symbols": 5_000},
+}
+
+
+@dataclass
+class BenchResult:
+    name: str
+    items: int
+    seconds: float                          # meilleur des `repeat` essais
+    unit: str
+
+    @property
+    def throughput(self) -> float:
+        return self.items / self.seconds if self.seconds else float("inf")
+
+
+def _best_of(repeat: int, setup: Callable[[], object], run: Callable[[object], int]) -> tuple[int, float]:
+    best, items = float("inf"), 0
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        items = run(state)
+        best = min(best, time.perf_counter() - start)
+    return items, best
+
+
+def _drain(handler) -> int:
+    n = 0
+    while handler.has_next():
+        handler.get_next()
+        n += 1
+    return n
+
+
+def _drain_batches(handler) -> int:
+    n = 0
+    while handler.has_next():
+        handler.get_next_batch()
+        n += 1
+    return n
+
+
+def run_suite(bars: int, symbols: int, repeat: int = 3, only: list[str] | None = None) -> list[BenchResult]:
+    """Lance les benchmarks sur des données synthétiques de `bars` barres (et `symbols` symboles pour le multi)."""
+    bench: dict[str, tuple[str, Callable[[], object], Callable[[object], int]]] = {}
+    pe = pe_frame(bars)
+    multi_bars = max(1, bars // max(1, symbols))     # volume multi-symboles ~ `bars` lignes au total
+    wide = synthetic_bars(symbols, multi_bars, layout="wide")
+    ts = pd.Timestamp("2020-01-01")
+    events = [MarketEvent(f"SYM{i:04d}", ts, {"close": 100.0 + i}) for i in range(symbols)]
+    orders = [OrderEvent(e.symbol, ts, 1, 1.0) for e in events]
+    fills = [FillEvent(e.symbol, ts, 1, e.data["close"], 1.0) for e in events]
+
+    tmp = Path(tempfile.mkdtemp(prefix="bt_bench_"))
+    csv_path = tmp / "pe.csv"
+    pe.to_csv(csv_path)
+
+    bench["csv_loader"] = ("rows/s", lambda: CSVLoader(str(csv_path)), lambda loader: len(loader.load()))
+
+    def cached_setup():
+        loader = CachedCSVLoader(str(csv_path))
+        loader.load()                       # remplit le cache: on mesure le chargement chaud
+        return loader
+
+    bench["cached_csv_loader_warm"] = ("rows/s", cached_setup, lambda loader: len(loader.load()))
+    bench["pe_handler"] = (
+        "bars/s", lambda: PERatioSingleCSVDataHandler(FrameLoader(pe), "SYN"), _drain
+    )
+    bench["columnar_handler"] = (
+        "bars/s", lambda: ColumnarMultiSymbolHandler(FrameLoader(wide), sep="."), _drain_batches
+    )
+
+    def broker_run(broker) -> int:
+        for _ in range(20):
+            broker.execute(orders, events)
+        return 20 * len(orders)
+
+    bench["simulated_broker"] = ("orders/s", lambda: SimulatedBroker(1.0, 5.0), broker_run)
+
+    def portfolio_setup(cls):
+        def setup():
+            p = cls(cash=1e12)
+            p.update_on_fill(fills, events)
+            return p
+        return setup
+
+    def portfolio_run(p) -> int:
+        for _ in range(20):
+            p.update_on_fill(fills[:10], events)
+        return 20
+
+    bench["simple_portfolio"] = ("bars/s", portfolio_setup(SimplePortfolio), portfolio_run)
+    bench["array_portfolio"] = ("bars/s", portfolio_setup(ArrayPortfolio), portfolio_run)
+
+    def engine_setup():
+        return BacktestEngine(
+            PERatioSingleCSVDataHandler(FrameLoader(pe), "SYN"),
+            PERatioStrategy(PEParams(), 1e6),
+            SimplePortfolio(1e6),
+            SimulatedBroker(),
+        )
+
+    def engine_run(engine) -> int:
+        n = 0
+        while engine.step() is not None:
+            n += 1
+        return n
+
+    bench["backtest_engine"] = ("bars/s", engine_setup, engine_run)
+
+    # univers de `symbols` symboles: boucle MarketEvent vs BarContext + lots struct-of-arrays
+    def multi_engine_setup(engine_cls):
+        def setup():
+            return engine_cls(
+                ColumnarMultiSymbolHandler(FrameLoader(wide), sep="."),
+                PEUniverseStrategy(PEParams(hi=22.0, lo=18.0, pct=0.001), 1e7, field="pe_ratio_value"),
+                SimplePortfolio(1e7),
+                SimulatedBroker(1.0, 5.0),
+            )
+        return setup
+
+    bench["engine_multi_events"] = ("bars/s", multi_engine_setup(BacktestEngine), engine_run)
+    bench["engine_multi_batch"] = ("bars/s", multi_engine_setup(BatchEngine), engine_run)
+
+    try:
+        import orjson
+        from src.api.columnar import iter_frames
+    except ImportError:
+        pass                                # extra "api" non installé
+    else:
+        def api_run(engine) -> int:
+            n = 0
+            for frame in iter_frames(engine):
+                orjson.dumps(frame)
+                n += 1
+            return n
+
+        bench["api_serialization"] = ("frames/s", engine_setup, api_run)
+
+    results = []
+    try:
+        for name, (unit, setup, run) in bench.items():
+            if only and name not in only:
+                continue
+            items, seconds = _best_of(repeat, setup, run)
+            results.append(BenchResult(name, items, seconds, unit))
+    finally:
+        CachedCSVLoader(str(csv_path)).invalidate()
+        csv_path.unlink(missing_ok=True)
+        tmp.rmdir()
+    return results
+
+
+def to_json(results: list[BenchResult], bars: int, symbols: int) -> dict:
+    return {
+        "meta": {
+            "bars": bars,
+            "symbols": symbols,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+        },
+        "results": {
+            r.name: {"throughput": r.throughput, "unit": r.unit, "items": r.items, "seconds": r.seconds}
+            for r in results
+        },
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Noms des benchmarks dont le débit a baissé de plus de `threshold` (ex: 0.2 = -20%).
+
+    ValueError si la référence a été mesurée sur une autre taille (barres, symboles): débits non comparables.
+    """
+    for key in ("bars", "symbols"):
+        if baseline["meta"][key] != current["meta"][key]:
+            raise ValueError(
+                f"baseline {key}={baseline['meta'][key]} vs current {key}={current['meta'][key]}: "
+                "rerun with the baseline's size or --update-baseline"
+            )
+    failures = []
+    for name, base in baseline.get("results", {}).items():
+        cur = current["results"].get(name)
+        if cur is None:
+            continue
+        if cur["throughput"] < base["throughput"] * (1.0 - threshold):
+            change = cur["throughput"] / base["throughput"] - 1.0
+            failures.append(f"{name}: {cur['throughput']:,.0f} vs {base['throughput']:,.0f} {cur['unit']} ({change:+.1%})")
+    return failures
+
+
+def main() -> None:
+    """Équivalent de `backtester bench` (options définies dans src/backtester/cli.py)."""
+    import sys
+    from src.backtester.cli import app
+
+    app(["bench", *sys.argv[1:]])
+
+if __name__ == "__main__":
+    main()
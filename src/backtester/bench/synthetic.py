@@ -0,0 +1,76 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+
+def synthetic_bars(
+    n_symbols: int = 1,
+    n_bars: int = 1_000,
+    seed: int = 0,
+    start: str = "1970-01-01",
+    freq: str = "D",
+    layout: str = "long",
+) -> pd.DataFrame:
+    """Marché synthétique reproductible: close en marche géométrique, OHLC autour du close, PE.
+
+    layout="long": index Date, colonnes symbol/open/high/low/close/pe_ratio_value.
+    layout="wide": index Date, colonnes "<symbole>.<champ>" (voir ColumnarMultiSymbolHandler sep=".").
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=n_bars, freq=freq, name="Date")
+    symbols = np.array([f"SYM{i:04d}" for i in range(n_symbols)], dtype=object)
+
+    drift = rng.normal(0.0002, 0.0001, n_symbols)
+    vol = rng.uniform(0.005, 0.03, n_symbols)
+    log_ret = rng.normal(drift, vol, (n_bars, n_symbols))
+    close = 100.0 * np.exp(np.cumsum(log_ret, axis=0))
+    spread = np.abs(rng.normal(0.0, vol, (n_bars, n_symbols))) * close
+    open_ = close * np.exp(rng.normal(0.0, vol / 2, (n_bars, n_symbols)))
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    earnings = 5.0 * np.exp(np.cumsum(rng.normal(0.0002, 0.002, (n_bars, n_symbols)), axis=0))
+    pe = close / earnings
+
+    fields = {"open": open_, "high": high, "low": low, "close": close, "pe_ratio_value": pe}
+    if layout == "wide":
+        return pd.DataFrame(
+            {f"{s}.{f}": values[:, j] for j, s in enumerate(symbols) for f, values in fields.items()},
+            index=index,
+        )
+    if layout != "long":
+        raise ValueError(f"Unknown layout '{layout}'")
+    return pd.DataFrame(
+        {"symbol": np.tile(symbols, n_bars), **{f: v.ravel() for f, v in fields.items()}},
+        index=index.repeat(n_symbols),
+    )
+
+
+def pe_frame(n_bars: int = 1_000, seed: int = 0) -> pd.DataFrame:
+    """Un seul symbole, mêmes colonnes que pe_ratio_full_sp500.csv une fois chargé."""
+    return synthetic_bars(1, n_bars, seed)[["pe_ratio_value", "close"]]
+
+
+def iter_synthetic_chunks(
+    n_symbols: int, n_bars: int, chunk_bars: int = 100_000, seed: int = 0, freq: str = "min"
+) -> Iterator[pd.DataFrame]:
+    """Même générateur par blocs de `chunk_bars` barres, pour des volumes qui ne tiennent pas en RAM.
+
+    Chaque bloc a sa propre graine (seed + numéro de bloc): les prix ne sont pas continus entre blocs.
+    """
+    start = pd.Timestamp("1970-01-01")
+    step = pd.tseries.frequencies.to_offset(freq)
+    for k, first in enumerate(range(0, n_bars, chunk_bars)):
+        size = min(chunk_bars, n_bars - first)
+        yield synthetic_bars(n_symbols, size, seed + k, start=start + first * step, freq=freq)
+
+
+def write_synthetic_csv(path: str | Path, n_symbols: int, n_bars: int, **kwargs) -> Path:
+    """Écrit un CSV long (Date, symbol, ...) en streaming."""
+    path = Path(path)
+    with open(path, "w", newline="") as f:
+        for i, chunk in enumerate(iter_synthetic_chunks(n_symbols, n_bars, **kwargs)):
+            chunk.to_csv(f, header=i == 0)
+    return path
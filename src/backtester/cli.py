@@ -0,0 +1,346 @@
+"""Commande `backtester`: run, sweep, bench, inspect-data, worker.
+
+Seuls la stdlib et typer sont importés au démarrage; pandas, numpy et le moteur sont importés dans
+les commandes qui en ont besoin (`--timings` affiche les deux coûts sur stderr). Pour enchaîner
+beaucoup de runs courts, `backtester worker` paie ces imports une fois et lit les specs sur stdin
+ou dans un répertoire.
+"""
+from __future__ import annotations
+import time
+
+_T0 = time.perf_counter()
+
+# imports après _T0: le temps d'import de la CLI est mesuré (TIMINGS["cli_import"])
+import importlib  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import sys  # noqa: E402
+from pathlib import Path  # noqa: E402
+from typing import Any, Optional  # noqa: E402
+
+import typer  # noqa: E402
+
+app = typer.Typer(add_completion=False, no_args_is_help=True, help="Backtests en ligne de commande.")
+
+TIMINGS: dict[str, float] = {"cli_import": time.perf_counter() - _T0}
+_SHOW_TIMINGS = False
+
+
+def _lazy(module: str):
+    """Importe `module` en mesurant le temps (cumulé dans TIMINGS["imports"])."""
+    start = time.perf_counter()
+    mod = importlib.import_module(module)
+    TIMINGS["imports"] = TIMINGS.get("imports", 0.0) + time.perf_counter() - start
+    return mod
+
+
+def _report_timings() -> None:
+    if _SHOW_TIMINGS:
+        typer.echo(" ".join(f"{k}={v * 1e3:.1f}ms" for k, v in TIMINGS.items()), err=True)
+
+
+def _echo_json(payload: dict[str, Any]) -> None:
+    typer.echo(json.dumps(payload, default=str))
+
+
+@app.callback()
+def main(timings: bool = typer.Option(False, "--timings", help="Temps d'import et d'exécution sur stderr")) -> None:
+    global _SHOW_TIMINGS
+    _SHOW_TIMINGS = timings
+
+
+# ---------- run
+def run_spec(spec: dict[str, Any], store: str | None = None, profile: bool = False) -> dict[str, Any]:
+    """Lance un backtest décrit par `spec` (clés de config.specs.spec_dict) et retourne son résumé.
+
+    Avec `store`, les tables du run sont enregistrées dans ce RunStore (run_id dans le résumé).
+    Avec `profile`, les compteurs par étape (StageProfiler.summary) sont ajoutés sous "profile".
+    """
+    specs = _lazy("src.backtester.config.specs")
+    logger = _lazy("src.backtester.io.logger").RunLogger() if store else None
+
+    start = time.perf_counter()
+    spec = {**specs.DEFAULT_SPEC, **spec}
+    engine = specs.build_from_spec(spec, profile=profile)
+    n_fills = 0
+    while engine.step() is not None:
+        n_fills += len(engine.last_bar[3])
+        if logger is not None:
+            logger.log(engine)
+    seconds = time.perf_counter() - start
+    p = engine.portfolio
+    out = {
+        "bars": engine.bars,
+        "n_fills": n_fills,
+        "cash": p.cash,
+        "net_liquidation_value": p.net_liquidation_value,
+        "final_equity": p.cash + p.net_liquidation_value,
+        "seconds": seconds,
+    }
+    if engine.profiler is not None:
+        engine.profiler.stop()
+        out["profile"] = engine.profiler.summary()
+    if logger is not None:
+        persistence = _lazy("src.backtester.io.persistence")
+        out["run_id"] = persistence.RunStore(store).save(logger.arrays(), spec, timings={"run_seconds": seconds})
+    return out
+
+
+@app.command()
+def run(
+    spec: Optional[str] = typer.Argument(None, help="Fichier JSON de spec, '-' pour stdin"),
+    symbol: Optional[str] = typer.Option(None),
+    strategy: Optional[str] = typer.Option(None),
+    loader: Optional[str] = typer.Option(None),
+    handler: Optional[str] = typer.Option(None),
+    initial_cash: Optional[float] = typer.Option(None),
+    csv: Optional[str] = typer.Option(None, "--csv", help="csv_path"),
+    store: str = typer.Option("", help="Répertoire d'un RunStore où enregistrer le run"),
+    profile: bool = typer.Option(False, help="Temps par étape de l'engine sur stderr (et sous \"profile\")"),
+) -> None:
+    """Un backtest; les options surchargent la spec (valeurs par défaut: config.specs.DEFAULT_SPEC)."""
+    payload: dict[str, Any] = {}
+    if spec == "-":
+        payload = json.load(sys.stdin)
+    elif spec:
+        payload = json.loads(Path(spec).read_text())
+    overrides = {
+        "symbol": symbol,
+        "strategy": strategy,
+        "loader": loader,
+        "handler": handler,
+        "initial_cash": initial_cash,
+        "csv_path": csv,
+    }
+    payload.update({k: v for k, v in overrides.items() if v is not None})
+    try:
+        out = run_spec(payload, store or None, profile)
+    except (ValueError, OSError) as exc:
+        typer.echo(f"error: {exc}", err=True)
+        raise typer.Exit(code=2)
+    _echo_json(out)
+    if profile:
+        typer.echo(_lazy("src.backtester.core.profiling").format_summary(out["profile"]), err=True)
+    _report_timings()
+
+
+# ---------- sweep
+@app.command()
+def sweep(
+    csv_path: str = typer.Option("src/backtester/data/csv/pe_ratio_full_sp500.csv", "--csv"),
+    symbol: str = typer.Option("S&P"),
+    initial_cash: float = typer.Option(1_000_000.0),
+    hi: str = typer.Option("25", help="Liste séparée par des virgules"),
+    lo: str = typer.Option("15", help="Liste séparée par des virgules"),
+    pct: str = typer.Option("0.05", help="Liste séparée par des virgules"),
+    random: int = typer.Option(0, help="Si > 0: N tirages uniformes entre min et max de chaque axe"),
+    seed: int = typer.Option(0),
+    engine: str = typer.Option("vectorized", help="vectorized | event"),
+    periods_per_year: int = typer.Option(252),
+    workers: int = typer.Option(0, help="0 = tous les coeurs"),
+    top: int = typer.Option(20),
+    out: str = typer.Option("", help="Chemin CSV pour la table complète"),
+) -> None:
+    """Grille ou tirages aléatoires de PEParams (optimize.sweep)."""
+    sw = _lazy("src.backtester.optimize.sweep")
+    csv_loader = _lazy("src.backtester.data.loaders.csv_loader")
+
+    start = time.perf_counter()
+    axes = {"hi": sw.parse_axis(hi), "lo": sw.parse_axis(lo), "pct": sw.parse_axis(pct)}
+    if random > 0:
+        combos = sw.random_search({k: (min(v), max(v)) for k, v in axes.items()}, random, seed)
+    else:
+        combos = sw.grid(**axes)
+    results = sw.run_sweep(
+        csv_loader.CSVLoader(csv_path).load(),
+        combos,
+        symbol,
+        initial_cash,
+        engine=engine,
+        periods_per_year=periods_per_year,
+        max_workers=workers or None,
+    )
+    TIMINGS["run"] = time.perf_counter() - start
+    if out:
+        results.to_csv(out, index=False)
+    typer.echo(results.head(top).to_string())
+    _report_timings()
+
+
+# ---------- bench
+@app.command()
+def bench(
+    size: str = typer.Option("small", help="small | medium | large"),
+    bars: int = typer.Option(0, help="Surcharge le nombre de barres de `size`"),
+    symbols: int = typer.Option(0, help="Surcharge le nombre de symboles de `size`"),
+    repeat: int = typer.Option(3),
+    only: str = typer.Option("", help="Liste de benchmarks séparés par des virgules"),
+    baseline: str = typer.Option("benchmarks/baseline.json", help="Fichier JSON de référence"),
+    threshold: float = typer.Option(0.2, help="Baisse de débit tolérée avant échec"),
+    update_baseline: bool = typer.Option(False, help="Écrit les résultats comme nouvelle référence"),
+    out: str = typer.Option("", help="Écrit aussi les résultats dans ce fichier JSON"),
+) -> None:
+    """Suite de benchmarks (bench.suite), comparée à une référence JSON."""
+    suite = _lazy("src.backtester.bench.suite")
+
+    preset = suite.SIZES[size]
+    n_bars, n_symbols = bars or preset["bars"], symbols or preset["symbols"]
+    results = suite.run_suite(n_bars, n_symbols, repeat, [s for s in only.split(",") if s] or None)
+    current = suite.to_json(results, n_bars, n_symbols)
+    for r in results:
+        typer.echo(f"{r.name:<24}{r.throughput:>16,.0f} {r.unit:<9}({r.items} in {r.seconds * 1e3:.1f}ms)")
+    if out:
+        Path(out).write_text(json.dumps(current, indent=2))
+    _report_timings()
+
+    path = Path(baseline)
+    if update_baseline:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(current, indent=2))
+        typer.echo(f"baseline written to {path}")
+        return
+    if not path.exists():
+        typer.echo(f"no baseline at {path} (use --update-baseline)")
+        return
+    try:
+        failures = suite.compare(current, json.loads(path.read_text()), threshold)
+    except ValueError as exc:
+        typer.echo(f"error: {exc}", err=True)
+        raise typer.Exit(code=2)
+    for f in failures:
+        typer.echo(f"REGRESSION {f}", err=True)
+    if failures:
+        raise typer.Exit(code=1)
+    typer.echo(f"no regression beyond {threshold:.0%}")
+
+
+# ---------- inspect-data
+@app.command("inspect-data")
+def inspect_data(
+    path: str = typer.Argument(..., help="Fichier CSV"),
+    head: int = typer.Option(5, help="Lignes affichées"),
+    as_json: bool = typer.Option(False, "--json", help="Résumé en JSON"),
+) -> None:
+    """Colonnes, types, plage de dates, valeurs manquantes et empreinte d'un CSV."""
+    csv_loader = _lazy("src.backtester.data.loaders.csv_loader")
+    cached = _lazy("src.backtester.data.loaders.cached_csv_loader")
+
+    try:
+        df = csv_loader.CSVLoader(path).load()
+    except (ValueError, OSError) as exc:
+        typer.echo(f"error: {exc}", err=True)
+        raise typer.Exit(code=2)
+    index = df.index
+    summary = {
+        "path": path,
+        "rows": len(df),
+        "columns": {c: str(t) for c, t in df.dtypes.items()},
+        "missing": {c: int(n) for c, n in df.isna().sum().items()},
+        "start": index.min() if len(df) else None,
+        "end": index.max() if len(df) else None,
+        "missing_dates": int(index.isna().sum()),
+        "sorted": bool(index.is_monotonic_increasing),
+        "duplicated_dates": int(index.duplicated().sum()),
+        "fingerprint": cached.file_fingerprint(path),
+    }
+    if as_json:
+        _echo_json(summary)
+    else:
+        for key, value in summary.items():
+            typer.echo(f"{key:<18}{value}")
+        if head:
+            typer.echo(df.head(head).to_string())
+    _report_timings()
+
+
+# ---------- worker
+def _run_job(job: dict[str, Any], store: str | None) -> dict[str, Any]:
+    job_id = job.pop("id", None)
+    try:
+        result = {"id": job_id, "ok": True, **run_spec(job, store)}
+    except Exception as exc:            # un job en erreur ne doit pas arrêter le worker
+        result = {"id": job_id, "ok": False, "error": f"{type(exc).__name__}: {exc}"}
+    return result
+
+
+def _serve_stdin(store: str | None) -> int:
+    n = 0
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            job = json.loads(line)
+        except json.JSONDecodeError as exc:
+            _echo_json({"id": None, "ok": False, "error": f"invalid JSON: {exc}"})
+            continue
+        _echo_json(_run_job(job, store))
+        sys.stdout.flush()
+        n += 1
+    return n
+
+
+def _serve_directory(directory: Path, store: str | None, poll: float, once: bool) -> int:
+    """Specs `*.json` de `directory`: chaque fichier est réclamé par renommage atomique (`.running`),
+    ce qui permet plusieurs workers sur le même répertoire; spec et résultat déplacés dans `done/`."""
+    done_dir = directory / "done"
+    done_dir.mkdir(exist_ok=True)
+    n = 0
+    while True:
+        claimed = False
+        for path in sorted(directory.glob("*.json")):
+            if path.name.endswith(".result.json"):
+                continue
+            running = path.with_name(f"{path.stem}.{os.getpid()}.running")
+            try:
+                os.replace(path, running)
+            except FileNotFoundError:           # pris par un autre worker
+                continue
+            claimed = True
+            try:
+                job = json.loads(running.read_text())
+            except json.JSONDecodeError as exc:
+                job, result = None, {"id": path.stem, "ok": False, "error": f"invalid JSON: {exc}"}
+            if job is not None:
+                job.setdefault("id", path.stem)
+                result = _run_job(job, store)
+            tmp = done_dir / f"{path.stem}.result.json.tmp"
+            tmp.write_text(json.dumps(result, default=str))
+            os.replace(tmp, done_dir / f"{path.stem}.result.json")
+            os.replace(running, done_dir / path.name)
+            _echo_json(result)
+            n += 1
+        if not claimed:
+            if once:
+                return n
+            time.sleep(poll)
+
+
+@app.command()
+def worker(
+    directory: str = typer.Option("", "--dir", help="Répertoire de specs *.json (défaut: JSON lines sur stdin)"),
+    store: str = typer.Option("", help="RunStore où enregistrer chaque run"),
+    poll: float = typer.Option(0.5, help="Attente entre deux scans du répertoire (s)"),
+    once: bool = typer.Option(False, help="Avec --dir: s'arrête quand le répertoire est vide"),
+) -> None:
+    """Worker persistant: imports payés une fois, puis une spec par ligne de stdin (ou par fichier de
+    --dir); une ligne JSON de résultat par job sur stdout ({"id", "ok", ...résumé de run})."""
+    _lazy("src.backtester.config.specs")            # préchargé avant le premier job
+    if store:
+        _lazy("src.backtester.io.logger")
+        _lazy("src.backtester.io.persistence")
+    _report_timings()
+    start = time.perf_counter()
+    try:
+        if directory:
+            n = _serve_directory(Path(directory), store or None, poll, once)
+        else:
+            n = _serve_stdin(store or None)
+    except KeyboardInterrupt:
+        return
+    TIMINGS["run"] = time.perf_counter() - start
+    if _SHOW_TIMINGS:
+        typer.echo(f"{n} jobs in {TIMINGS['run']:.2f}s", err=True)
+
+
+if __name__ == "__main__":
+    app()
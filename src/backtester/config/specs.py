@@ -0,0 +1,102 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict
+
+from src.backtester.core.engine import BacktestEngine, EngineConfig
+from src.backtester.core.clock import TradingClock
+from src.backtester.data.loaders.csv_loader import CSVLoader
+from src.backtester.data.loaders.cached_csv_loader import CachedCSVLoader
+from src.backtester.data.loaders.chunked_csv_loader import ChunkedCSVLoader
+from src.backtester.data.streaming_handler import StreamingDataHandler
+from src.backtester.data.csv_handler import (
+    PERatioSingleCSVDataHandler,
+    MultipleAssetsSingleSymbolCSVHandler,
+)
+from src.backtester.strategy.pe_ratio_strategy import PERatioStrategy, PEParams
+from src.backtester.portfolio.portfolio import SimplePortfolio
+from src.backtester.execution.broker_sim import SimulatedBroker
+
+# Composants construisibles depuis une spec (API, jobs, CLI): liste blanche par nom.
+STRATEGIES: Dict[str, Callable[[float], Any]] = {
+    "PERatioStrategy": lambda initial_cash: PERatioStrategy(PEParams(), initial_cash),
+}
+
+LOADERS: Dict[str, Callable[..., Any]] = {
+    "CSVLoader": lambda csv_path, **_: CSVLoader(csv_path),
+    "CachedCSVLoader": lambda csv_path, **_: CachedCSVLoader(csv_path),
+    "ChunkedCSVLoader": lambda csv_path, **_: ChunkedCSVLoader(csv_path),
+}
+
+HANDLERS: Dict[str, Callable[..., Any]] = {
+    "PERatioSingleCSVDataHandler": lambda loader, symbol, **_: PERatioSingleCSVDataHandler(loader, symbol),
+    "MultipleAssetsSingleSymbolCSVHandler": lambda loader, symbol, **_: MultipleAssetsSingleSymbolCSVHandler(loader, symbol),
+    # ChunkedCSVLoader requis; mêmes clés d'event que PERatioSingleCSVDataHandler
+    "StreamingDataHandler": lambda loader, symbol, **_: StreamingDataHandler(
+        loader, symbol, fields=["pe_ratio_value", "close"], rename={"pe_ratio_value": "pe"}
+    ),
+}
+
+DEFAULT_SPEC: Dict[str, Any] = {
+    "symbol": "S&P",
+    "strategy": "PERatioStrategy",
+    "loader": "CSVLoader",
+    "handler": "PERatioSingleCSVDataHandler",
+    "initial_cash": 1_000_000.0,
+    "csv_path": "src/backtester/data/csv/pe_ratio_full_sp500.csv",
+}
+
+# StreamingDataHandler: equity_curve du portefeuille bornée aux N dernières barres (mémoire en O(1))
+STREAMING_EQUITY_WINDOW = 1024
+
+
+def spec_dict(
+    symbol: str, strategy: str, loader: str, handler: str, initial_cash: float, csv_path: str
+) -> Dict[str, Any]:
+    return {
+        "symbol": symbol,
+        "strategy": strategy,
+        "loader": loader,
+        "handler": handler,
+        "initial_cash": initial_cash,
+        "csv_path": csv_path,
+    }
+
+
+def build_engine(
+    symbol: str,
+    strategy_name: str,
+    loader_name: str,
+    handler_name: str,
+    initial_cash: float,
+    csv_path: str,
+    profile: bool = False,
+) -> BacktestEngine:
+    """Engine prêt à tourner pour une spec; ValueError si un nom n'est pas dans les registres."""
+    if strategy_name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy_name}'")
+    if loader_name not in LOADERS:
+        raise ValueError(f"Unknown loader '{loader_name}'")
+    if handler_name not in HANDLERS:
+        raise ValueError(f"Unknown handler '{handler_name}'")
+
+    loader = LOADERS[loader_name](csv_path=csv_path)
+    data = HANDLERS[handler_name](loader=loader, symbol=symbol)
+    equity_window = None
+    if isinstance(data, StreamingDataHandler):
+        if not isinstance(loader, ChunkedCSVLoader):
+            raise ValueError("StreamingDataHandler requires loader=ChunkedCSVLoader")
+        clock = TradingClock.from_stream(data)  # piloté par le flux, rien n'est matérialisé
+        equity_window = STREAMING_EQUITY_WINDOW  # idem pour l'equity; métriques du run entier: OnlineMetrics (O(1))
+    else:
+        clock = TradingClock(data._df.index)
+    strategy = STRATEGIES[strategy_name](initial_cash)
+    broker = SimulatedBroker(commission_per_trade=0.0, slippage_bp=0.0)
+    portfolio = SimplePortfolio(cash=initial_cash, equity_window=equity_window)
+    return BacktestEngine(data, strategy, portfolio, broker, clock, EngineConfig(verbose=False, profile=profile))
+
+
+def build_from_spec(spec: Dict[str, Any], profile: bool = False) -> BacktestEngine:
+    """build_engine depuis un dict de spec (clés de spec_dict; les clés absentes prennent DEFAULT_SPEC)."""
+    s = {**DEFAULT_SPEC, **spec}
+    return build_engine(
+        s["symbol"], s["strategy"], s["loader"], s["handler"], float(s["initial_cash"]), s["csv_path"], profile
+    )
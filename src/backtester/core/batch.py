@@ -0,0 +1,289 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from numbers import Real
+from typing import Any, Protocol
+
+import numpy as np
+import pandas as pd
+
+from .interfaces import Strategy, Broker, Portfolio
+from .events import MarketEvent, SignalEvent, OrderEvent, FillEvent, MarketBatch
+
+
+class Universe:
+    """Symboles -> ids entiers, partagés par toutes les barres et toutes les étapes d'un run."""
+
+    def __init__(self, symbols=()):
+        self.symbols: list[str] = []
+        self.index: dict[str, int] = {}
+        for s in symbols:
+            self.id(s)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def id(self, symbol: str) -> int:
+        i = self.index.get(symbol)
+        if i is None:
+            i = self.index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return i
+
+    def ids(self, symbols) -> np.ndarray:
+        get = self.index.get
+        ids = [get(s) for s in symbols]
+        if None in ids:
+            ids = [self.id(s) for s in symbols]
+        return np.array(ids, dtype=np.intp)
+
+
+@dataclass(slots=True)
+class BarContext:
+    """Tout ce qu'une barre expose aux étapes, construit une seule fois par l'engine.
+
+    Tableaux denses sur l'univers (ligne = id du symbole): `values` (U, F), `close` (U,), `mask` (U,).
+    Un symbole absent de la barre a `mask=False` et des NaN. `events` (API MarketEvent) n'est
+    construit qu'à la première demande, pour les composants adaptés.
+    """
+    timestamp: pd.Timestamp
+    universe: Universe
+    fields: tuple[str, ...]
+    values: np.ndarray
+    mask: np.ndarray
+    close: np.ndarray
+    _events: list[MarketEvent] | None = None
+
+    @classmethod
+    def from_batch(cls, batch: MarketBatch, universe: Universe) -> BarContext:
+        # la MarketBatch est déjà dense dans l'ordre de l'univers: aucune copie
+        return cls(batch.timestamp, universe, batch.fields, batch.values, batch.mask, batch.field("close"))
+
+    @classmethod
+    def from_events(cls, events: list[MarketEvent], universe: Universe) -> BarContext:
+        first = events[0].data
+        fields = tuple(k for k, v in first.items() if isinstance(v, Real))
+        ids = universe.ids([e.symbol for e in events])
+        values = np.full((len(universe), len(fields)), np.nan)
+        values[ids] = [[e.data.get(f, np.nan) for f in fields] for e in events]
+        mask = np.zeros(len(universe), dtype=bool)
+        mask[ids] = True
+        ctx = cls(events[0].timestamp, universe, fields, values, mask, values[:, fields.index("close")])
+        ctx._events = events
+        return ctx
+
+    def field(self, name: str) -> np.ndarray:
+        return self.values[:, self.fields.index(name)]
+
+    @property
+    def present(self) -> np.ndarray:
+        return np.flatnonzero(self.mask)
+
+    @property
+    def events(self) -> list[MarketEvent]:
+        if self._events is None:
+            symbols = self.universe.symbols
+            self._events = [
+                MarketEvent(symbols[i], self.timestamp, dict(zip(self.fields, self.values[i].tolist())))
+                for i in np.flatnonzero(self.mask)
+            ]
+        return self._events
+
+
+# ---------- lots struct-of-arrays (une entrée par évènement, `ids` = ids de l'univers)
+_EMPTY_IDS = np.empty(0, dtype=np.intp)
+_EMPTY_INT = np.empty(0, dtype=np.int64)
+_EMPTY_FLOAT = np.empty(0)
+
+
+@dataclass(slots=True)
+class SignalBatch:
+    ids: np.ndarray
+    direction: np.ndarray
+    qty: np.ndarray
+    meta: list[dict[str, Any] | None] | None = None   # None si aucun signal n'en porte
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def empty(cls) -> SignalBatch:
+        return cls(_EMPTY_IDS, _EMPTY_INT, _EMPTY_FLOAT)
+
+    @classmethod
+    def from_events(cls, signals: list[SignalEvent], universe: Universe) -> SignalBatch:
+        if not signals:
+            return cls.empty()
+        n = len(signals)
+        meta = [s.meta for s in signals]
+        return cls(
+            universe.ids([s.symbol for s in signals]),
+            np.fromiter((s.direction for s in signals), dtype=np.int64, count=n),
+            np.fromiter((s.qty for s in signals), dtype=float, count=n),
+            meta if any(meta) else None,
+        )
+
+    def to_events(self, ctx: BarContext) -> list[SignalEvent]:
+        symbols = ctx.universe.symbols
+        meta = self.meta or [None] * len(self)
+        return [
+            SignalEvent(symbols[i], ctx.timestamp, d, q, m)
+            for i, d, q, m in zip(self.ids.tolist(), self.direction.tolist(), self.qty.tolist(), meta)
+        ]
+
+    def take(self, keep: np.ndarray) -> SignalBatch:
+        meta = [m for m, k in zip(self.meta, keep.tolist()) if k] if self.meta else None
+        return SignalBatch(self.ids[keep], self.direction[keep], self.qty[keep], meta)
+
+
+@dataclass(slots=True)
+class OrderBatch:
+    """Ordres au marché en colonnes; les ordres limit / stop restent des OrderEvent (`resting`)."""
+    ids: np.ndarray
+    direction: np.ndarray
+    qty: np.ndarray
+    resting: list[OrderEvent] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.ids) + len(self.resting)
+
+    @classmethod
+    def empty(cls) -> OrderBatch:
+        return cls(_EMPTY_IDS, _EMPTY_INT, _EMPTY_FLOAT)
+
+    @classmethod
+    def from_signals(cls, signals: SignalBatch, keep: np.ndarray, ctx: BarContext) -> OrderBatch:
+        """Ordres issus des signaux acceptés (`keep`), comme OrderEvent.from_signal."""
+        if signals.meta is None or not any(m and "order_type" in m for m in signals.meta):
+            return cls(signals.ids[keep], signals.direction[keep], signals.qty[keep])
+        return cls.from_events([OrderEvent.from_signal(s) for s in signals.take(keep).to_events(ctx)], ctx.universe)
+
+    @classmethod
+    def from_events(cls, orders: list[OrderEvent], universe: Universe) -> OrderBatch:
+        market = [o for o in orders if o.order_type == "market"]
+        resting = [o for o in orders if o.order_type != "market"]
+        n = len(market)
+        return cls(
+            universe.ids([o.symbol for o in market]),
+            np.fromiter((o.direction for o in market), dtype=np.int64, count=n),
+            np.fromiter((o.qty for o in market), dtype=float, count=n),
+            resting,
+        )
+
+    def to_events(self, ctx: BarContext) -> list[OrderEvent]:
+        symbols = ctx.universe.symbols
+        market = [
+            OrderEvent(symbols[i], ctx.timestamp, d, q)
+            for i, d, q in zip(self.ids.tolist(), self.direction.tolist(), self.qty.tolist())
+        ]
+        return market + self.resting
+
+
+@dataclass(slots=True)
+class FillBatch:
+    ids: np.ndarray
+    direction: np.ndarray
+    fill_price: np.ndarray
+    qty: np.ndarray
+    commission: np.ndarray
+    slippage: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def empty(cls) -> FillBatch:
+        return cls(_EMPTY_IDS, _EMPTY_INT, _EMPTY_FLOAT, _EMPTY_FLOAT, _EMPTY_FLOAT, _EMPTY_FLOAT)
+
+    @classmethod
+    def from_events(cls, fills: list[FillEvent], universe: Universe) -> FillBatch:
+        if not fills:
+            return cls.empty()
+        n = len(fills)
+        return cls(
+            universe.ids([f.symbol for f in fills]),
+            np.fromiter((f.direction for f in fills), dtype=np.int64, count=n),
+            np.fromiter((f.fill_price for f in fills), dtype=float, count=n),
+            np.fromiter((f.qty for f in fills), dtype=float, count=n),
+            np.fromiter((f.commission for f in fills), dtype=float, count=n),
+            np.fromiter((f.slippage for f in fills), dtype=float, count=n),
+        )
+
+    @staticmethod
+    def concat(a: FillBatch, b: FillBatch) -> FillBatch:
+        if not len(a):
+            return b
+        if not len(b):
+            return a
+        return FillBatch(*(np.concatenate((getattr(a, k), getattr(b, k))) for k in FillBatch.__slots__))
+
+    def to_events(self, ctx: BarContext) -> list[FillEvent]:
+        symbols = ctx.universe.symbols
+        return [
+            FillEvent(symbols[i], ctx.timestamp, d, p, q, c, s)
+            for i, d, p, q, c, s in zip(
+                self.ids.tolist(), self.direction.tolist(), self.fill_price.tolist(),
+                self.qty.tolist(), self.commission.tolist(), self.slippage.tolist(),
+            )
+        ]
+
+
+# ---------- interfaces par lot + adaptateurs pour les composants existants
+class BatchStrategy(Protocol):
+    def on_bar(self, ctx: BarContext) -> SignalBatch:
+        ...
+
+
+class BatchPortfolio(Protocol):
+    def generate_orders_batch(self, signals: SignalBatch, ctx: BarContext) -> OrderBatch:
+        ...
+
+    def update_on_fills_batch(self, fills: FillBatch, ctx: BarContext) -> None:
+        ...
+
+
+class BatchBroker(Protocol):
+    def execute_batch(self, orders: OrderBatch, ctx: BarContext) -> FillBatch:
+        ...
+
+
+class StrategyAdapter:
+    def __init__(self, strategy: Strategy):
+        self.inner = strategy
+
+    def on_bar(self, ctx: BarContext) -> SignalBatch:
+        return SignalBatch.from_events(self.inner.on_market_event(ctx.events), ctx.universe)
+
+
+class PortfolioAdapter:
+    def __init__(self, portfolio: Portfolio):
+        self.inner = portfolio
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)    # cash, positions, ... pour l'API et les observers
+
+    def generate_orders_batch(self, signals: SignalBatch, ctx: BarContext) -> OrderBatch:
+        orders = self.inner.generate_orders(signals.to_events(ctx), ctx.events)
+        return OrderBatch.from_events(orders, ctx.universe)
+
+    def update_on_fills_batch(self, fills: FillBatch, ctx: BarContext) -> None:
+        self.inner.update_on_fill(fills.to_events(ctx), ctx.events)
+
+
+class BrokerAdapter:
+    def __init__(self, broker: Broker):
+        self.inner = broker
+
+    def execute_batch(self, orders: OrderBatch, ctx: BarContext) -> FillBatch:
+        return FillBatch.from_events(self.inner.execute(orders.to_events(ctx), ctx.events), ctx.universe)
+
+
+def as_batch_strategy(strategy) -> BatchStrategy:
+    return strategy if hasattr(strategy, "on_bar") else StrategyAdapter(strategy)
+
+
+def as_batch_portfolio(portfolio) -> BatchPortfolio:
+    return portfolio if hasattr(portfolio, "generate_orders_batch") else PortfolioAdapter(portfolio)
+
+
+def as_batch_broker(broker) -> BatchBroker:
+    return broker if hasattr(broker, "execute_batch") else BrokerAdapter(broker)
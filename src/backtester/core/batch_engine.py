@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from .interfaces import DataHandler, Clock
+from .batch import (
+    BarContext,
+    FillBatch,
+    OrderBatch,
+    SignalBatch,
+    Universe,
+    as_batch_broker,
+    as_batch_portfolio,
+    as_batch_strategy,
+)
+from .engine import BarObserver, EngineConfig
+
+
+class BatchEngine:
+    """Même boucle que BacktestEngine, mais chaque barre est un BarContext construit une fois
+    et passé à toutes les étapes; signaux, ordres et fills circulent en lots struct-of-arrays.
+
+    Les composants sans méthodes par lot (`on_bar`, `generate_orders_batch`/`update_on_fills_batch`,
+    `execute_batch`) sont enveloppés par les adaptateurs de core/batch.py. Un handler qui expose
+    `get_next_batch` (ColumnarMultiSymbolHandler) alimente le contexte sans copie.
+    """
+
+    def __init__(
+        self,
+        data: DataHandler,
+        strategy,
+        portfolio,
+        broker,
+        clock: Clock = None,
+        config: EngineConfig | None = None,
+        analytics: BarObserver | None = None,
+        universe: Universe | None = None,
+    ) -> None:
+        self.data = data
+        self.strategy = as_batch_strategy(strategy)
+        self.portfolio = as_batch_portfolio(portfolio)
+        self.broker = as_batch_broker(broker)
+        self.clock = clock
+        self.config = config or EngineConfig()
+        self.analytics = analytics
+        self.universe = universe or Universe(getattr(data, "symbols", ()))
+        self._columnar = hasattr(data, "get_next_batch")
+        if self._columnar and list(self.universe.symbols[: len(data.symbols)]) != list(data.symbols):
+            raise ValueError("universe must start with the handler's symbols, in the same order")
+        self.last_bar: tuple[BarContext, SignalBatch, OrderBatch, FillBatch] | None = None
+
+    def run(self) -> None:
+        iterator = self.clock if self.clock else iter(int, 1)
+        for _ in iterator:
+            if self.step() is None:
+                break
+
+    def step(self) -> BarContext | None:
+        """Avance d'une barre. Retourne le contexte de la barre, ou None si plus de données."""
+        if not self.data.has_next():
+            return None
+        if self._columnar:
+            ctx = BarContext.from_batch(self.data.get_next_batch(), self.universe)
+        else:
+            ctx = BarContext.from_events(self.data.get_next(), self.universe)
+        signals = self.strategy.on_bar(ctx)
+        orders = self.portfolio.generate_orders_batch(signals, ctx) if len(signals) else OrderBatch.empty()
+        fills = self.broker.execute_batch(orders, ctx)
+        self.portfolio.update_on_fills_batch(fills, ctx)
+        if self.analytics is not None:
+            self.analytics.on_bar(ctx.events, fills.to_events(ctx), self.portfolio)
+        self.last_bar = (ctx, signals, orders, fills)
+        if self.config.verbose:
+            print(f"At {ctx.timestamp}:")
+            print(self.portfolio)
+        return ctx
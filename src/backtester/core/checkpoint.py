@@ -0,0 +1,100 @@
+from __future__ import annotations
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from .interfaces import DataHandler
+
+
+@dataclass
+class Snapshot:
+    """État d'un BacktestEngine après `bar` barres (composants picklés, sans les données)."""
+    bar: int
+    timestamp: Any
+    payload: bytes
+    created: float = field(default_factory=time.time)
+
+    @classmethod
+    def capture(cls, bar: int, timestamp, components: dict[str, Any]) -> Snapshot:
+        return cls(bar, timestamp, pickle.dumps(components, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def restore(self) -> dict[str, Any]:
+        """Nouvelles copies des composants à chaque appel (un fork ne modifie pas les autres)."""
+        return pickle.loads(self.payload)
+
+    def save(self, path: str) -> None:
+        # écrit à côté puis renomme: un crash pendant l'écriture laisse le checkpoint précédent intact
+        tmp = f"{path}.tmp{os.getpid()}"
+        with open(tmp, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def load(path: str) -> Snapshot:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+def seek(data: DataHandler, n: int) -> None:
+    """Place `data` (neuf) après ses `n` premières barres: `data.seek(n)` si le handler sait le faire,
+    sinon en consommant les barres (nécessaire quand le handler a un état, ex: IndicatorDataHandler)."""
+    if hasattr(data, "seek"):
+        data.seek(n)
+        return
+    for i in range(n):
+        if not data.has_next():
+            raise ValueError(f"Data handler has only {i} bars, snapshot is at bar {n}")
+        data.get_next()
+
+
+def final_state(engine) -> dict[str, Any]:
+    """Résultat par défaut d'un fork."""
+    p = engine.portfolio
+    equity = getattr(p, "equity_curve", None)
+    return {
+        "bars": engine.bars,
+        "cash": p.cash,
+        "net_liquidation_value": p.net_liquidation_value,
+        "equity_curve": list(equity) if equity is not None else None,
+    }
+
+
+def _run_variant(
+    snapshot: Snapshot,
+    data_factory: Callable[[], DataHandler],
+    mutate: Callable[[Any], None] | None,
+    collect: Callable[[Any], Any],
+) -> Any:
+    from .engine import BacktestEngine          # engine importe ce module
+
+    engine = BacktestEngine.from_snapshot(snapshot, data_factory())
+    if mutate is not None:
+        mutate(engine)
+    while engine.step() is not None:
+        pass
+    return collect(engine)
+
+
+def fork(
+    snapshot: Snapshot,
+    data_factory: Callable[[], DataHandler],
+    variants: dict[str, Callable[[Any], None] | None],
+    collect: Callable[[Any], Any] = final_state,
+    max_workers: int | None = None,
+) -> dict[str, Any]:
+    """Lance chaque variante depuis le même snapshot, en parallèle: le préfixe n'est simulé qu'une fois.
+
+    `variants`: nom -> fonction qui modifie l'engine repris avant de continuer (ex: changer les
+    paramètres de la stratégie), None pour la continuation telle quelle. `data_factory` construit un
+    handler neuf sur les mêmes données. Fonctions et factory doivent être picklables (niveau module,
+    functools.partial). Retourne nom -> collect(engine) en fin de run.
+    """
+    names = list(variants)
+    if max_workers == 1 or len(names) <= 1:
+        return {n: _run_variant(snapshot, data_factory, variants[n], collect) for n in names}
+    with ProcessPoolExecutor(max_workers=min(len(names), max_workers or os.cpu_count() or 1)) as pool:
+        futures = {n: pool.submit(_run_variant, snapshot, data_factory, variants[n], collect) for n in names}
+        return {n: f.result() for n, f in futures.items()}
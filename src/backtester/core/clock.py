@@ -1,16 +1,26 @@
 from __future__ import annotations
 import pandas as pd
-from typing import Iterator
+from typing import Iterable, Iterator
 
 class TradingClock:
     """Itérateur sur les timestamps de trading.
 
-    Peut être alimenté par un DatetimeIndex filtré (jours ouvrés, horaires spécifiques).
+    Peut être alimenté par un DatetimeIndex filtré (jours ouvrés, horaires spécifiques),
+    ou par n'importe quel itérable de timestamps (voir `from_stream`).
     """
 
-    def __init__(self, timestamps: pd.DatetimeIndex):
+    def __init__(self, timestamps: Iterable[pd.Timestamp]):
         self._ts = timestamps
 
+    @classmethod
+    def from_stream(cls, handler) -> TradingClock:
+        """Horloge qui suit un handler en streaming (ex: StreamingDataHandler): chaque tick est le
+        timestamp de la prochaine barre du handler, lu sans la consommer. Rien n'est matérialisé."""
+        def ticks() -> Iterator[pd.Timestamp]:
+            while handler.has_next():
+                yield handler.peek_timestamp()
+        return cls(ticks())
+
     def __iter__(self) -> Iterator[pd.Timestamp]:
         for ts in self._ts:
-            yield ts
\ No newline at end of file
+            yield ts
@@ -1,13 +1,26 @@
 from __future__ import annotations
+import itertools
 from dataclasses import dataclass
-from typing import Iterable
+from typing import Iterable, Protocol
 
 from .interfaces import DataHandler, Strategy, Broker, Clock, Portfolio
 from .events import MarketEvent, SignalEvent, OrderEvent, FillEvent
+from .profiling import NULL_PROFILER, StageProfiler
+from .checkpoint import Snapshot, seek
+
+class BarObserver(Protocol):
+    """Appelé en fin de barre (ex: analytics.online.OnlineMetrics)."""
+
+    def on_bar(self, market_events: list[MarketEvent], fills: list[FillEvent], portfolio: Portfolio) -> None:
+        ...
 
 @dataclass
 class EngineConfig:
     verbose: bool = False
+    profile: bool = False                   # compteurs par étape (engine.profiler); rapport: à l'appelant
+    trace_malloc: bool = False              # + octets alloués par étape via tracemalloc (coûteux)
+    checkpoint_every: int = 0               # run(): snapshot toutes les N barres dans checkpoint_path (0: jamais)
+    checkpoint_path: str | None = None
 
 class BacktestEngine:
     def __init__(
@@ -18,6 +31,7 @@ class BacktestEngine:
         broker: Broker,
         clock: Clock = None,
         config: EngineConfig | None = None,
+        analytics: BarObserver | None = None,
     ) -> None:
         self.data = data
         self.strategy = strategy
@@ -25,17 +39,94 @@ class BacktestEngine:
         self.broker = broker
         self.clock = clock
         self.config = config or EngineConfig()
+        self.analytics = analytics
+        self.profiler: StageProfiler | None = (
+            StageProfiler(trace_malloc=self.config.trace_malloc) if self.config.profile else None
+        )
+        self.last_bar: tuple[list[MarketEvent], list[SignalEvent], list[OrderEvent], list[FillEvent]] | None = None
+        self.bars = 0                       # barres traitées (position du snapshot)
+        self._clock_skip = 0                # ticks d'horloge déjà consommés avant une reprise
 
     def run(self) -> None:
         iterator = self.clock if self.clock else iter(int, 1)
+        if self._clock_skip:
+            iterator = itertools.islice(iterator, self._clock_skip, None)
+            self._clock_skip = 0
+        every, path = self.config.checkpoint_every, self.config.checkpoint_path
         for _ in iterator:
-            if not self.data.has_next():
+            if self.step() is None:
                 break
-            market_events = self.data.get_next()
-            signals = self.strategy.on_market_event(market_events)
-            orders = self.portfolio.generate_orders(signals, market_events)
-            fills = self.broker.execute(orders, market_events)
-            self.portfolio.update_on_fill(fills, market_events)
-            if self.config.verbose:
-                print(f"At {market_events[0].timestamp}:")
-                print(self.portfolio)
\ No newline at end of file
+            if every and path and self.bars % every == 0:
+                self.snapshot().save(path)
+        if self.profiler is not None:
+            self.profiler.stop()            # summary()/report() lus par l'appelant (CLI, API, bench)
+
+    def step(self) -> list[MarketEvent] | None:
+        """Avance d'une barre. Retourne les market events traités, ou None si plus de données.
+
+        Les sorties de chaque étape restent disponibles dans `last_bar`.
+        """
+        prof = self.profiler or NULL_PROFILER     # mesures sans effet si le profiling est désactivé
+        start = t = prof.mark()
+        if not self.data.has_next():
+            return None
+        market_events = self.data.get_next()
+        t = prof.lap("get_next", t)
+        signals = self.strategy.on_market_event(market_events)
+        t = prof.lap("on_market_event", t)
+        orders = self.portfolio.generate_orders(signals, market_events)
+        t = prof.lap("generate_orders", t)
+        fills = self.broker.execute(orders, market_events)
+        t = prof.lap("execute", t)
+        self.portfolio.update_on_fill(fills, market_events)
+        t = prof.lap("update_on_fill", t)
+        if self.analytics is not None:
+            self.analytics.on_bar(market_events, fills, self.portfolio)
+            t = prof.lap("analytics", t)
+        prof.end_bar(start, t, len(market_events))
+        self.last_bar = (market_events, signals, orders, fills)
+        self.bars += 1
+        if self.config.verbose:
+            print(f"At {market_events[0].timestamp}:")
+            print(self.portfolio)
+        return market_events
+
+    # ---------- snapshots (core/checkpoint.py)
+    def snapshot(self) -> Snapshot:
+        """État complet après `self.bars` barres: stratégie, portefeuille, broker, analytics.
+
+        Le handler n'est pas sérialisé (données volumineuses, partagées entre forks): seule sa
+        position l'est, il est repositionné à la reprise.
+        """
+        timestamp = self.last_bar[0][0].timestamp if self.last_bar and self.last_bar[0] else None
+        return Snapshot.capture(
+            self.bars,
+            timestamp,
+            {
+                "strategy": self.strategy,
+                "portfolio": self.portfolio,
+                "broker": self.broker,
+                "analytics": self.analytics,
+            },
+        )
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        snapshot: Snapshot,
+        data: DataHandler,
+        clock: Clock = None,
+        config: EngineConfig | None = None,
+    ) -> BacktestEngine:
+        """Reprend un run: `data` est un handler neuf sur les mêmes données (et `clock` la même horloge),
+        repositionnés après les barres du snapshot. Chaque appel rend des composants indépendants."""
+        state = snapshot.restore()
+        engine = cls(data, state["strategy"], state["portfolio"], state["broker"], clock, config, state["analytics"])
+        seek(data, snapshot.bar)
+        engine.bars = engine._clock_skip = snapshot.bar
+        return engine
+
+    @classmethod
+    def resume(cls, path: str, data: DataHandler, clock: Clock = None, config: EngineConfig | None = None) -> BacktestEngine:
+        """Reprise après crash depuis le dernier checkpoint écrit par run()."""
+        return cls.from_snapshot(Snapshot.load(path), data, clock, config)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any
+import numpy as np
 import pandas as pd
 
 @dataclass(slots=True)
@@ -23,8 +24,28 @@ class OrderEvent:
     timestamp: pd.Timestamp
     direction: int                          # +1 long, -1 short, 0 flat
     qty: float                              # asset qty, not notional
-    order_type: str = "market"
+    order_type: str = "market"              # "market" | "limit" | "stop"
     limit_price: float | None = None
+    stop_price: float | None = None
+    tif: str = "gtc"                        # "gtc" | "day" (ordres limit/stop seulement)
+    order_id: int | None = None             # attribué par le broker
+
+    @classmethod
+    def from_signal(cls, signal: SignalEvent) -> OrderEvent:
+        """Ordre au marché, sauf si `signal.meta` porte order_type / limit_price / stop_price / tif."""
+        meta = signal.meta
+        if not meta or "order_type" not in meta:
+            return cls(signal.symbol, signal.timestamp, signal.direction, signal.qty)
+        return cls(
+            signal.symbol,
+            signal.timestamp,
+            signal.direction,
+            signal.qty,
+            order_type=meta["order_type"],
+            limit_price=meta.get("limit_price"),
+            stop_price=meta.get("stop_price"),
+            tif=meta.get("tif", "gtc"),
+        )
 
 @dataclass(slots=True)
 class FillEvent:
@@ -34,4 +55,23 @@ class FillEvent:
     fill_price: float                       
     qty : float                             # asset qty, not notional
     commission: float = 0.0
-    slippage: float = 0.0
\ No newline at end of file
+    slippage: float = 0.0
+
+@dataclass(slots=True)
+class MarketBatch:
+    """Coupe transversale: tous les symboles d'un timestamp, en colonnes."""
+    timestamp: pd.Timestamp
+    symbols: np.ndarray                     # (S,)
+    fields: tuple[str, ...]
+    values: np.ndarray                      # (S, F), NaN si absent
+    mask: np.ndarray                        # (S,) True si le symbole a des données à ce timestamp
+
+    def field(self, name: str) -> np.ndarray:
+        return self.values[:, self.fields.index(name)]
+
+    def to_events(self) -> list[MarketEvent]:
+        """Adaptateur vers l'API MarketEvent (un dict par symbole présent)."""
+        return [
+            MarketEvent(str(self.symbols[i]), self.timestamp, dict(zip(self.fields, self.values[i].tolist())))
+            for i in np.flatnonzero(self.mask)
+        ]
@@ -0,0 +1,174 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .interfaces import DataHandler, Strategy, Portfolio, Broker
+from .events import MarketEvent, FillEvent
+from src.backtester.analytics.online import batch_metrics
+
+
+@dataclass
+class StackResult:
+    name: str
+    equity: np.ndarray                      # cash + NLV après chaque barre
+    cash: float
+    net_liquidation_value: float
+    n_fills: int
+
+
+class _EquityMatrix:
+    """Equity (K, T) de K stacks, colonnes ajoutées barre par barre (capacité doublée au besoin)."""
+
+    def __init__(self, k: int, capacity: int = 1024):
+        self.values = np.empty((k, capacity))
+        self.n = 0
+
+    def append(self, column: np.ndarray) -> None:
+        if self.n == self.values.shape[1]:
+            grown = np.empty((self.values.shape[0], 2 * self.n))
+            grown[:, : self.n] = self.values
+            self.values = grown
+        self.values[:, self.n] = column
+        self.n += 1
+
+    def view(self) -> np.ndarray:
+        return self.values[:, : self.n]
+
+
+class Stack:
+    """Une pile stratégie / portefeuille / broker classique (objets indépendants)."""
+
+    def __init__(self, name: str, strategy: Strategy, portfolio: Portfolio, broker: Broker):
+        self.names = [name]
+        self.strategy = strategy
+        self.portfolio = portfolio
+        self.broker = broker
+        self.n_fills = 0
+        self._equity = _EquityMatrix(1)
+
+    def on_bar(self, market_events: list[MarketEvent]) -> list[FillEvent]:
+        signals = self.strategy.on_market_event(market_events)
+        orders = self.portfolio.generate_orders(signals, market_events)
+        fills = self.broker.execute(orders, market_events)
+        self.portfolio.update_on_fill(fills, market_events)
+        self.n_fills += len(fills)
+        self._equity.append(np.array([self.portfolio.cash + self.portfolio.net_liquidation_value]))
+        return fills
+
+    def results(self) -> list[StackResult]:
+        p = self.portfolio
+        return [StackResult(self.names[0], self._equity.view()[0], p.cash, p.net_liquidation_value, self.n_fills)]
+
+
+class PERatioStacks:
+    """K variantes de PERatioStrategy + SimplePortfolio + SimulatedBroker (ordres au marché), en tableaux.
+
+    Mêmes règles et mêmes opérations flottantes que la pile objet, mais l'état de toutes les variantes
+    (cash, qty, prix moyen) tient dans des vecteurs de longueur K mis à jour ensemble à chaque barre.
+    Un seul symbole (le premier event de la barre), comme PERatioStrategy.
+    """
+
+    def __init__(
+        self,
+        params: Sequence[Any],
+        initial_cash: float,
+        commission: float = 0.0,
+        slippage_bp: float = 0.0,
+        names: Sequence[str] | None = None,
+    ):
+        k = len(params)
+        self.names = list(names) if names is not None else [f"pe_{i}" for i in range(k)]
+        self.hi = np.array([p.hi for p in params], dtype=float)
+        self.lo = np.array([p.lo for p in params], dtype=float)
+        self.budget = np.array([p.pct for p in params], dtype=float) * initial_cash
+        self.commission = commission
+        self.slip_rate = slippage_bp / 10_000.0
+        self.cash = np.full(k, float(initial_cash))
+        self.qty = np.zeros(k)
+        self.avg_price = np.zeros(k)
+        self.net_liquidation_value = np.zeros(k)
+        self.n_fills = np.zeros(k, dtype=np.int64)
+        self._equity = _EquityMatrix(k)
+
+    def on_bar(self, market_events: list[MarketEvent]) -> None:
+        data = market_events[0].data
+        pe, px = data["pe"], data["close"]
+        q = self.budget / px
+        buy = (pe < self.lo) & ~(pe > self.hi) & (self.cash >= q * px)
+        sell = (pe > self.hi) & (self.qty >= q)
+        if buy.any() or sell.any():
+            slip_per_unit = px * self.slip_rate
+            slippage = np.abs(slip_per_unit * q)
+            buy_price = px + slip_per_unit
+            sell_price = px - slip_per_unit
+            new_qty = np.where(buy, self.qty + q, np.where(sell, np.maximum(0.0, self.qty - q), self.qty))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                bought_avg = (self.avg_price * self.qty + buy_price * q) / new_qty
+            self.avg_price = np.where(buy, bought_avg, np.where(sell & (new_qty == 0), 0.0, self.avg_price))
+            self.cash = np.where(buy, self.cash - (buy_price * q + self.commission + slippage), self.cash)
+            self.cash = np.where(sell, self.cash + (sell_price * q - self.commission - slippage), self.cash)
+            self.qty = new_qty
+            self.n_fills += buy | sell
+        self.net_liquidation_value = self.qty * px
+        self._equity.append(self.cash + self.net_liquidation_value)
+
+    def results(self) -> list[StackResult]:
+        equity = self._equity.view()
+        return [
+            StackResult(name, equity[i], float(self.cash[i]), float(self.net_liquidation_value[i]), int(self.n_fills[i]))
+            for i, name in enumerate(self.names)
+        ]
+
+
+class MultiplexEngine:
+    """Une passe sur les données pour K piles: chaque barre est décodée une fois (un seul appel
+    `get_next`, mêmes MarketEvent pour toutes les piles) puis distribuée.
+
+    `stacks` mélange des Stack (objets quelconques, ex: CorrelStrategy) et des groupes en tableaux
+    (PERatioStacks). Indicateurs partagés: envelopper `data` dans un IndicatorDataHandler (calculés
+    une fois par barre pour toutes les piles) et/ou passer l'IndicatorSet lu par les stratégies.
+    Les piles ne doivent pas modifier les events reçus.
+    """
+
+    def __init__(self, data: DataHandler, stacks: Sequence[Any], indicators=None):
+        names = [n for s in stacks for n in s.names]
+        if len(set(names)) != len(names):
+            raise ValueError("Stack names must be unique")
+        self.data = data
+        self.stacks = list(stacks)
+        self.indicators = indicators
+        self.bars = 0
+        self.index: list[pd.Timestamp] = []
+
+    def step(self) -> list[MarketEvent] | None:
+        if not self.data.has_next():
+            return None
+        market_events = self.data.get_next()
+        if self.indicators is not None:
+            self.indicators.update(market_events)
+        for stack in self.stacks:
+            stack.on_bar(market_events)
+        self.index.append(market_events[0].timestamp)
+        self.bars += 1
+        return market_events
+
+    def run(self) -> list[StackResult]:
+        while self.step() is not None:
+            pass
+        return self.results()
+
+    def results(self) -> list[StackResult]:
+        return [r for stack in self.stacks for r in stack.results()]
+
+    def summary(self, periods_per_year: int = 252) -> pd.DataFrame:
+        """Une ligne par pile: métriques de analytics.online.batch_metrics calculées sur la matrice (K, T)."""
+        results = self.results()
+        equity = np.vstack([r.equity for r in results]) if results else np.empty((0, 0))
+        metrics = batch_metrics(equity, periods_per_year)
+        table = pd.DataFrame(metrics, index=pd.Index([r.name for r in results], name="stack"))
+        table["final_equity"] = equity[:, -1] if equity.size else np.nan
+        table["n_fills"] = [r.n_fills for r in results]
+        return table
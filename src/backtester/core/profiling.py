@@ -0,0 +1,152 @@
+from __future__ import annotations
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+STAGES = ("get_next", "on_market_event", "generate_orders", "execute", "update_on_fill", "analytics")
+
+StageHook = Callable[[str, int], None]      # (stage, durée en ns)
+
+
+class StageStats:
+    __slots__ = ("calls", "total_ns", "max_ns", "blocks", "bytes", "histogram")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.blocks = 0                     # delta net de sys.getallocatedblocks: < 0 si l'étape libère plus qu'elle n'alloue
+        self.bytes = 0                      # octets nets (tracemalloc, si activé)
+        self.histogram = [0] * 64           # bucket k: durées dans [2^(k-1), 2^k) ns
+
+    def percentile_ns(self, q: float) -> float:
+        """Quantile `q` estimé par interpolation linéaire dans son bucket log2 (borné par max_ns)."""
+        target = q * self.calls
+        seen = 0
+        for k, count in enumerate(self.histogram):
+            if count and seen + count >= target:
+                lo = (1 << k) >> 1
+                return min(lo + (target - seen) / count * ((1 << k) - lo), self.max_ns)
+            seen += count
+        return 0.0
+
+
+class StageProfiler:
+    """Compteurs par étape de BacktestEngine.step: latences cumulées + histogramme log2 (p50/p99
+    interpolés dans le bucket), variation nette du nombre de blocs alloués par étape, débit global. Les hooks reçoivent chaque mesure.
+
+    Activé via EngineConfig(profile=True); désactivé, l'engine appelle NULL_PROFILER (mêmes méthodes, sans effet).
+    """
+
+    def __init__(self, trace_malloc: bool = False, hooks: list[StageHook] | None = None):
+        self.stages: dict[str, StageStats] = {name: StageStats() for name in STAGES}
+        self.hooks: list[StageHook] = list(hooks or [])
+        self.trace_malloc = trace_malloc
+        self.bars = 0
+        self.market_events = 0
+        self.wall_ns = 0
+        self._started_tracemalloc = False
+        if trace_malloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def add_hook(self, hook: StageHook) -> None:
+        self.hooks.append(hook)
+
+    def record(self, stage: str, elapsed_ns: int, blocks: int = 0, nbytes: int = 0) -> None:
+        s = self.stages.get(stage)
+        if s is None:
+            s = self.stages[stage] = StageStats()
+        s.calls += 1
+        s.total_ns += elapsed_ns
+        if elapsed_ns > s.max_ns:
+            s.max_ns = elapsed_ns
+        s.blocks += blocks
+        s.bytes += nbytes
+        s.histogram[min(63, elapsed_ns.bit_length())] += 1
+        for hook in self.hooks:
+            hook(stage, elapsed_ns)
+
+    # mesure: (ns, blocs, octets) au point courant
+    def mark(self) -> tuple[int, int, int]:
+        nbytes = tracemalloc.get_traced_memory()[0] if self.trace_malloc else 0
+        return time.perf_counter_ns(), sys.getallocatedblocks(), nbytes
+
+    def lap(self, stage: str, start: tuple[int, int, int]) -> tuple[int, int, int]:
+        now = self.mark()
+        self.record(stage, now[0] - start[0], now[1] - start[1], now[2] - start[2])
+        return self.mark()                  # exclut le coût de record/hooks de l'étape suivante
+
+    def end_bar(self, start: tuple[int, int, int], end: tuple[int, int, int], market_events: int) -> None:
+        self.bars += 1
+        self.market_events += market_events
+        self.wall_ns += end[0] - start[0]
+
+    def stop(self) -> None:
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def summary(self) -> dict:
+        wall_s = self.wall_ns / 1e9
+        out = {
+            "bars": self.bars,
+            "market_events": self.market_events,
+            "wall_seconds": wall_s,
+            "bars_per_second": self.bars / wall_s if wall_s else None,
+            "events_per_second": self.market_events / wall_s if wall_s else None,
+            "stages": {},
+        }
+        for name, s in self.stages.items():
+            if not s.calls:
+                continue
+            out["stages"][name] = {
+                "calls": s.calls,
+                "total_seconds": s.total_ns / 1e9,
+                "share": s.total_ns / self.wall_ns if self.wall_ns else None,
+                "mean_us": s.total_ns / s.calls / 1e3,
+                "p50_us": s.percentile_ns(0.50) / 1e3,
+                "p99_us": s.percentile_ns(0.99) / 1e3,
+                "max_us": s.max_ns / 1e3,
+                "net_blocks": s.blocks,
+                "alloc_bytes": s.bytes if self.trace_malloc else None,
+            }
+        return out
+
+    def report(self) -> str:
+        return format_summary(self.summary())
+
+
+class _NullProfiler:
+    """Profiler désactivé: BacktestEngine.step garde un seul corps, chaque mesure est un appel vide."""
+
+    __slots__ = ()
+
+    def mark(self) -> None:
+        return None
+
+    def lap(self, stage: str, start: None) -> None:
+        return None
+
+    def end_bar(self, start: None, end: None, market_events: int) -> None:
+        pass
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+def format_summary(summ: dict) -> str:
+    """Tableau texte d'un StageProfiler.summary() (le rapport est laissé à l'appelant: CLI, bench)."""
+    lines = [
+        f"{summ['bars']} bars, {summ['market_events']} market events in {summ['wall_seconds']:.3f}s "
+        f"({summ['bars_per_second'] or 0:,.0f} bars/s, {summ['events_per_second'] or 0:,.0f} events/s)",
+        f"{'stage':<18}{'total s':>10}{'share':>8}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}"
+        f"{'max us':>10}{'net blk':>10}",
+    ]
+    for name, s in summ["stages"].items():
+        lines.append(
+            f"{name:<18}{s['total_seconds']:>10.4f}{(s['share'] or 0):>8.1%}{s['mean_us']:>10.2f}"
+            f"{s['p50_us']:>10.2f}{s['p99_us']:>10.2f}{s['max_us']:>10.1f}{s['net_blocks']:>10}"
+        )
+    return "\n".join(lines)
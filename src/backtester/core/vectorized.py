@@ -0,0 +1,164 @@
+from __future__ import annotations
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .engine import BacktestEngine
+from src.backtester.strategy.base import BaseStrategy
+from src.backtester.execution.broker_sim import SimulatedBroker
+
+
+@dataclass
+class VectorizedResult:
+    """Résultat barre par barre du chemin vectorisé (un seul symbole)."""
+    symbol: str
+    index: pd.DatetimeIndex
+    close: np.ndarray
+    position: np.ndarray                    # qty détenue après chaque barre
+    cash: np.ndarray
+    net_liquidation_value: np.ndarray
+    fills: pd.DataFrame                     # une ligne par fill: direction, qty, fill_price, commission, slippage
+
+    @property
+    def equity(self) -> np.ndarray:
+        return self.cash + self.net_liquidation_value
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "close": self.close,
+                "position": self.position,
+                "cash": self.cash,
+                "net_liquidation_value": self.net_liquidation_value,
+                "equity": self.equity,
+            },
+            index=self.index,
+        )
+
+
+class VectorizedEngine:
+    """Chemin rapide: exécute une stratégie sur tout l'historique d'un coup.
+
+    Reproduit la sémantique de BacktestEngine + SimplePortfolio + SimulatedBroker:
+    fill au close (+/- slippage), achat seulement si le cash couvre `qty * close`,
+    vente seulement si la position couvre `qty`. Ces deux contraintes dépendent du chemin,
+    donc seules les barres portant un signal passent par une boucle scalaire;
+    signaux, positions, cash et mark-to-market sont calculés en NumPy.
+    """
+
+    def __init__(
+        self,
+        bars: pd.DataFrame,
+        strategy: BaseStrategy,
+        symbol: str,
+        initial_cash: float,
+        broker: SimulatedBroker | None = None,
+    ) -> None:
+        self.bars = bars
+        self.strategy = strategy
+        self.symbol = symbol
+        self.initial_cash = initial_cash
+        self.broker = broker or SimulatedBroker()
+
+    def run(self) -> VectorizedResult:
+        signals = self.strategy.generate_signals(self.bars)
+        close = self.bars["close"].to_numpy(dtype=float)
+        direction = signals["direction"].to_numpy(dtype=np.int64)
+        qty = signals["qty"].to_numpy(dtype=float)
+
+        n = len(close)
+        cash_delta = np.zeros(n)
+        qty_delta = np.zeros(n)
+        slip_rate = self.broker.slippage_bp / 10_000.0
+        commission = self.broker.commission
+
+        fill_idx: list[int] = []
+        fill_prices: list[float] = []
+        fill_slippage: list[float] = []
+        cash = self.initial_cash
+        held = 0.0
+        for i in np.flatnonzero(direction):
+            d, q, px = int(direction[i]), qty[i], close[i]
+            if d == 1 and not cash >= q * px:
+                continue
+            if d == -1 and not held >= q:
+                continue
+            slip_per_unit = px * slip_rate
+            fill_price = px + slip_per_unit * (1 if d > 0 else -1)
+            slippage = abs(slip_per_unit * q)
+            if d == 1:
+                cash_delta[i] = -(fill_price * q + commission + slippage)
+                new_held = held + q
+            else:
+                cash_delta[i] = fill_price * q - commission - slippage
+                new_held = max(0.0, held - q)
+            qty_delta[i] = new_held - held
+            held = new_held
+            cash = cash + cash_delta[i]
+            fill_idx.append(i)
+            fill_prices.append(fill_price)
+            fill_slippage.append(slippage)
+
+        # cumsum additionne dans le même ordre que le portefeuille événementiel
+        cash_curve = np.cumsum(np.concatenate(([self.initial_cash], cash_delta)))[1:]
+        position = np.cumsum(qty_delta)
+
+        fill_idx_arr = np.asarray(fill_idx, dtype=np.int64)
+        fills = pd.DataFrame(
+            {
+                "direction": direction[fill_idx_arr],
+                "qty": qty[fill_idx_arr],
+                "fill_price": np.asarray(fill_prices, dtype=float),
+                "commission": np.full(len(fill_idx_arr), commission),
+                "slippage": np.asarray(fill_slippage, dtype=float),
+            },
+            index=self.bars.index[fill_idx_arr],
+        )
+
+        return VectorizedResult(
+            symbol=self.symbol,
+            index=self.bars.index,
+            close=close,
+            position=position,
+            cash=cash_curve,
+            net_liquidation_value=position * close,
+            fills=fills,
+        )
+
+
+def assert_matches_event_engine(
+    result: VectorizedResult,
+    engine: BacktestEngine,
+    atol: float = 1e-6,
+) -> None:
+    """Rejoue `engine` (neuf, mêmes entrées) barre par barre et compare cash, position et NLV.
+
+    Lève AssertionError sur la première barre divergente.
+    """
+    n = len(result.index)
+    cash = np.empty(n)
+    position = np.empty(n)
+    nlv = np.empty(n)
+    i = 0
+    while i < n and engine.step() is not None:
+        pos = engine.portfolio.positions.get(result.symbol)
+        cash[i] = engine.portfolio.cash
+        position[i] = pos.qty if pos is not None else 0.0
+        nlv[i] = engine.portfolio.net_liquidation_value
+        i += 1
+    if i != n or engine.data.has_next():
+        raise AssertionError(f"bar count mismatch: vectorized={n}, event-driven={i}+")
+
+    for name, expected, got in (
+        ("cash", cash, result.cash),
+        ("position", position, result.position),
+        ("net_liquidation_value", nlv, result.net_liquidation_value),
+    ):
+        bad = np.flatnonzero(~np.isclose(got, expected, rtol=0.0, atol=atol))
+        if bad.size:
+            j = bad[0]
+            raise AssertionError(
+                f"{name} mismatch at bar {j} ({result.index[j]}): "
+                f"event-driven={expected[j]!r}, vectorized={got[j]!r}"
+            )
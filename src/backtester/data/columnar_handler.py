@@ -0,0 +1,95 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+from src.backtester.core.interfaces import DataHandler
+from src.backtester.core.events import MarketEvent, MarketBatch
+from src.backtester.data.loaders.base_loader import BaseLoader
+
+
+def _clean(df: pd.DataFrame) -> pd.DataFrame:
+    # lignes sans date (ex: la ligne ",^GSPC" de sp500_close.csv) inutilisables
+    return df[df.index.notna()].sort_index()
+
+
+def wide_to_cube(
+    df: pd.DataFrame, field: str = "close", sep: str | None = None
+) -> tuple[pd.DatetimeIndex, np.ndarray, tuple[str, ...], np.ndarray]:
+    """Layout large -> cube (T, S, F).
+
+    Sans `sep`, chaque colonne est un symbole et porte le champ `field`.
+    Avec `sep`, les colonnes sont nommées `<symbole><sep><champ>` (ex: "AAPL.close").
+    """
+    df = _clean(df)
+    if sep is None:
+        pairs = [(str(c), field) for c in df.columns]
+    else:
+        pairs = [tuple(str(c).rsplit(sep, 1)) for c in df.columns]
+        bad = [c for c, p in zip(df.columns, pairs) if len(p) != 2]
+        if bad:
+            raise ValueError(f"Columns without '{sep}' separator: {bad}")
+    s_codes, symbols = pd.factorize(pd.Index([p[0] for p in pairs]))
+    f_codes, fields = pd.factorize(pd.Index([p[1] for p in pairs]))
+    values = df.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    cube = np.full((len(df.index), len(symbols), len(fields)), np.nan)
+    cube[:, s_codes, f_codes] = values
+    return pd.DatetimeIndex(df.index), np.asarray(symbols, dtype=object), tuple(fields), cube
+
+
+def long_to_cube(
+    df: pd.DataFrame, symbol_col: str = "symbol", fields: list[str] | None = None
+) -> tuple[pd.DatetimeIndex, np.ndarray, tuple[str, ...], np.ndarray]:
+    """Layout long (une ligne par date x symbole) -> cube (T, S, F). Doublons: dernière ligne gagne."""
+    df = _clean(df)
+    if fields is None:
+        fields = [c for c in df.columns if c != symbol_col]
+    t_codes, index = pd.factorize(df.index, sort=True)
+    s_codes, symbols = pd.factorize(df[symbol_col], sort=True)
+    cube = np.full((len(index), len(symbols), len(fields)), np.nan)
+    cube[t_codes, s_codes, :] = df[fields].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    return pd.DatetimeIndex(index), np.asarray(symbols, dtype=object), tuple(fields), cube
+
+
+class ColumnarMultiSymbolHandler(DataHandler):
+    """Handler multi-symboles adossé à un cube NumPy (temps x symbole x champ).
+
+    `get_next_batch` renvoie une MarketBatch par timestamp (vues sur le cube, aucun dict construit);
+    `get_next` reste disponible pour les stratégies qui consomment des MarketEvent.
+    Un symbole absent à une date a des valeurs NaN et `mask=False`.
+    """
+
+    def __init__(
+        self,
+        loader: BaseLoader,
+        layout: str = "wide",
+        field: str = "close",
+        sep: str | None = None,
+        symbol_col: str = "symbol",
+        fields: list[str] | None = None,
+    ):
+        df = loader.load()
+        if layout == "wide":
+            cube = wide_to_cube(df, field=field, sep=sep)
+        elif layout == "long":
+            cube = long_to_cube(df, symbol_col=symbol_col, fields=fields)
+        else:
+            raise ValueError(f"Unknown layout '{layout}' (expected 'wide' or 'long')")
+        self.index, self.symbols, self.fields, self.values = cube
+        self.mask = ~np.isnan(self.values).all(axis=2)
+        self._i = 0
+
+    def has_next(self) -> bool:
+        return self._i < len(self.index)
+
+    def seek(self, n: int) -> None:
+        self._i = min(n, len(self.index))
+
+    def get_next_batch(self) -> MarketBatch:
+        if self._i >= len(self.index):
+            raise StopIteration("No more data")
+        i = self._i
+        self._i += 1
+        return MarketBatch(self.index[i], self.symbols, self.fields, self.values[i], self.mask[i])
+
+    def get_next(self) -> list[MarketEvent]:
+        return self.get_next_batch().to_events()
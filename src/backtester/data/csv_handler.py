@@ -1,3 +1,4 @@
+import pandas as pd
 from src.backtester.core.interfaces import DataHandler
 from src.backtester.data.loaders.csv_loader import CSVLoader
 from src.backtester.core.events import MarketEvent
@@ -29,6 +30,15 @@ class PERatioSingleCSVDataHandler(DataHandler):
         self._next_row = None
         return [MarketEvent(self._symbol, row.Index, {"pe": row.pe_ratio_value, "close": row.close})]
 
+    def seek(self, n: int) -> None:
+        """Repositionne le handler après les `n` premières barres (reprise depuis un snapshot)."""
+        self._iter = iter(self._df.iloc[n:].itertuples())
+        self._next_row = None
+
+    def to_frame(self) -> pd.DataFrame:
+        """Toutes les barres d'un coup, avec les mêmes clés que MarketEvent.data (chemin vectorisé)."""
+        return self._df[["pe_ratio_value", "close"]].rename(columns={"pe_ratio_value": "pe"})
+
         
 class MultipleAssetsSingleSymbolCSVHandler(DataHandler):
     def __init__(self, loader: CSVLoader, symbol: str):
@@ -62,3 +72,8 @@ class MultipleAssetsSingleSymbolCSVHandler(DataHandler):
                 data=row._asdict()
             )
         ]
+
+    def seek(self, n: int) -> None:
+        """Repositionne le handler après les `n` premières barres (reprise depuis un snapshot)."""
+        self._iter = iter(self.df.iloc[n:].itertuples())
+        self._next_row = None
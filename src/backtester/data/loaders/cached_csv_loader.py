@@ -0,0 +1,102 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.backtester.data.loaders.csv_loader import CSVLoader
+from src.backtester.data.shared import dump_frame, is_current, load_frame, publish_dir
+
+_FINGERPRINT = "source.json"
+
+
+def file_fingerprint(path: str | Path, hash_contents: bool = False) -> dict:
+    """Taille + mtime du fichier source, et optionnellement le sha256 du contenu."""
+    st = os.stat(path)
+    fp = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if hash_contents:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        fp["sha256"] = h.hexdigest()
+    return fp
+
+
+class CachedCSVLoader(CSVLoader):
+    """CSVLoader avec cache binaire à côté de la source (`<fichier>.npcache/`, un `.npy` par colonne).
+
+    Premier chargement: parse le CSV comme CSVLoader puis écrit le cache.
+    Chargements suivants: colonnes mappées en mémoire, aucun parsing.
+    Le cache est invalidé si la taille ou le mtime de la source changent
+    (et son sha256 si `hash_contents=True`).
+    """
+
+    def __init__(self, path: str, cache_dir: str | None = None, hash_contents: bool = False):
+        super().__init__(path)
+        self.cache_dir = Path(cache_dir) if cache_dir else Path(f"{path}.npcache")
+        self.hash_contents = hash_contents
+        self.last_load: dict = {}
+
+    def is_fresh(self) -> bool:
+        try:
+            stored = json.loads((self.cache_dir / _FINGERPRINT).read_text())
+        except (OSError, ValueError):
+            return False
+        return stored == file_fingerprint(self.path, self.hash_contents) and is_current(self.cache_dir)
+
+    def load(self) -> pd.DataFrame:
+        start = time.perf_counter()
+        if self.is_fresh():
+            df = load_frame(self.cache_dir)
+            hit = True
+        else:
+            df = super().load()
+            self._write(df)
+            hit = False
+        self.last_load = {"hit": hit, "seconds": time.perf_counter() - start}
+        return df
+
+    def invalidate(self) -> None:
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _write(self, df: pd.DataFrame) -> None:
+        # dossier temporaire unique puis rename (data/shared.publish_dir): sûr entre threads de l'API
+        def write(tmp: Path) -> None:
+            dump_frame(df, tmp)
+            (tmp / _FINGERPRINT).write_text(json.dumps(file_fingerprint(self.path, self.hash_contents)))
+
+        publish_dir(self.cache_dir, write, lambda _: self.is_fresh())
+
+def compare_load_times(path: str, repeat: int = 5) -> dict[str, float]:
+    """Temps de chargement: CSVLoader, cache froid (parse + écriture) et cache chaud (meilleur de `repeat`)."""
+    start = time.perf_counter()
+    CSVLoader(path).load()
+    csv_seconds = time.perf_counter() - start
+
+    loader = CachedCSVLoader(path)
+    loader.invalidate()
+    loader.load()
+    cold = loader.last_load["seconds"]
+    warm = min(_timed(loader) for _ in range(repeat))
+    return {"csv": csv_seconds, "cold": cold, "warm": warm, "speedup": csv_seconds / warm}
+
+
+def _timed(loader: CachedCSVLoader) -> float:
+    loader.load()
+    return loader.last_load["seconds"]
+
+
+if __name__ == "__main__":
+    import sys
+
+    for p in sys.argv[1:] or ["sp500_close.csv"]:
+        t = compare_load_times(p)
+        print(
+            f"{p}: csv={t['csv'] * 1e3:.2f}ms cold={t['cold'] * 1e3:.2f}ms "
+            f"warm={t['warm'] * 1e3:.2f}ms speedup=x{t['speedup']:.1f}"
+        )
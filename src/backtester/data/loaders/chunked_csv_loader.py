@@ -0,0 +1,106 @@
+from __future__ import annotations
+import queue
+import threading
+from typing import Iterator
+
+import pandas as pd
+
+from src.backtester.data.loaders.base_loader import BaseLoader
+
+_DONE = object()
+
+
+class ChunkedCSVLoader(BaseLoader):
+    """Lecture d'un CSV par blocs de lignes, pour des fichiers plus gros que la RAM.
+
+    Même nettoyage que CSVLoader (Date parsée en index, colonnes "Unnamed" retirées) mais sans tri global:
+    le fichier doit être trié par date (vérifié entre blocs). La taille des blocs est déduite de
+    `memory_budget` (octets) à partir d'un échantillon, en comptant le bloc courant + ceux en prefetch.
+    Un thread lit les `prefetch` blocs suivants pendant que le consommateur traite le bloc courant.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        memory_budget: int = 256 * 2**20,
+        chunk_rows: int | None = None,
+        prefetch: int = 1,
+        sample_rows: int = 1_000,
+    ):
+        self.path = path
+        self.memory_budget = memory_budget
+        self.prefetch = max(0, prefetch)
+        self.sample_rows = sample_rows
+        self.chunk_rows = chunk_rows or self._rows_for_budget()
+
+    def _rows_for_budget(self) -> int:
+        sample = self._clean(pd.read_csv(self.path, nrows=self.sample_rows, parse_dates=["Date"]))
+        if sample.empty:
+            return self.sample_rows
+        row_bytes = sample.memory_usage(deep=True, index=True).sum() / len(sample)
+        return max(1, int(self.memory_budget // (row_bytes * (self.prefetch + 1))))
+
+    @staticmethod
+    def _clean(df: pd.DataFrame) -> pd.DataFrame:
+        df = df.drop(columns=[column for column in df.columns if column.startswith("Unnamed")])
+        return df.set_index("Date")
+
+    def _read(self) -> Iterator[pd.DataFrame]:
+        last = None
+        with pd.read_csv(self.path, parse_dates=["Date"], chunksize=self.chunk_rows) as reader:
+            for chunk in reader:
+                chunk = self._clean(chunk)
+                chunk = chunk[chunk.index.notna()]
+                if chunk.empty:
+                    continue
+                if not chunk.index.is_monotonic_increasing or (last is not None and chunk.index[0] < last):
+                    raise ValueError(f"'{self.path}' is not sorted by Date (needed for chunked reading)")
+                last = chunk.index[-1]
+                yield chunk
+
+    def iter_chunks(self) -> Iterator[pd.DataFrame]:
+        """Blocs successifs; avec `prefetch` > 0 la lecture du suivant se fait en arrière-plan."""
+        if self.prefetch == 0:
+            yield from self._read()
+            return
+
+        chunks: queue.Queue = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+
+        def produce() -> None:
+            try:
+                for chunk in self._read():
+                    while not stop.is_set():
+                        try:
+                            chunks.put(chunk, timeout=0.1)
+                            break
+                        except queue.Full:
+                            continue
+                    if stop.is_set():
+                        return
+                chunks.put(_DONE)
+            except BaseException as exc:      # remonté côté consommateur
+                chunks.put(exc)
+
+        worker = threading.Thread(target=produce, name="chunked-csv-prefetch", daemon=True)
+        worker.start()
+        try:
+            while True:
+                item = chunks.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # consommateur arrêté en route: libère le producteur
+            stop.set()
+            while worker.is_alive():
+                try:
+                    chunks.get_nowait()
+                except queue.Empty:
+                    worker.join(0.05)
+
+    def load(self) -> pd.DataFrame:
+        """Tout le fichier en un DataFrame (compatibilité BaseLoader; ne tient que si le fichier tient en RAM)."""
+        return pd.concat(list(self.iter_chunks()))
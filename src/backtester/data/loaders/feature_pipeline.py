@@ -0,0 +1,203 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.backtester.core.interfaces import DataHandler
+from src.backtester.core.events import MarketEvent
+from src.backtester.data.loaders.base_loader import BaseLoader
+from src.backtester.data.loaders.cached_csv_loader import file_fingerprint
+from src.backtester.data.shared import dump_frame, is_current, load_frame, publish_dir
+from src.backtester.indicators.registry import IndicatorSpec, compute_batch
+
+
+@dataclass(frozen=True)
+class Source:
+    """Une source du pipeline. `columns`: colonnes gardées (défaut: toutes);
+    `prefix`: préfixe des colonnes dans le frame final (défaut: aucun pour la base, "<name>." pour les jointures);
+    `tolerance`: ancienneté max d'une valeur jointe (ex: "120D"), au-delà NaN."""
+    name: str
+    loader: BaseLoader
+    columns: tuple[str, ...] | None = None
+    prefix: str | None = None
+    tolerance: str | None = None
+
+
+def _clean(df: pd.DataFrame, columns: tuple[str, ...] | None) -> pd.DataFrame:
+    # lignes sans date (ex: ",^GSPC" de sp500_close.csv) retirées, colonnes texte converties en nombres
+    df = df[pd.DatetimeIndex(df.index).notna()]
+    if columns is not None:
+        df = df[list(columns)]
+    df = df.apply(pd.to_numeric, errors="coerce")
+    return df[~df.index.duplicated(keep="last")].sort_index()
+
+
+def asof_join(base: pd.DatetimeIndex, frames: list[tuple[pd.DataFrame, str | None]]) -> dict[str, np.ndarray]:
+    """Dernière valeur connue de chaque frame à chaque date de `base` (forward-fill, direction backward).
+
+    Une recherche dichotomique vectorisée par source (équivalent d'un merge trié), sans réindexation.
+    `frames`: (frame trié, tolérance) -> colonnes alignées sur `base`.
+    """
+    out: dict[str, np.ndarray] = {}
+    stamps = base.as_unit("ns").asi8
+    for df, tolerance in frames:
+        index = pd.DatetimeIndex(df.index).as_unit("ns").asi8
+        pos = np.searchsorted(index, stamps, side="right") - 1
+        valid = pos >= 0
+        if tolerance is not None:
+            valid &= stamps - index[np.maximum(pos, 0)] <= pd.Timedelta(tolerance).value
+        take = np.maximum(pos, 0)
+        for name in df.columns:
+            values = df[name].to_numpy(dtype=float)
+            out[name] = np.where(valid, values[take] if len(values) else np.nan, np.nan)
+    return out
+
+
+def _loader_identity(loader: BaseLoader) -> dict:
+    return {"class": type(loader).__name__, "path": os.path.realpath(loader.path) if hasattr(loader, "path") else None}
+
+
+def _spec_dict(spec: IndicatorSpec) -> dict:
+    return {"kind": spec.kind, "period": spec.period, "field": spec.field, "of": _spec_dict(spec.of) if spec.of else None}
+
+
+class FeaturePipeline(BaseLoader):
+    """Frame de features assemblé une fois: sources chargées, jointes en as-of sur la timeline de la base,
+    colonnes dérivées (IndicatorSpec) calculées, puis mis en cache sur disque (colonnes .npy relues en mmap).
+
+    La clé de cache couvre la définition (sources, colonnes, tolérances, features) et l'empreinte de chaque
+    source (taille + mtime du fichier, + sha256 si `hash_contents`). Ex. pour CorrelStrategy:
+
+        FeaturePipeline(
+            Source("spx", CSVLoader("sp500_close.csv")),
+            joins=[Source("pe", CSVLoader(".../pe_ratio_full_sp500.csv"), columns=("pe_ratio_value",))],
+            features={"symbolMA50": sma(50), "correlatedMA50": sma(50, "pe.pe_ratio_value")},
+        )
+    """
+
+    def __init__(
+        self,
+        base: Source,
+        joins: list[Source] | None = None,
+        features: dict[str, IndicatorSpec] | None = None,
+        dropna: bool = False,
+        cache_dir: str | None = ".feature_cache",
+        hash_contents: bool = False,
+    ):
+        self.base = base
+        self.joins = list(joins or [])
+        self.features = dict(features or {})
+        self.dropna = dropna
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.hash_contents = hash_contents
+        self.last_load: dict = {}
+        names = [base.name] + [s.name for s in self.joins]
+        if len(set(names)) != len(names):
+            raise ValueError("Source names must be unique")
+
+    def definition(self) -> dict:
+        return {
+            "sources": [
+                {
+                    "name": s.name,
+                    "loader": _loader_identity(s.loader),
+                    "columns": list(s.columns) if s.columns else None,
+                    "prefix": self._prefix(s),
+                    "tolerance": s.tolerance,
+                }
+                for s in [self.base] + self.joins
+            ],
+            "features": {name: _spec_dict(spec) for name, spec in self.features.items()},
+            "dropna": self.dropna,
+        }
+
+    def _prefix(self, source: Source) -> str:
+        if source.prefix is not None:
+            return source.prefix
+        return "" if source is self.base else f"{source.name}."
+
+    def _source_fingerprint(self, loader: BaseLoader) -> dict:
+        if hasattr(loader, "path"):
+            return file_fingerprint(loader.path, self.hash_contents)
+        # loader en mémoire (FrameLoader, ...): empreinte du contenu
+        df = loader.load()
+        return {"sha256": hashlib.sha256(pd.util.hash_pandas_object(df).to_numpy().tobytes()).hexdigest()}
+
+    def key(self) -> str:
+        payload = {
+            "definition": self.definition(),
+            "sources": [self._source_fingerprint(s.loader) for s in [self.base] + self.joins],
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:24]
+
+    def build(self) -> pd.DataFrame:
+        """Assemble le frame sans cache."""
+        base = _clean(self.base.loader.load(), self.base.columns).add_prefix(self._prefix(self.base))
+        frames = [
+            (_clean(s.loader.load(), s.columns).add_prefix(self._prefix(s)), s.tolerance) for s in self.joins
+        ]
+        joined = asof_join(pd.DatetimeIndex(base.index), frames)
+        df = pd.concat([base, pd.DataFrame(joined, index=base.index)], axis=1, copy=False)
+        if self.features:
+            df = compute_batch(df, self.features)
+        if self.dropna:
+            df = df.dropna()
+        return df
+
+    def load(self) -> pd.DataFrame:
+        start = time.perf_counter()
+        if self.cache_dir is None:
+            df, hit = self.build(), False
+        else:
+            directory = self.cache_dir / self.key()
+            if is_current(directory):
+                df, hit = load_frame(directory), True
+            else:
+                df, hit = self.build(), False
+
+                def write(tmp: Path) -> None:
+                    dump_frame(df, tmp)
+                    (tmp / "pipeline.json").write_text(json.dumps(self.definition(), indent=2))
+
+                publish_dir(directory, write, is_current)
+        self.last_load = {"hit": hit, "seconds": time.perf_counter() - start}
+        return df
+
+
+class FeatureDataHandler(DataHandler):
+    """Handler sur un frame préassemblé (ex: FeaturePipeline): les colonnes sont converties une fois
+    en un tableau (T, F); chaque barre ne fait que lire une ligne, aucune jointure à l'exécution."""
+
+    def __init__(
+        self,
+        loader: BaseLoader,
+        symbol: str,
+        fields: list[str] | None = None,
+        rename: dict[str, str] | None = None,
+    ):
+        df = loader.load()
+        fields = fields or list(df.columns)
+        self._symbol = symbol
+        self.index = pd.DatetimeIndex(df.index)
+        self.keys = tuple((rename or {}).get(f, f) for f in fields)
+        self.values = np.column_stack([df[f].to_numpy(dtype=float) for f in fields]) if fields else np.empty((len(df), 0))
+        self._i = 0
+
+    def has_next(self) -> bool:
+        return self._i < len(self.index)
+
+    def get_next(self) -> list[MarketEvent]:
+        if self._i >= len(self.index):
+            raise StopIteration("No more data")
+        i = self._i
+        self._i += 1
+        return [MarketEvent(self._symbol, self.index[i], dict(zip(self.keys, self.values[i].tolist())))]
+
+    def seek(self, n: int) -> None:
+        self._i = min(n, len(self.index))
@@ -0,0 +1,11 @@
+import pandas as pd
+from src.backtester.data.loaders.base_loader import BaseLoader
+
+class FrameLoader(BaseLoader):
+    """Loader sur un DataFrame déjà chargé (ex: frame partagé entre plusieurs engines)."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+    def load(self) -> pd.DataFrame:
+        return self.df
@@ -0,0 +1,158 @@
+from __future__ import annotations
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+_META = "frame.json"
+_INDEX = "index.npy"
+FORMAT = 2                                  # 2: texte en unicode largeur fixe (1: texte picklé, plus relu)
+
+
+def _is_datetime(dtype) -> bool:
+    return pd.api.types.is_datetime64_any_dtype(dtype)
+
+
+def dump_frame(df: pd.DataFrame, directory: str | Path) -> Path:
+    """Écrit un DataFrame à index datetime en `.npy` par colonne dans `directory`.
+
+    Colonnes numériques et booléennes relisibles en mmap; dates en int64 (ns); texte en unicode
+    largeur fixe (`<U`, valeurs manquantes dans un masque à part), comme io/logger.py. Rien n'est
+    picklé: ValueError pour une colonne objet qui ne contient pas que du texte.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    index = pd.DatetimeIndex(df.index)
+    np.save(directory / _INDEX, index.as_unit("ns").asi8)
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        entry = {"name": name, "file": f"col_{i}.npy", "dtype": str(series.dtype)}
+        if _is_datetime(series.dtype):
+            stamps = pd.DatetimeIndex(series)
+            entry.update(kind="datetime", unit=stamps.unit, tz=str(stamps.tz) if stamps.tz else None)
+            values = stamps.as_unit("ns").asi8
+        elif pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+            entry["kind"] = "numeric"
+            values = series.to_numpy()
+        else:
+            objects = series.to_numpy(dtype=object)
+            missing = pd.isna(objects)
+            if not all(isinstance(v, str) for v in objects[~missing]):
+                raise ValueError(f"Column {name!r}: only numeric, datetime and text columns can be stored")
+            entry["kind"] = "text"
+            values = np.where(missing, "", objects).astype(str)
+            if missing.any():
+                entry["mask"] = f"col_{i}.mask.npy"
+                np.save(directory / entry["mask"], missing)
+        np.save(directory / entry["file"], values, allow_pickle=False)
+        columns.append(entry)
+    meta = {
+        "format": FORMAT,
+        "index_name": df.index.name,
+        "unit": index.unit,
+        "tz": str(index.tz) if index.tz else None,
+        "columns": columns,
+    }
+    (directory / _META).write_text(json.dumps(meta))
+    return directory
+
+
+def is_current(directory: str | Path) -> bool:
+    """True si `directory` contient un frame écrit au FORMAT courant (sinon: à réécrire)."""
+    try:
+        return json.loads((Path(directory) / _META).read_text()).get("format") == FORMAT
+    except (OSError, ValueError):
+        return False
+
+
+def _localize(stamps: np.ndarray, unit: str, tz: str | None, name=None) -> pd.DatetimeIndex:
+    index = pd.DatetimeIndex(stamps.view("datetime64[ns]"), name=name).as_unit(unit)
+    return index.tz_localize("UTC").tz_convert(tz) if tz else index
+
+
+def load_frame(directory: str | Path, mmap: bool = True) -> pd.DataFrame:
+    """Relit un frame écrit par dump_frame. Avec `mmap=True` les colonnes numériques restent mappées (lecture seule)."""
+    directory = Path(directory)
+    meta = json.loads((directory / _META).read_text())
+    if meta.get("format") != FORMAT:
+        raise ValueError(f"{directory}: frame format {meta.get('format', 1)}, expected {FORMAT} (rewrite it)")
+    index = _localize(np.load(directory / _INDEX), meta["unit"], meta["tz"], meta["index_name"])
+    data = {}
+    for c in meta["columns"]:
+        path = directory / c["file"]
+        if c["kind"] == "numeric":
+            data[c["name"]] = np.load(path, mmap_mode="r" if mmap else None)
+        elif c["kind"] == "datetime":
+            data[c["name"]] = _localize(np.load(path), c["unit"], c["tz"])
+        else:
+            values = np.load(path).astype(object)
+            if "mask" in c:
+                values[np.load(directory / c["mask"])] = np.nan
+            data[c["name"]] = pd.array(values, dtype=c["dtype"])
+    return pd.DataFrame(data, index=index, copy=False)
+
+
+def publish_dir(
+    directory: str | Path,
+    write: Callable[[Path], None],
+    is_fresh: Callable[[Path], bool],
+    attempts: int = 5,
+) -> bool:
+    """Publie un dossier de cache de façon atomique, sûr entre threads et entre processus.
+
+    `write(tmp)` remplit un dossier temporaire unique (mkdtemp, même parent) renommé ensuite en
+    `directory`. Un dossier existant n'est jamais supprimé en place: s'il est frais (`is_fresh`), un
+    autre écrivain a gagné et on garde le sien; sinon il est d'abord écarté par rename. Retourne True
+    si notre version a été publiée.
+    """
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=f".{directory.name}.tmp", dir=directory.parent))
+    try:
+        write(tmp)
+        for _ in range(attempts):
+            try:
+                os.replace(tmp, directory)  # échoue si `directory` existe et n'est pas vide
+                return True
+            except OSError:
+                if is_fresh(directory):
+                    return False
+            stale = Path(tempfile.mkdtemp(prefix=f".{directory.name}.old", dir=directory.parent))
+            try:
+                os.replace(directory, stale / directory.name)
+            except FileNotFoundError:       # déjà écarté par un autre écrivain
+                pass
+            shutil.rmtree(stale, ignore_errors=True)
+        raise OSError(f"could not publish {directory} after {attempts} attempts")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+class SharedFrame:
+    """Frame placé une seule fois sur disque (page cache partagé) pour être mappé par des workers.
+
+    Le `handle` est un simple chemin: il se pickle sans copier les données.
+    """
+
+    def __init__(self, df: pd.DataFrame, directory: str | Path | None = None):
+        self._owned = directory is None
+        self.handle = str(dump_frame(df, directory or tempfile.mkdtemp(prefix="bt_frame_")))
+
+    def load(self) -> pd.DataFrame:
+        return load_frame(self.handle)
+
+    def close(self) -> None:
+        if self._owned:
+            shutil.rmtree(self.handle, ignore_errors=True)
+
+    def __enter__(self) -> SharedFrame:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from src.backtester.core.interfaces import DataHandler
+from src.backtester.core.events import MarketEvent
+from src.backtester.data.loaders.chunked_csv_loader import ChunkedCSVLoader
+
+
+class StreamingDataHandler(DataHandler):
+    """Handler qui consomme un ChunkedCSVLoader bloc par bloc: seuls le bloc courant et le(s) bloc(s)
+    en prefetch sont en mémoire.
+
+    - `symbol_col=None`: un seul symbole (`symbol`), un MarketEvent par ligne
+    - `symbol_col="symbol"`: layout long, un MarketEvent par symbole pour chaque timestamp;
+      les lignes d'un même timestamp à cheval sur deux blocs sont regroupées
+    `fields` restreint les colonnes passées dans MarketEvent.data (numériques), `rename` les renomme
+    (ex: {"pe_ratio_value": "pe"} pour PERatioStrategy).
+    Le handler ne borne que les données de marché: pour une mémoire constante sur tout le run,
+    borner aussi l'equity (SimplePortfolio(equity_window=...), ce que fait config.specs.build_engine).
+    Un RunLogger (CLI --store, jobs de l'API) garde en revanche tout l'historique en mémoire: O(T).
+    """
+
+    def __init__(
+        self,
+        loader: ChunkedCSVLoader,
+        symbol: str | None = None,
+        symbol_col: str | None = None,
+        fields: list[str] | None = None,
+        rename: dict[str, str] | None = None,
+    ):
+        if symbol is None and symbol_col is None:
+            raise ValueError("Either symbol or symbol_col is required")
+        self._loader = loader
+        self._symbol = symbol
+        self._symbol_col = symbol_col
+        self._fields = fields
+        self._rename = rename or {}
+        self._bars = self._iter_bars()
+        self._next_bar: list[MarketEvent] | None = None
+
+    def _columns(self, chunk: pd.DataFrame) -> tuple[list[str], list[str]]:
+        fields = self._fields or [c for c in chunk.columns if c != self._symbol_col]
+        return fields, [self._rename.get(f, f) for f in fields]
+
+    def _iter_bars(self) -> Iterator[list[MarketEvent]]:
+        pending: list[MarketEvent] = []               # dernier timestamp du bloc précédent, peut-être incomplet
+        for chunk in self._loader.iter_chunks():
+            fields, keys = self._columns(chunk)
+            values = chunk[fields].to_numpy(dtype=float).tolist()
+            stamps = chunk.index
+            if self._symbol_col is None:
+                for ts, row in zip(stamps, values):
+                    yield [MarketEvent(self._symbol, ts, dict(zip(keys, row)))]
+                continue
+
+            symbols = chunk[self._symbol_col].astype(str).tolist()
+            times = stamps.asi8
+            starts = np.flatnonzero(np.r_[True, times[1:] != times[:-1]]).tolist() + [len(times)]
+            if pending and pending[0].timestamp != stamps[0]:
+                yield pending
+                pending = []
+            for a, b in zip(starts[:-1], starts[1:]):
+                ts = stamps[a]
+                pending.extend(MarketEvent(symbols[i], ts, dict(zip(keys, values[i]))) for i in range(a, b))
+                if b < len(times):                    # groupe complet (suivi d'un autre timestamp du bloc)
+                    yield pending
+                    pending = []
+        if pending:
+            yield pending
+
+    def has_next(self) -> bool:
+        if self._next_bar is not None:
+            return True
+        try:
+            self._next_bar = next(self._bars)
+            return True
+        except StopIteration:
+            return False
+
+    def peek_timestamp(self) -> pd.Timestamp | None:
+        return self._next_bar[0].timestamp if self.has_next() else None
+
+    def get_next(self) -> list[MarketEvent]:
+        if not self.has_next():
+            raise StopIteration("No more data")
+        bar = self._next_bar
+        self._next_bar = None
+        return bar
+
+    def close(self) -> None:
+        """Arrête la lecture (et le thread de prefetch) avant la fin du fichier."""
+        self._bars.close()
+        self._next_bar = None
@@ -1,27 +1,216 @@
 from __future__ import annotations
+import heapq
+from collections import deque
+from datetime import date
+
+import numpy as np
+
 from src.backtester.core.interfaces import Broker
 from src.backtester.core.events import OrderEvent, FillEvent, MarketEvent
+from src.backtester.core.batch import BarContext, FillBatch, OrderBatch
+
+
+class _SymbolBook:
+    """Ordres au repos d'un symbole: un tas par (côté, type), trié pour que le sommet soit le premier à se déclencher.
+
+    Entrées (clé, séquence, order_id); la séquence garde la priorité d'arrivée à prix égal.
+      buy_limit  clé -L: se déclenche si L >= low      sell_limit clé L: si L <= high
+      buy_stop   clé S:  se déclenche si S <= high     sell_stop  clé -S: si S >= low
+    """
+    __slots__ = ("buy_limit", "sell_limit", "buy_stop", "sell_stop", "dead")
+
+    def __init__(self) -> None:
+        self.buy_limit: list[tuple[float, int, int]] = []
+        self.sell_limit: list[tuple[float, int, int]] = []
+        self.buy_stop: list[tuple[float, int, int]] = []
+        self.sell_stop: list[tuple[float, int, int]] = []
+        self.dead = 0                                   # entrées d'ordres annulés / expirés encore dans les tas
+
+    def heaps(self) -> tuple[list[tuple[float, int, int]], ...]:
+        return self.buy_limit, self.sell_limit, self.buy_stop, self.sell_stop
+
+    def compact(self, live: dict) -> None:
+        """Retire les entrées mortes et reconstruit les tas (appelé quand elles dépassent la moitié)."""
+        for heap in self.heaps():
+            heap[:] = [entry for entry in heap if entry[2] in live]
+            heapq.heapify(heap)
+        self.dead = 0
+
 
 class SimulatedBroker(Broker):
+    """Ordres au marché exécutés au close de la barre courante; ordres limit / stop gardés au repos
+    et confrontés à l'OHLC des barres suivantes (open/high/low absents: close).
+
+    - limit: exécuté au limite, ou à l'open s'il est meilleur (gap); pas de slippage
+    - stop: devient un ordre au marché au stop, ou à l'open en cas de gap; slippage appliqué
+    - tif "gtc": jusqu'à exécution ou cancel; "day": expire à la fin de la première séance où il est actif
+    Seuls les ordres dont le prix est franchi sont dépilés: coût par barre ~ O(déclenchés · log n).
+    Le cash n'est pas revérifié à l'exécution (le portefeuille filtre à la création de l'ordre), mais une
+    vente au repos est plafonnée à la position nette issue des fills de ce broker: un stop et un
+    take-profit sur la même position (OCO) ne vendent pas deux fois, une vente sans position est abandonnée.
+    """
+
     def __init__(self, commission_per_trade: float = 0.0, slippage_bp: float = 0.0):
         self.commission = commission_per_trade
         self.slippage_bp = slippage_bp
+        self._books: dict[str, _SymbolBook] = {}
+        self._live: dict[int, OrderEvent] = {}          # ordres ouverts par id (suppression paresseuse des tas)
+        self._incoming: list[OrderEvent] = []           # soumis à cette barre, actifs à partir de la suivante
+        self._day: deque[tuple[date, int]] = deque()    # (séance, id) des ordres "day", séances croissantes
+        self._held: dict[str, float] = {}               # position nette par symbole, d'après les fills émis
+        self._next_id = 1                               # compteurs simples: le broker reste picklable (snapshots)
+        self._seq = 0
+
+    # ---------- carnet
+    def submit(self, order: OrderEvent) -> int:
+        """Met un ordre limit / stop au repos; retourne son id."""
+        if order.order_type == "limit":
+            if order.limit_price is None:
+                raise ValueError("limit order requires limit_price")
+        elif order.order_type == "stop":
+            if order.stop_price is None:
+                raise ValueError("stop order requires stop_price")
+        else:
+            raise ValueError(f"Unknown order_type '{order.order_type}'")
+        if order.tif not in ("gtc", "day"):
+            raise ValueError(f"Unknown tif '{order.tif}'")
+        if order.order_id is None:
+            order.order_id = self._next_id
+            self._next_id += 1
+        self._live[order.order_id] = order
+        self._incoming.append(order)
+        return order.order_id
 
+    def cancel(self, order_id: int) -> bool:
+        order = self._live.pop(order_id, None)
+        if order is None:
+            return False
+        if not any(o is order for o in self._incoming):   # déjà dans un tas: entrée morte
+            self._discard(order.symbol)
+        return True
+
+    def _discard(self, symbol: str) -> None:
+        """Compte une entrée morte; compacte le carnet quand elles forment plus de la moitié des tas.
+        Sans cela, un cancel/replace à des prix jamais atteints ferait grossir les tas sans fin."""
+        book = self._books[symbol]
+        book.dead += 1
+        if book.dead * 2 > sum(len(h) for h in book.heaps()):
+            book.compact(self._live)
+
+    def open_orders(self, symbol: str | None = None) -> list[OrderEvent]:
+        return [o for o in self._live.values() if symbol is None or o.symbol == symbol]
+
+    def _activate(self, session: date) -> None:
+        for order in self._incoming:
+            if order.order_id not in self._live:
+                continue                                # annulé avant d'être actif
+            book = self._books.get(order.symbol)
+            if book is None:
+                book = self._books[order.symbol] = _SymbolBook()
+            buy = order.direction > 0
+            if order.order_type == "limit":
+                heap, key = (book.buy_limit, -order.limit_price) if buy else (book.sell_limit, order.limit_price)
+            else:
+                heap, key = (book.buy_stop, order.stop_price) if buy else (book.sell_stop, -order.stop_price)
+            heapq.heappush(heap, (key, self._seq, order.order_id))
+            self._seq += 1
+            if order.tif == "day":
+                self._day.append((session, order.order_id))
+        self._incoming.clear()
+
+    def _triggered(self, book: _SymbolBook, heap: list[tuple[float, int, int]], bound: float) -> list[OrderEvent]:
+        out = []
+        while heap and heap[0][0] <= bound:
+            order = self._live.pop(heapq.heappop(heap)[2], None)
+            if order is not None:
+                out.append(order)
+            elif book.dead:
+                book.dead -= 1
+        return out
+
+    def _match(self, market_events: list[MarketEvent]) -> list[FillEvent]:
+        ts = market_events[0].timestamp
+        session = ts.date() if hasattr(ts, "date") else ts
+        if self._incoming:
+            self._activate(session)
+        while self._day and self._day[0][0] < session:
+            order = self._live.pop(self._day.popleft()[1], None)
+            if order is not None:
+                self._discard(order.symbol)
+
+        fills: list[FillEvent] = []
+        for e in market_events:
+            book = self._books.get(e.symbol)
+            if book is None:
+                continue
+            close = e.data.get("close")
+            open_ = e.data.get("open", close)
+            high = e.data.get("high", close)
+            low = e.data.get("low", close)
+            for order in self._triggered(book, book.buy_limit, -low):
+                fills.append(self._fill(order, e.timestamp, min(open_, order.limit_price), 0.0))
+            for order in self._triggered(book, book.sell_limit, high):
+                self._sell(fills, order, e.timestamp, max(open_, order.limit_price), 0.0)
+            for order in self._triggered(book, book.buy_stop, high):
+                fills.append(self._fill(order, e.timestamp, max(open_, order.stop_price), self.slippage_bp))
+            for order in self._triggered(book, book.sell_stop, -low):
+                self._sell(fills, order, e.timestamp, min(open_, order.stop_price), self.slippage_bp)
+        return fills
+
+    def _sell(self, fills: list[FillEvent], order: OrderEvent, timestamp, price: float, slippage_bp: float) -> None:
+        """Vente au repos déclenchée: quantité plafonnée à la position détenue au moment du fill."""
+        held = self._held.get(order.symbol, 0.0)
+        if held <= 0.0:
+            return                                      # position déjà soldée (ex: l'autre jambe d'un OCO)
+        fills.append(self._fill(order, timestamp, price, slippage_bp, min(order.qty, held)))
+
+    def _fill(
+        self, order: OrderEvent, timestamp, price: float, slippage_bp: float, qty: float | None = None
+    ) -> FillEvent:
+        qty = order.qty if qty is None else qty
+        slip_per_unit = price * (slippage_bp / 10_000.0)
+        self._held[order.symbol] = self._held.get(order.symbol, 0.0) + qty * order.direction
+        return FillEvent(
+            symbol=order.symbol,
+            timestamp=timestamp,
+            direction=order.direction,
+            fill_price=price + slip_per_unit * (1 if order.direction > 0 else -1),
+            qty=qty,
+            commission=self.commission,
+            slippage=abs(slip_per_unit * qty),
+        )
+
+    # ---------- Broker
     def execute(self, orders: list[OrderEvent], market_events: list[MarketEvent]) -> list[FillEvent]:
+        fills: list[FillEvent] = self._match(market_events) if self._live and market_events else []
         price_map = {market_event.symbol: market_event.data.get("close") for market_event in market_events}
-        fills: list[FillEvent] = []
         for order in orders:
-            price = price_map[order.symbol]
-            slip_per_unit = price * (self.slippage_bp / 10_000.0)
-            fills.append(
-                FillEvent(
-                    symbol=order.symbol,
-                    timestamp=order.timestamp,
-                    direction=order.direction,
-                    fill_price=price + slip_per_unit * (1 if order.direction > 0 else -1),
-                    qty=order.qty,
-                    commission=self.commission,
-                    slippage=abs(slip_per_unit * order.qty),
-                )
-            )
-        return fills
\ No newline at end of file
+            if order.order_type != "market":
+                self.submit(order)
+                continue
+            fills.append(self._fill(order, order.timestamp, price_map[order.symbol], self.slippage_bp))
+        return fills
+
+    def execute_batch(self, orders: OrderBatch, ctx: BarContext) -> FillBatch:
+        """execute() en colonnes (BatchEngine): ordres au marché au close de ctx, sans dict de prix."""
+        fills = FillBatch.empty()
+        if self._live and ctx.mask.any():
+            fills = FillBatch.from_events(self._match(ctx.events), ctx.universe)
+        for order in orders.resting:
+            self.submit(order)
+        if not len(orders.ids):
+            return fills
+        price = ctx.close[orders.ids]
+        slip_per_unit = price * (self.slippage_bp / 10_000.0)
+        market = FillBatch(
+            orders.ids,
+            orders.direction,
+            price + slip_per_unit * np.where(orders.direction > 0, 1, -1),
+            orders.qty,
+            np.full(len(price), float(self.commission)),
+            np.abs(slip_per_unit * orders.qty),
+        )
+        symbols = ctx.universe.symbols
+        for i, d, q in zip(orders.ids.tolist(), orders.direction.tolist(), orders.qty.tolist()):
+            self._held[symbols[i]] = self._held.get(symbols[i], 0.0) + q * d
+        return FillBatch.concat(fills, market)
@@ -0,0 +1,38 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+# Versions vectorisées des indicateurs de streaming.py: mêmes définitions, mêmes NaN de warm-up.
+# Entrées sans NaN: registry.compute_batch retire les NaN avant l'appel (règle du streaming).
+
+
+def sma(x: pd.Series, period: int) -> pd.Series:
+    return x.rolling(period, min_periods=period).mean()
+
+
+def ema(x: pd.Series, period: int) -> pd.Series:
+    out = x.ewm(span=period, adjust=False).mean()
+    out[x.notna().cumsum() < period] = np.nan    # warm-up compté en valeurs valides, comme EMA.update
+    return out
+
+
+def rolling_std(x: pd.Series, period: int, ddof: int = 1) -> pd.Series:
+    return x.rolling(period, min_periods=period).std(ddof=ddof)
+
+
+def rolling_zscore(x: pd.Series, period: int, ddof: int = 1) -> pd.Series:
+    roll = x.rolling(period, min_periods=period)
+    std = roll.std(ddof=ddof)
+    return ((x - roll.mean()) / std.where(std > 0.0)).astype(float)
+
+
+def rolling_min(x: pd.Series, period: int) -> pd.Series:
+    return x.rolling(period, min_periods=period).min()
+
+
+def rolling_max(x: pd.Series, period: int) -> pd.Series:
+    return x.rolling(period, min_periods=period).max()
+
+
+def derivative(x: pd.Series, lag: int = 1) -> pd.Series:
+    return x.diff(lag)
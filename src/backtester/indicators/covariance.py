@@ -0,0 +1,287 @@
+from __future__ import annotations
+import math
+from abc import ABC, abstractmethod
+from typing import Sequence
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.backtester.core.interfaces import DataHandler
+from src.backtester.core.events import MarketEvent
+
+# Covariance / corrélation d'un univers de N séries (en pratique des rendements), mise à jour
+# incrémentale en O(N²) par barre sur des tampons préalloués, et versions batch sur tout l'historique.
+# Une valeur manquante (NaN) compte comme 0 (rendement nul d'un symbole absent de la barre).
+
+
+def correlation(cov: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """Corrélation depuis une covariance (N, N) ou une pile (..., N, N); NaN si une variance est nulle."""
+    std = np.sqrt(np.diagonal(cov, axis1=-2, axis2=-1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.divide(cov, std[..., :, None] * std[..., None, :], out=out)   # variance nulle: 0/0 = NaN
+
+
+class _CovarianceEstimator(ABC):
+    """Base commune: symboles, covariance et corrélation (calculée à la demande, une fois par barre)."""
+
+    def __init__(self, symbols: int | Sequence[str]):
+        self.symbols: list[str] = [str(i) for i in range(symbols)] if isinstance(symbols, int) else list(symbols)
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+        n = len(self.symbols)
+        self.n_bars = 0
+        self._mean = np.zeros(n)
+        self._m2 = np.zeros((n, n))                 # somme des produits centrés (rolling) ou covariance (EW)
+        self._x = np.empty(n)
+        self._dx = np.empty(n)
+        self._outer = np.empty((n, n))
+        self._cov = np.full((n, n), np.nan)
+        self._corr = np.full((n, n), np.nan)
+        self._cov_at = self._corr_at = -1            # n_bars du dernier calcul
+
+    def _load(self, x) -> np.ndarray:
+        np.copyto(self._x, x)
+        np.nan_to_num(self._x, copy=False, nan=0.0)
+        return self._x
+
+    @abstractmethod
+    def update(self, x) -> None:
+        ...
+
+    @property
+    @abstractmethod
+    def ready(self) -> bool:
+        ...
+
+    @abstractmethod
+    def _compute_cov(self, out: np.ndarray) -> None:
+        """Écrit la covariance courante dans `out` (appelé seulement si `ready`)."""
+        ...
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self._mean
+
+    def cov(self) -> np.ndarray:
+        """Matrice (N, N), NaN pendant le warm-up. Tampon réutilisé: copier pour la garder."""
+        if self._cov_at != self.n_bars:
+            if self.ready:
+                self._compute_cov(self._cov)
+            else:
+                self._cov.fill(np.nan)
+            self._cov_at = self.n_bars
+        return self._cov
+
+    def corr(self) -> np.ndarray:
+        if self._corr_at != self.n_bars:
+            correlation(self.cov(), out=self._corr)
+            self._corr_at = self.n_bars
+        return self._corr
+
+    def corr_of(self, a: str, b: str) -> float:
+        return float(self.corr()[self.index[a], self.index[b]])
+
+    def cov_of(self, a: str, b: str) -> float:
+        return float(self.cov()[self.index[a], self.index[b]])
+
+
+class RollingCovariance(_CovarianceEstimator):
+    """Covariance sur les `period` dernières barres (égale à pandas `rolling(period).cov()`).
+
+    Ajout et retrait d'une observation par mises à jour de Welford de rang 1 (deux produits
+    extérieurs, O(N²)); la fenêtre est un tampon circulaire (period, N). Tous les `refresh` ajouts
+    (défaut: period) les moments sont recalculés depuis la fenêtre pour borner la dérive d'arrondi,
+    soit O(N²) amorti; refresh=0 désactive.
+    """
+
+    def __init__(self, symbols: int | Sequence[str], period: int, ddof: int = 1, refresh: int | None = None):
+        if period < 2 or period <= ddof:
+            raise ValueError("period must be >= 2 and > ddof")
+        super().__init__(symbols)
+        self.period = period
+        self.ddof = ddof
+        self.refresh = period if refresh is None else refresh
+        self._win = np.zeros((period, len(self.symbols)))
+        self._head = 0
+        self._count = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._count == self.period
+
+    def update(self, x) -> None:
+        x = self._load(x)
+        mean, dx, outer = self._mean, self._dx, self._outer
+        if self._count == self.period:
+            y = self._win[self._head]
+            np.subtract(y, mean, out=dx)
+            mean -= dx / (self._count - 1)
+            np.outer(dx, y - mean, out=outer)
+            self._m2 -= outer
+            self._count -= 1
+        self._count += 1
+        np.subtract(x, mean, out=dx)
+        mean += dx / self._count
+        np.outer(dx, x - mean, out=outer)
+        self._m2 += outer
+        self._win[self._head] = x
+        self._head = (self._head + 1) % self.period
+        self.n_bars += 1
+        if self.refresh and self._count == self.period and self.n_bars % self.refresh == 0:
+            np.mean(self._win, axis=0, out=mean)
+            centered = self._win - mean
+            np.matmul(centered.T, centered, out=self._m2)
+
+    def _compute_cov(self, out: np.ndarray) -> None:
+        np.divide(self._m2, self.period - self.ddof, out=out)
+
+
+class EWCovariance(_CovarianceEstimator):
+    """Covariance pondérée exponentiellement: mean += a·dx, C = (1 - a)·(C + a·dx·dxᵀ).
+
+    Égale à pandas `ewm(alpha, adjust=False).cov(bias=True)`. alpha = 2 / (span + 1) ou
+    1 - exp(-ln 2 / halflife); NaN pendant les `min_periods` premières barres (défaut: span).
+    """
+
+    def __init__(
+        self,
+        symbols: int | Sequence[str],
+        span: float | None = None,
+        halflife: float | None = None,
+        min_periods: int | None = None,
+    ):
+        if (span is None) == (halflife is None):
+            raise ValueError("Pass exactly one of span / halflife")
+        super().__init__(symbols)
+        self.alpha = 2.0 / (span + 1.0) if span is not None else 1.0 - math.exp(-math.log(2.0) / halflife)
+        self.min_periods = min_periods if min_periods is not None else int(math.ceil(span or halflife))
+
+    @property
+    def ready(self) -> bool:
+        return self.n_bars >= max(1, self.min_periods)
+
+    def update(self, x) -> None:
+        x = self._load(x)
+        if self.n_bars == 0:
+            self._mean[:] = x
+        else:
+            a = self.alpha
+            np.subtract(x, self._mean, out=self._dx)
+            self._mean += a * self._dx
+            np.outer(self._dx, self._dx, out=self._outer)
+            self._outer *= a
+            self._m2 += self._outer
+            self._m2 *= 1.0 - a
+        self.n_bars += 1
+
+    def _compute_cov(self, out: np.ndarray) -> None:
+        np.copyto(out, self._m2)
+
+
+# ---------- batch
+def rolling_covariance(
+    values: np.ndarray, period: int, ddof: int = 1, step: int = 1, chunk_bytes: int = 64 * 2**20
+) -> np.ndarray:
+    """Covariances glissantes (S, N, N) d'un historique (T, N), aux barres 0, step, 2·step...
+
+    Mêmes valeurs que RollingCovariance (NaN avant period - 1). Chaque fenêtre est un produit
+    matriciel (BLAS), traité par blocs de ~chunk_bytes. Sortie S·N² flottants: pour un grand
+    univers, choisir `step` en conséquence.
+    """
+    x = np.nan_to_num(np.asarray(values, dtype=float), nan=0.0)
+    t, n = x.shape
+    steps = np.arange(0, t, step)
+    out = np.full((len(steps), n, n), np.nan)
+    ready = np.flatnonzero(steps >= period - 1)
+    if not len(ready):
+        return out
+    windows = sliding_window_view(x, period, axis=0)            # (T - period + 1, N, period), sans copie
+    block = max(1, chunk_bytes // (8 * n * max(n, period)))
+    for lo in range(0, len(ready), block):
+        sel = ready[lo: lo + block]
+        w = windows[steps[sel] - period + 1]
+        w = w - w.mean(axis=-1, keepdims=True)
+        out[sel] = np.matmul(w, w.transpose(0, 2, 1)) / (period - ddof)
+    return out
+
+
+def ew_covariance(
+    values: np.ndarray,
+    span: float | None = None,
+    halflife: float | None = None,
+    min_periods: int | None = None,
+    step: int = 1,
+) -> np.ndarray:
+    """Covariances EW (S, N, N) aux barres 0, step, ...: la récurrence est séquentielle, on rejoue
+    EWCovariance sur l'historique (O(T·N²)) en ne copiant que les barres demandées."""
+    x = np.asarray(values, dtype=float)
+    est = EWCovariance(x.shape[1], span, halflife, min_periods)
+    out = np.empty((len(range(0, len(x), step)), x.shape[1], x.shape[1]))
+    for i, row in enumerate(x):
+        est.update(row)
+        if i % step == 0:
+            out[i // step] = est.cov()
+    return out
+
+
+# ---------- flux d'events
+class CovarianceDataHandler(DataHandler):
+    """Ajoute l'estimateur de covariance de l'univers aux MarketEvent d'un handler.
+
+    À chaque barre, les rendements (`returns`: "log", "simple" ou None pour les valeurs brutes) de
+    `field` pour `symbols` mettent à jour l'estimateur (rolling si `period`, EW si `span`/`halflife`),
+    puis chaque event reçoit `data[key]` = l'estimateur (objet partagé: `cov()`, `corr()`,
+    `corr_of(a, b)`, `index`). Les matrices ne sont calculées que si une stratégie les lit.
+    Symbole absent de la barre: rendement 0 (son dernier prix est gardé).
+    """
+
+    def __init__(
+        self,
+        inner: DataHandler,
+        symbols: Sequence[str],
+        period: int | None = None,
+        span: float | None = None,
+        halflife: float | None = None,
+        field: str = "close",
+        returns: str | None = "log",
+        key: str = "cov",
+    ):
+        if returns not in ("log", "simple", None):
+            raise ValueError(f"Unknown returns '{returns}'")
+        if period is not None:
+            self.estimator: _CovarianceEstimator = RollingCovariance(symbols, period)
+        else:
+            self.estimator = EWCovariance(symbols, span, halflife)
+        self.inner = inner
+        self.field = field
+        self.returns = returns
+        self.key = key
+        n = len(self.estimator.symbols)
+        self._price = np.full(n, np.nan)
+        self._last = np.full(n, np.nan)
+        self._started = False
+
+    def has_next(self) -> bool:
+        return self.inner.has_next()
+
+    def get_next(self) -> list[MarketEvent]:
+        events = self.inner.get_next()
+        index = self.estimator.index
+        price = self._price
+        price[:] = self._last                       # symbole absent: dernier prix
+        for event in events:
+            i = index.get(event.symbol)
+            if i is not None:
+                v = event.data.get(self.field)
+                if v is not None:
+                    price[i] = v
+        if self.returns is None:
+            self.estimator.update(price)
+        elif self._started:                         # la première barre ne fait que fixer les prix
+            with np.errstate(divide="ignore", invalid="ignore"):
+                r = np.log(price / self._last) if self.returns == "log" else price / self._last - 1.0
+            self.estimator.update(r)
+        self._started = True
+        self._last[:] = price
+        for event in events:
+            event.data[self.key] = self.estimator
+        return events
@@ -0,0 +1,180 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Callable
+
+import pandas as pd
+
+from src.backtester.core.interfaces import DataHandler
+from src.backtester.core.events import MarketEvent
+from src.backtester.indicators import batch, streaming
+
+
+@dataclass(frozen=True)
+class IndicatorSpec:
+    """Définition d'un indicateur. Deux specs égales désignent le même calcul (et sont partagées).
+
+    `of` chaîne l'indicateur sur la sortie d'un autre (ex: dérivée d'une SMA).
+    """
+    kind: str                               # sma | ema | std | zscore | min | max | diff
+    period: int = 1
+    field: str = "close"
+    of: IndicatorSpec | None = None
+
+    def source_field(self) -> str:
+        return self.of.source_field() if self.of else self.field
+
+
+_STREAMING: dict[str, Callable[[int], streaming.Indicator]] = {
+    "sma": streaming.SMA,
+    "ema": streaming.EMA,
+    "std": streaming.RollingStd,
+    "zscore": streaming.RollingZScore,
+    "min": streaming.RollingMin,
+    "max": streaming.RollingMax,
+    "diff": streaming.Derivative,
+}
+
+_BATCH: dict[str, Callable[[pd.Series, int], pd.Series]] = {
+    "sma": batch.sma,
+    "ema": batch.ema,
+    "std": batch.rolling_std,
+    "zscore": batch.rolling_zscore,
+    "min": batch.rolling_min,
+    "max": batch.rolling_max,
+    "diff": batch.derivative,
+}
+
+
+def sma(period: int, field: str = "close") -> IndicatorSpec:
+    return IndicatorSpec("sma", period, field)
+
+
+def ema(period: int, field: str = "close") -> IndicatorSpec:
+    return IndicatorSpec("ema", period, field)
+
+
+def derivative(of: IndicatorSpec, lag: int = 1) -> IndicatorSpec:
+    return IndicatorSpec("diff", lag, of.source_field(), of)
+
+
+def compute_batch(df: pd.DataFrame, specs: dict[str, IndicatorSpec]) -> pd.DataFrame:
+    """Ajoute une colonne par spec à une copie de `df` (un seul symbole). Chaque spec n'est calculée qu'une fois.
+
+    Règle NaN (identique au streaming): un indicateur ne consomme que les valeurs valides de sa source
+    (colonne ou indicateur chaîné); sur une barre où sa source n'a pas de valeur valide, il vaut NaN.
+    """
+    cache: dict[IndicatorSpec, pd.Series] = {}
+
+    def run(spec: IndicatorSpec) -> pd.Series:
+        if spec not in cache:
+            if spec.kind not in _BATCH:
+                raise ValueError(f"Unknown indicator kind '{spec.kind}'")
+            source = run(spec.of) if spec.of else df[spec.field].astype(float)
+            valid = source.dropna()         # même règle NaN qu'IndicatorSet.update
+            cache[spec] = _BATCH[spec.kind](valid, spec.period).reindex(source.index)
+        return cache[spec]
+
+    out = df.copy()
+    for name, spec in specs.items():
+        out[name] = run(spec)
+    return out
+
+
+class IndicatorSet:
+    """Indicateurs de streaming partagés, indexés par (symbole, spec).
+
+    `register` retourne l'instance existante si la même définition est déjà suivie;
+    `update` fait avancer chaque instance une seule fois par timestamp, quel que soit
+    le nombre de stratégies qui l'appellent.
+
+    Règle NaN (celle de compute_batch): une entrée NaN ou absente n'est pas consommée; un indicateur
+    chaîné n'avance que si sa source a produit une valeur valide sur cette barre. `value` vaut NaN
+    pour un indicateur qui n'a pas avancé sur la dernière barre.
+    """
+
+    def __init__(self) -> None:
+        self._by_symbol: dict[str, dict[IndicatorSpec, streaming.Indicator]] = {}
+        self._advanced: dict[str, dict[IndicatorSpec, int]] = {}   # barre de la dernière mise à jour
+        self._bar = 0
+        self._last_ts = None
+
+    def register(self, symbol: str, spec: IndicatorSpec) -> streaming.Indicator:
+        per_symbol = self._by_symbol.setdefault(symbol, {})
+        if spec not in per_symbol:
+            if spec.kind not in _STREAMING:
+                raise ValueError(f"Unknown indicator kind '{spec.kind}'")
+            if spec.of:
+                self.register(symbol, spec.of)  # la source est mise à jour avant (ordre d'insertion)
+            per_symbol[spec] = _STREAMING[spec.kind](spec.period)
+            self._advanced.setdefault(symbol, {})[spec] = -1
+        return per_symbol[spec]
+
+    def update(self, events: list[MarketEvent]) -> None:
+        if not events or events[0].timestamp == self._last_ts:
+            return
+        self._last_ts = events[0].timestamp
+        self._bar += 1
+        bar = self._bar
+        for event in events:
+            per_symbol = self._by_symbol.get(event.symbol)
+            if not per_symbol:
+                continue
+            advanced = self._advanced[event.symbol]
+            for spec, indicator in per_symbol.items():   # sources avant les indicateurs chaînés
+                if spec.of:
+                    x = per_symbol[spec.of].value if advanced[spec.of] == bar else None
+                else:
+                    x = event.data.get(spec.field)
+                if x is not None and x == x:  # NaN (warm-up, valeur manquante) ignoré
+                    indicator.update(float(x))
+                    advanced[spec] = bar
+
+    def value(self, symbol: str, spec: IndicatorSpec) -> float:
+        if self._advanced[symbol][spec] != self._bar:
+            return streaming.NAN
+        return self._by_symbol[symbol][spec].value
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._by_symbol.values())
+
+
+class IndicatorDataHandler(DataHandler):
+    """Enrichit les MarketEvent d'un handler avec des colonnes d'indicateurs.
+
+    `columns` associe un nom de colonne à (symbole source, spec); symbole None = symbole de l'event.
+    Ex: {"symbolMA50": (None, sma(50)), "correlatedMA50": ("NDX", sma(50))}.
+    Les colonnes sont ajoutées à chaque event de la barre.
+    """
+
+    def __init__(
+        self,
+        inner: DataHandler,
+        columns: dict[str, tuple[str | None, IndicatorSpec]],
+        indicators: IndicatorSet | None = None,
+    ):
+        self.inner = inner
+        self.columns = columns
+        self.indicators = indicators or IndicatorSet()
+        self._fixed = {n: (s, spec) for n, (s, spec) in columns.items() if s is not None}
+        self._per_event = {n: spec for n, (s, spec) in columns.items() if s is None}
+        for symbol, spec in self._fixed.values():
+            self.indicators.register(symbol, spec)
+        self._seen: set[str] = set()
+
+    def has_next(self) -> bool:
+        return self.inner.has_next()
+
+    def get_next(self) -> list[MarketEvent]:
+        events = self.inner.get_next()
+        for event in events:
+            if event.symbol not in self._seen:
+                self._seen.add(event.symbol)
+                for spec in self._per_event.values():
+                    self.indicators.register(event.symbol, spec)
+        self.indicators.update(events)
+        fixed = {n: self.indicators.value(sym, spec) for n, (sym, spec) in self._fixed.items()}
+        for event in events:
+            event.data.update(fixed)
+            for name, spec in self._per_event.items():
+                event.data[name] = self.indicators.value(event.symbol, spec)
+        return events
@@ -0,0 +1,181 @@
+from __future__ import annotations
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+
+NAN = float("nan")
+
+
+class RingBuffer:
+    """Fenêtre glissante de taille fixe, préallouée. `push` retourne la valeur évincée (ou None)."""
+
+    __slots__ = ("_buf", "_head", "size", "capacity")
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self._buf = [0.0] * capacity
+        self._head = 0
+        self.size = 0
+        self.capacity = capacity
+
+    def push(self, x: float) -> float | None:
+        evicted = self._buf[self._head] if self.size == self.capacity else None
+        self._buf[self._head] = x
+        self._head = (self._head + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+        return evicted
+
+    def oldest(self) -> float:
+        return self._buf[self._head if self.size == self.capacity else 0]
+
+    @property
+    def full(self) -> bool:
+        return self.size == self.capacity
+
+
+class Indicator(ABC):
+    """Indicateur incrémental: `update(x)` en O(1) par barre, NaN tant que la fenêtre n'est pas pleine."""
+
+    value: float = NAN
+
+    @abstractmethod
+    def update(self, x: float) -> float:
+        ...
+
+    @property
+    def ready(self) -> bool:
+        return not math.isnan(self.value)
+
+
+class SMA(Indicator):
+    def __init__(self, period: int):
+        self.period = period
+        self._win = RingBuffer(period)
+        self._sum = 0.0
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        evicted = self._win.push(x)
+        self._sum += x - (evicted if evicted is not None else 0.0)
+        self.value = self._sum / self.period if self._win.full else NAN
+        return self.value
+
+
+class EMA(Indicator):
+    """EMA(span) avec alpha = 2 / (span + 1), initialisée sur la première valeur (pandas `adjust=False`)."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self._ema = NAN
+        self._n = 0
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        self._ema = x if self._n == 0 else self._ema + self.alpha * (x - self._ema)
+        self._n += 1
+        self.value = self._ema if self._n >= self.period else NAN
+        return self.value
+
+
+class _RollingMoments(Indicator):
+    """Moyenne et variance glissantes (Welford avec retrait de la valeur évincée)."""
+
+    def __init__(self, period: int, ddof: int = 1):
+        if period <= ddof:
+            raise ValueError("period must be > ddof")
+        self.period = period
+        self.ddof = ddof
+        self._win = RingBuffer(period)
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.value = NAN
+
+    def _push(self, x: float) -> None:
+        evicted = self._win.push(x)
+        if evicted is None:
+            n = self._win.size
+            delta = x - self._mean
+            self._mean += delta / n
+            self._m2 += delta * (x - self._mean)
+        else:
+            old_mean = self._mean
+            self._mean += (x - evicted) / self.period
+            self._m2 += (x - evicted) * (x - self._mean + evicted - old_mean)
+            if self._m2 < 0.0:  # arrondi
+                self._m2 = 0.0
+
+    def _std(self) -> float:
+        return math.sqrt(self._m2 / (self.period - self.ddof))
+
+
+class RollingStd(_RollingMoments):
+    def update(self, x: float) -> float:
+        self._push(x)
+        self.value = self._std() if self._win.full else NAN
+        return self.value
+
+
+class RollingZScore(_RollingMoments):
+    """(x - moyenne) / écart-type sur la fenêtre incluant x. NaN si l'écart-type est nul."""
+
+    def update(self, x: float) -> float:
+        self._push(x)
+        if not self._win.full:
+            self.value = NAN
+        else:
+            std = self._std()
+            self.value = (x - self._mean) / std if std > 0.0 else NAN
+        return self.value
+
+
+class _RollingExtremum(Indicator):
+    """Min/max glissant par deque monotone: O(1) amorti par barre."""
+
+    def __init__(self, period: int, use_max: bool):
+        self.period = period
+        self._max = use_max
+        self._dq: deque[tuple[int, float]] = deque()
+        self._i = 0
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        dq = self._dq
+        if self._max:
+            while dq and dq[-1][1] <= x:
+                dq.pop()
+        else:
+            while dq and dq[-1][1] >= x:
+                dq.pop()
+        dq.append((self._i, x))
+        if dq[0][0] <= self._i - self.period:
+            dq.popleft()
+        self._i += 1
+        self.value = dq[0][1] if self._i >= self.period else NAN
+        return self.value
+
+
+class RollingMax(_RollingExtremum):
+    def __init__(self, period: int):
+        super().__init__(period, use_max=True)
+
+
+class RollingMin(_RollingExtremum):
+    def __init__(self, period: int):
+        super().__init__(period, use_max=False)
+
+
+class Derivative(Indicator):
+    """Différence `v(t) - v(t - lag)` d'une série (brute ou sortie d'un autre indicateur)."""
+
+    def __init__(self, lag: int = 1):
+        self.lag = lag
+        self._win = RingBuffer(lag + 1)
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        self._win.push(x)
+        self.value = x - self._win.oldest() if self._win.full else NAN
+        return self.value
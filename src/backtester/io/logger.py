@@ -0,0 +1,83 @@
+from __future__ import annotations
+import time
+
+import numpy as np
+import pandas as pd
+
+# colonnes par table; "idx" pointe dans les tableaux de barres
+TABLES = {
+    "signals": ("symbol", "direction", "qty"),
+    "fills": ("symbol", "direction", "fill_price", "qty", "commission", "slippage"),
+    "orders": ("symbol", "direction", "qty", "order_type"),
+    "positions": ("symbol", "qty", "avg_price"),
+}
+_DTYPES = {"idx": np.int64, "direction": np.int64, "symbol": str, "order_type": str}
+
+
+class RunLogger:
+    """Enregistre un run barre à barre sous forme de colonnes (voir io/persistence.py).
+
+    - bars: t (ns epoch), close (du premier symbole de la barre), cash, net_liquidation_value, equity
+    - signals / fills / orders: une ligne par évènement
+    - positions: seulement les (idx, symbole) dont qty ou avg_price a changé
+
+    Tout est gardé en mémoire (listes Python, ~4 x 32 octets par barre) jusqu'à `arrays()`: O(T),
+    même derrière un StreamingDataHandler. Pour un run plus long que la RAM, suivre les métriques
+    avec analytics.online.OnlineMetrics (O(1)) plutôt que de l'enregistrer.
+    """
+
+    def __init__(self) -> None:
+        self.bars: dict[str, list] = {"t": [], "close": [], "cash": [], "net_liquidation_value": []}
+        self.tables: dict[str, dict[str, list]] = {
+            name: {c: [] for c in ("idx",) + cols} for name, cols in TABLES.items()
+        }
+        self.seconds = 0.0
+        self._last_pos: dict[str, tuple[float, float]] = {}
+
+    def log(self, engine) -> None:
+        """À appeler après chaque `engine.step()` qui a traité une barre."""
+        market_events, signals, orders, fills = engine.last_bar
+        portfolio = engine.portfolio
+        i = len(self.bars["t"])
+        self.bars["t"].append(pd.Timestamp(market_events[0].timestamp).value)
+        self.bars["close"].append(market_events[0].data.get("close", np.nan))
+        self.bars["cash"].append(portfolio.cash)
+        self.bars["net_liquidation_value"].append(portfolio.net_liquidation_value)
+
+        for name, events in (("signals", signals), ("fills", fills), ("orders", orders)):
+            table = self.tables[name]
+            for ev in events:
+                table["idx"].append(i)
+                for col in TABLES[name]:
+                    table[col].append(getattr(ev, col))
+
+        positions = self.tables["positions"]
+        for sym, pos in portfolio.positions.items():
+            state = (pos.qty, pos.avg_price)
+            if self._last_pos.get(sym) != state:
+                self._last_pos[sym] = state
+                positions["idx"].append(i)
+                positions["symbol"].append(sym)
+                positions["qty"].append(pos.qty)
+                positions["avg_price"].append(pos.avg_price)
+
+    def run(self, engine) -> RunLogger:
+        start = time.perf_counter()
+        while engine.step() is not None:
+            self.log(engine)
+        self.seconds = time.perf_counter() - start
+        return self
+
+    def arrays(self) -> dict[str, dict[str, np.ndarray]]:
+        """Tables en tableaux NumPy typés (texte en unicode largeur fixe: mappable)."""
+        bars = {
+            "t": np.asarray(self.bars["t"], dtype=np.int64),
+            "close": np.asarray(self.bars["close"], dtype=float),
+            "cash": np.asarray(self.bars["cash"], dtype=float),
+            "net_liquidation_value": np.asarray(self.bars["net_liquidation_value"], dtype=float),
+        }
+        bars["equity"] = bars["cash"] + bars["net_liquidation_value"]
+        out = {"bars": bars}
+        for name, table in self.tables.items():
+            out[name] = {col: np.asarray(values, dtype=_DTYPES.get(col, float)) for col, values in table.items()}
+        return out
@@ -0,0 +1,203 @@
+from __future__ import annotations
+import json
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+from src.backtester.analytics.downsample import LODPyramid
+from src.backtester.analytics.online import batch_metrics
+from src.backtester.io.logger import RunLogger
+
+_META = "meta.json"
+_INDEX = "index.ndjson"
+LOD_SERIES = ("close", "equity")
+SUMMARY_KEYS = ("final_equity", "total_return", "sharpe", "sortino", "max_drawdown", "volatility", "n_bars")
+
+
+@dataclass
+class StoredRun:
+    meta: dict[str, Any]
+    tables: dict[str, dict[str, np.ndarray]]  # tables["bars"]["equity"], tables["fills"]["qty"], ...
+
+    @property
+    def equity(self) -> np.ndarray:
+        return self.tables["bars"]["equity"]
+
+    def keep_indices(self) -> np.ndarray:
+        """Barres portant un signal ou un fill (toujours gardées par le sous-échantillonnage)."""
+        parts = [self.tables[t]["idx"] for t in ("signals", "fills") if t in self.tables]
+        return np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+
+def _write_lod(directory: Path, bars: dict[str, np.ndarray]) -> dict[str, Any]:
+    series = {k: np.asarray(bars[k]) for k in LOD_SERIES if k in bars}
+    pyramid = LODPyramid.build(series)
+    files = []
+    for k, level in enumerate(pyramid.levels):
+        name = f"lod.{k}.npy"
+        np.save(directory / name, level, allow_pickle=False)
+        files.append(name)
+    return {"n": pyramid.n, "series": list(series), "files": files}
+
+
+def _summary(equity: np.ndarray, periods_per_year: int) -> dict[str, float]:
+    if equity.size == 0:
+        return {k: None for k in SUMMARY_KEYS}
+    m = batch_metrics(equity[None, :], periods_per_year)
+    out = {k: float(m[k][0]) for k in SUMMARY_KEYS if k in m}
+    out["final_equity"] = float(equity[-1])
+    out["n_bars"] = int(equity.size)
+    return {k: (None if v != v else v) for k, v in out.items()}  # NaN -> None (JSON)
+
+
+class RunStore:
+    """Runs persistés sous `root`: un dossier par run (meta.json + un `.npy` par colonne, relu en mmap)
+    et un index `index.ndjson` en ajout seul (une ligne par run: id, spec, métriques résumées).
+
+    Ajouter un run = écrire son dossier puis une ligne d'index; les requêtes (top N par Sharpe, ...)
+    ne lisent que l'index.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        (self.root / "runs").mkdir(parents=True, exist_ok=True)
+
+    def _dir(self, run_id: str) -> Path:
+        if not run_id or "/" in run_id or run_id.startswith("."):
+            raise KeyError(run_id)
+        return self.root / "runs" / run_id
+
+    # ---------- écriture
+    def save(
+        self,
+        tables: dict[str, dict[str, np.ndarray]],
+        spec: dict[str, Any],
+        params: dict[str, Any] | None = None,
+        data_fingerprint: str | None = None,
+        timings: dict[str, Any] | None = None,
+        periods_per_year: int = 252,
+    ) -> str:
+        run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        tmp = self.root / "runs" / f".{run_id}.tmp"
+        tmp.mkdir(parents=True)
+        columns = {}
+        for table, cols in tables.items():
+            columns[table] = {}
+            for col, values in cols.items():
+                name = f"{table}.{col}.npy"
+                np.save(tmp / name, np.ascontiguousarray(values), allow_pickle=False)
+                columns[table][col] = {"file": name, "dtype": str(values.dtype), "len": len(values)}
+        meta = {
+            "run_id": run_id,
+            "created": time.time(),
+            "spec": spec,
+            "params": params or {},
+            "data_fingerprint": data_fingerprint,
+            "timings": timings or {},
+            "summary": _summary(tables["bars"]["equity"], periods_per_year),
+            "columns": columns,
+            "lod": _write_lod(tmp, tables["bars"]),
+        }
+        (tmp / _META).write_text(json.dumps(meta, default=str))
+        os.replace(tmp, self._dir(run_id))          # le run n'est visible qu'une fois complet
+        line = {k: meta[k] for k in ("run_id", "created", "spec", "params", "data_fingerprint", "summary")}
+        with open(self.root / _INDEX, "a") as f:
+            f.write(json.dumps(line, default=str) + "\n")
+        return run_id
+
+    def record(self, engine, spec: dict[str, Any], **kwargs) -> str:
+        """Fait tourner `engine` jusqu'au bout avec un RunLogger et stocke le résultat."""
+        logger = RunLogger().run(engine)
+        timings = {"run_seconds": logger.seconds, **kwargs.pop("timings", {})}
+        if engine.profiler is not None:
+            engine.profiler.stop()
+            timings["profile"] = engine.profiler.summary()
+        return self.save(logger.arrays(), spec, timings=timings, **kwargs)
+
+    # ---------- lecture
+    def load(self, run_id: str, mmap: bool = True, tables: list[str] | None = None) -> StoredRun:
+        directory = self._dir(run_id)
+        if not (directory / _META).exists():
+            raise KeyError(run_id)
+        meta = json.loads((directory / _META).read_text())
+        out = {}
+        for table, cols in meta["columns"].items():
+            if tables is not None and table not in tables:
+                continue
+            out[table] = {
+                col: np.load(directory / c["file"], mmap_mode="r" if mmap and c["len"] else None)
+                for col, c in cols.items()
+            }
+        return StoredRun(meta, out)
+
+    def pyramid(self, run_id: str) -> LODPyramid:
+        """Couches LOD du run (écrites par save; construites et ajoutées au run si absentes)."""
+        directory = self._dir(run_id)
+        meta = self.meta(run_id)
+        lod = meta.get("lod")
+        if lod is None:                                 # run enregistré avant les couches LOD
+            bars = self.load(run_id, tables=["bars"]).tables["bars"]
+            lod = meta["lod"] = _write_lod(directory, bars)
+            tmp = directory / f"{_META}.tmp{os.getpid()}"
+            tmp.write_text(json.dumps(meta, default=str))
+            os.replace(tmp, directory / _META)
+        return LODPyramid([np.load(directory / f, mmap_mode="r") for f in lod["files"]], lod["n"])
+
+    def meta(self, run_id: str) -> dict[str, Any]:
+        return json.loads((self._dir(run_id) / _META).read_text())
+
+    def index(self) -> list[dict[str, Any]]:
+        """Lignes de l'index des runs encore présents sur disque."""
+        path = self.root / _INDEX
+        if not path.exists():
+            return []
+        rows = {}
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    rows[row["run_id"]] = row
+        return [r for r in rows.values() if (self.root / "runs" / r["run_id"]).is_dir()]
+
+    def query(
+        self,
+        sort_by: str = "sharpe",
+        top: int | None = None,
+        ascending: bool = False,
+        where: Callable[[dict[str, Any]], bool] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Runs triés par une métrique du résumé (ex: top 10 par Sharpe), sans ouvrir leurs tableaux."""
+        rows = [r for r in self.index() if where is None or where(r)]
+        rows = [r for r in rows if r["summary"].get(sort_by) is not None]
+        rows.sort(key=lambda r: r["summary"][sort_by], reverse=not ascending)
+        return rows[:top] if top is not None else rows
+
+    # ---------- maintenance
+    def delete(self, run_id: str) -> None:
+        shutil.rmtree(self._dir(run_id), ignore_errors=True)
+
+    def compact(self) -> int:
+        """Réécrit l'index sans les runs supprimés; retourne le nombre de runs restants."""
+        rows = self.index()
+        tmp = self.root / f"{_INDEX}.tmp"
+        tmp.write_text("".join(json.dumps(r, default=str) + "\n" for r in rows))
+        os.replace(tmp, self.root / _INDEX)
+        return len(rows)
+
+    def reindex(self) -> int:
+        """Reconstruit l'index depuis les meta.json (index perdu ou corrompu)."""
+        rows = []
+        for d in sorted((self.root / "runs").iterdir()):
+            if d.is_dir() and not d.name.startswith(".") and (d / _META).exists():
+                meta = json.loads((d / _META).read_text())
+                rows.append({k: meta.get(k) for k in ("run_id", "created", "spec", "params", "data_fingerprint", "summary")})
+        tmp = self.root / f"{_INDEX}.tmp"
+        tmp.write_text("".join(json.dumps(r, default=str) + "\n" for r in rows))
+        os.replace(tmp, self.root / _INDEX)
+        return len(rows)
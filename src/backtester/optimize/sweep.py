@@ -0,0 +1,191 @@
+from __future__ import annotations
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields, replace
+from typing import Any, Callable, Iterable
+
+import numpy as np
+import pandas as pd
+
+from src.backtester.analytics.metrics import summary_metrics
+from src.backtester.core.engine import BacktestEngine
+from src.backtester.core.vectorized import VectorizedEngine
+from src.backtester.data.csv_handler import PERatioSingleCSVDataHandler
+from src.backtester.data.loaders.frame_loader import FrameLoader
+from src.backtester.data.shared import SharedFrame, load_frame
+from src.backtester.execution.broker_sim import SimulatedBroker
+from src.backtester.portfolio.portfolio import SimplePortfolio
+from src.backtester.strategy.base import StrategyParams
+from src.backtester.strategy.pe_ratio_strategy import PERatioStrategy, PEParams
+
+
+def grid(**axes: Iterable[Any]) -> list[dict[str, Any]]:
+    """Produit cartésien: grid(hi=[20, 25], lo=[10, 15]) -> 4 combinaisons."""
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(list(v) for v in axes.values()))]
+
+
+def random_search(space: dict[str, Any], n: int, seed: int | None = None) -> list[dict[str, Any]]:
+    """Tirages aléatoires: un tuple (lo, hi) est tiré uniformément, une liste est tirée au choix."""
+    rng = np.random.default_rng(seed)
+    combos = []
+    for _ in range(n):
+        combo = {}
+        for name, dom in space.items():
+            if isinstance(dom, tuple):
+                combo[name] = float(rng.uniform(dom[0], dom[1]))
+            else:
+                combo[name] = list(dom)[rng.integers(len(dom))]
+        combos.append(combo)
+    return combos
+
+
+# ---------- worker side ----------
+_FRAME: pd.DataFrame | None = None
+
+
+def _init_worker(handle: str) -> None:
+    global _FRAME
+    _FRAME = load_frame(handle)  # mappé, lecture seule: pas de copie par tâche
+
+
+class _CountingBroker(SimulatedBroker):
+    def __init__(self, inner: SimulatedBroker):
+        super().__init__(inner.commission, inner.slippage_bp)
+        self.n_fills = 0
+
+    def execute(self, orders, market_events):
+        fills = super().execute(orders, market_events)
+        self.n_fills += len(fills)
+        return fills
+
+
+def run_equity(
+    df: pd.DataFrame,
+    params: StrategyParams,
+    symbol: str,
+    initial_cash: float,
+    strategy_factory: Callable[[Any, float], Any] = PERatioStrategy,
+    commission: float = 0.0,
+    slippage_bp: float = 0.0,
+    engine: str = "vectorized",
+) -> tuple[pd.Series, int]:
+    """Lance un backtest sur un frame déjà chargé. Retourne (equity par barre, nombre de fills)."""
+    handler = PERatioSingleCSVDataHandler(FrameLoader(df), symbol)
+    strategy = strategy_factory(params, initial_cash)
+    broker = SimulatedBroker(commission_per_trade=commission, slippage_bp=slippage_bp)
+
+    if engine == "vectorized":
+        result = VectorizedEngine(handler.to_frame(), strategy, symbol, initial_cash, broker).run()
+        return pd.Series(result.equity, index=result.index), len(result.fills)
+    if engine == "event":
+        portfolio = SimplePortfolio(cash=initial_cash)
+        bt = BacktestEngine(handler, strategy, portfolio, _CountingBroker(broker))
+        values = []
+        while bt.step() is not None:
+            values.append(portfolio.cash + portfolio.net_liquidation_value)
+        return pd.Series(values, index=df.index[: len(values)]), bt.broker.n_fills
+    raise ValueError(f"Unknown engine '{engine}'")
+
+
+def run_one(
+    df: pd.DataFrame,
+    params: StrategyParams,
+    symbol: str,
+    initial_cash: float,
+    strategy_factory: Callable[[Any, float], Any] = PERatioStrategy,
+    commission: float = 0.0,
+    slippage_bp: float = 0.0,
+    engine: str = "vectorized",
+    periods_per_year: int = 252,
+) -> dict[str, float]:
+    """Lance un backtest sur un frame déjà chargé et retourne ses métriques de synthèse."""
+    equity, n_fills = run_equity(
+        df, params, symbol, initial_cash, strategy_factory, commission, slippage_bp, engine
+    )
+    metrics = summary_metrics(equity, periods_per_year=periods_per_year)
+    metrics["n_fills"] = n_fills
+    return metrics
+
+
+def _run_task(combo: dict[str, Any], base: StrategyParams, kwargs: dict[str, Any]) -> dict[str, Any]:
+    try:
+        metrics = run_one(_FRAME, replace(base, **combo), **kwargs)
+    except Exception as exc:  # une combinaison invalide ne doit pas tuer le sweep
+        metrics = {"error": repr(exc)}
+    return {**combo, **metrics}
+
+
+# ---------- public API ----------
+def run_sweep(
+    df: pd.DataFrame,
+    combos: list[dict[str, Any]],
+    symbol: str,
+    initial_cash: float,
+    base_params: StrategyParams | None = None,
+    strategy_factory: Callable[[Any, float], Any] = PERatioStrategy,
+    commission: float = 0.0,
+    slippage_bp: float = 0.0,
+    engine: str = "vectorized",
+    periods_per_year: int = 252,
+    max_workers: int | None = None,
+    sort_by: str = "sharpe",
+) -> pd.DataFrame:
+    """Évalue chaque combinaison de paramètres sur un pool de processus.
+
+    `df` est écrit une seule fois en colonnes `.npy` puis mappé par chaque worker à son démarrage;
+    les tâches ne transportent que leur dict de paramètres.
+    Retourne une ligne par combinaison (paramètres + métriques), triée par `sort_by` décroissant.
+    """
+    base = base_params or PEParams()
+    known = {f.name for f in fields(base)}
+    unknown = {k for combo in combos for k in combo} - known
+    if unknown:
+        raise ValueError(f"Unknown parameters for {type(base).__name__}: {sorted(unknown)}")
+
+    kwargs = dict(
+        symbol=symbol,
+        initial_cash=initial_cash,
+        strategy_factory=strategy_factory,
+        commission=commission,
+        slippage_bp=slippage_bp,
+        engine=engine,
+        periods_per_year=periods_per_year,
+    )
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(combos) // (workers * 4))
+
+    with SharedFrame(df) as shared:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(shared.handle,)
+        ) as pool:
+            rows = list(
+                pool.map(
+                    _run_task,
+                    combos,
+                    itertools.repeat(base),
+                    itertools.repeat(kwargs),
+                    chunksize=chunksize,
+                )
+            )
+
+    results = pd.DataFrame(rows)
+    if sort_by in results.columns:
+        results = results.sort_values(sort_by, ascending=False, na_position="last", ignore_index=True)
+    return results
+
+
+def parse_axis(text: str) -> list[float]:
+    return [float(v) for v in text.split(",") if v.strip()]
+
+
+def main() -> None:
+    """Équivalent de `backtester sweep` (options définies dans src/backtester/cli.py)."""
+    import sys
+    from src.backtester.cli import app
+
+    app(["sweep", *sys.argv[1:]])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+from __future__ import annotations
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from src.backtester.analytics.metrics import summary_metrics
+from src.backtester.data.shared import SharedFrame, load_frame
+from src.backtester.optimize.sweep import run_equity
+from src.backtester.strategy.base import StrategyParams
+from src.backtester.strategy.pe_ratio_strategy import PERatioStrategy, PEParams
+
+
+@dataclass(frozen=True)
+class Window:
+    train_start: int                        # positions dans l'index (demi-ouvert: [start, end))
+    train_end: int
+    test_end: int
+
+
+def split_windows(n_bars: int, train: int, test: int, step: int | None = None, anchored: bool = False) -> list[Window]:
+    """Fenêtres train/test successives sur `n_bars` barres.
+
+    rolling: le train glisse de `step` (défaut `test`) barres; anchored: le train démarre toujours à 0.
+    Le dernier test peut être plus court que `test`.
+    """
+    if train < 1 or test < 1:
+        raise ValueError("train and test must be >= 1")
+    step = step or test
+    windows = []
+    train_end = train
+    while train_end < n_bars:
+        start = 0 if anchored else train_end - train
+        windows.append(Window(start, train_end, min(train_end + test, n_bars)))
+        train_end += step
+    return windows
+
+
+@dataclass
+class WalkForwardResult:
+    windows: pd.DataFrame                   # une ligne par fenêtre: bornes, meilleurs params, métriques
+    oos_equity: pd.Series                   # equity hors échantillon recollée
+    summary: dict[str, float]
+
+
+# ---------- worker side
+_FRAME: pd.DataFrame | None = None
+
+
+def _init_worker(handle: str) -> None:
+    global _FRAME
+    _FRAME = load_frame(handle)
+
+
+def evaluate_window(
+    df: pd.DataFrame,
+    window: Window,
+    combos: list[dict[str, Any]],
+    base: StrategyParams,
+    metric: str,
+    kwargs: dict[str, Any],
+) -> dict[str, Any]:
+    """Optimise sur le train (slices `iloc`, pas de copie), puis évalue le meilleur jeu sur le test."""
+    periods_per_year = kwargs.pop("periods_per_year", 252)
+    train_df = df.iloc[window.train_start:window.train_end]
+    test_df = df.iloc[window.train_end:window.test_end]
+
+    best, best_score = None, -np.inf
+    for combo in combos:
+        equity, _ = run_equity(train_df, replace(base, **combo), **kwargs)
+        score = summary_metrics(equity, periods_per_year)[metric]
+        if best is None or (not np.isnan(score) and score > best_score):
+            best, best_score = combo, score
+
+    # le meilleur jeu tourne sur train + test: les positions prises sur le train sont portées
+    # dans le test, seuls les rendements du test sont conservés
+    full = df.iloc[window.train_start:window.test_end]
+    equity, _ = run_equity(full, replace(base, **best), **kwargs)
+    n_train = window.train_end - window.train_start
+    values = equity.to_numpy()
+    returns = values[n_train:] / values[n_train - 1:-1] - 1.0
+    test_equity = pd.Series(kwargs["initial_cash"] * np.cumprod(1.0 + returns), index=test_df.index)
+    test_metrics = summary_metrics(test_equity, periods_per_year)
+    return {
+        "window": window,
+        "params": best,
+        f"train_{metric}": best_score,
+        **{f"test_{k}": v for k, v in test_metrics.items()},
+        "returns": returns,
+    }
+
+
+def _window_task(window: Window, combos, base, metric, kwargs) -> dict[str, Any]:
+    return evaluate_window(_FRAME, window, combos, base, metric, dict(kwargs))
+
+
+# ---------- public API
+def walk_forward(
+    df: pd.DataFrame,
+    combos: list[dict[str, Any]],
+    symbol: str,
+    initial_cash: float,
+    train: int,
+    test: int,
+    step: int | None = None,
+    anchored: bool = False,
+    metric: str = "sharpe",
+    base_params: StrategyParams | None = None,
+    strategy_factory: Callable[[Any, float], Any] = PERatioStrategy,
+    commission: float = 0.0,
+    slippage_bp: float = 0.0,
+    periods_per_year: int = 252,
+    max_workers: int | None = None,
+) -> WalkForwardResult:
+    """Walk-forward: pour chaque fenêtre, choisit la combinaison qui maximise `metric` sur le train,
+    puis la rejoue sur le test qui suit. Les fenêtres tournent en parallèle sur un pool de processus
+    qui mappent tous le même frame (voir data/shared.py).
+
+    Le jeu retenu est rejoué sur train + test (les positions ouvertes pendant le train restent
+    en portefeuille) et seuls les rendements du test sont gardés; l'equity hors échantillon
+    recolle ces rendements barre à barre en partant de `initial_cash`.
+    """
+    windows = split_windows(len(df), train, test, step, anchored)
+    if not windows:
+        raise ValueError(f"Not enough bars ({len(df)}) for train={train}")
+    base = base_params or PEParams()
+    kwargs = dict(
+        symbol=symbol,
+        initial_cash=initial_cash,
+        strategy_factory=strategy_factory,
+        commission=commission,
+        slippage_bp=slippage_bp,
+        engine="vectorized",
+        periods_per_year=periods_per_year,
+    )
+
+    workers = min(len(windows), max_workers or os.cpu_count() or 1)
+    with SharedFrame(df) as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared.handle,)) as pool:
+            rows = list(
+                pool.map(
+                    _window_task,
+                    windows,
+                    itertools.repeat(combos),
+                    itertools.repeat(base),
+                    itertools.repeat(metric),
+                    itertools.repeat(kwargs),
+                )
+            )
+
+    # tests qui se chevauchent (step < test): on garde chaque barre une seule fois, du test le plus ancien
+    returns, positions, covered = [], [], 0
+    for row in rows:
+        w = row["window"]
+        keep = max(w.train_end, covered)
+        returns.append(row["returns"][keep - w.train_end:])
+        positions.append(np.arange(keep, w.test_end))
+        covered = w.test_end
+    oos = pd.Series(
+        initial_cash * np.cumprod(1.0 + np.concatenate(returns)),
+        index=df.index[np.concatenate(positions)],
+    )
+
+    table = pd.DataFrame(
+        [
+            {
+                "train_start": df.index[r["window"].train_start],
+                "train_end": df.index[r["window"].train_end - 1],
+                "test_start": df.index[r["window"].train_end],
+                "test_end": df.index[r["window"].test_end - 1],
+                **r["params"],
+                **{k: v for k, v in r.items() if k not in ("window", "params", "returns")},
+            }
+            for r in rows
+        ]
+    )
+    return WalkForwardResult(table, oos, summary_metrics(oos, periods_per_year))
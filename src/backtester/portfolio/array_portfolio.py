@@ -0,0 +1,209 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+from src.backtester.core.interfaces import Portfolio
+from src.backtester.core.events import SignalEvent, OrderEvent, FillEvent, MarketEvent, MarketBatch
+from src.backtester.core.batch import BarContext, SignalBatch, OrderBatch, FillBatch, Universe
+from src.backtester.portfolio.portfolio import Position
+
+
+class ArrayPortfolio(Portfolio):
+    """Portefeuille pour de grands univers: symboles -> ids entiers, état en tableaux NumPy.
+
+    Même règles que SimplePortfolio (achat si le cash couvre qty * close, vente si la position
+    couvre qty, prix moyen pondéré à l'achat). Différence: un symbole détenu mais absent d'une
+    barre reste valorisé à son dernier prix connu au lieu de sortir de la NLV.
+    """
+
+    def __init__(self, cash: float, capacity: int = 64, equity_capacity: int = 1024):
+        self.cash = cash
+        self.net_liquidation_value = 0.0
+        self.symbols: list[str] = []
+        self._ids: dict[str, int] = {}
+        self.qty = np.zeros(capacity)
+        self.avg_price = np.zeros(capacity)
+        self.last_price = np.full(capacity, np.nan)
+        self.value = np.zeros(capacity)
+        self.traded = np.zeros(capacity, dtype=bool)
+        self._equity = np.empty(equity_capacity)
+        self._equity_ts = np.empty(equity_capacity, dtype="datetime64[ns]")
+        self._n_equity = 0
+        self._batch_ids: tuple[np.ndarray, np.ndarray] | None = None   # (batch.symbols, ids portefeuille)
+        self._universe_ids: tuple[Universe, np.ndarray] | None = None
+
+    # ---------- symbol ids
+    def symbol_id(self, symbol: str) -> int:
+        i = self._ids.get(symbol)
+        if i is None:
+            i = self._ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            if i >= len(self.qty):
+                self._grow(2 * len(self.qty))
+        return i
+
+    def symbol_ids(self, symbols) -> np.ndarray:
+        get = self._ids.get
+        ids = [get(s) for s in symbols]
+        if None in ids:
+            ids = [self.symbol_id(s) for s in symbols]
+        return np.array(ids, dtype=np.intp)
+
+    def _grow(self, capacity: int) -> None:
+        n = len(self.qty)
+        defaults = (("qty", 0.0), ("avg_price", 0.0), ("last_price", np.nan), ("value", 0.0), ("traded", False))
+        for name, fill in defaults:
+            old = getattr(self, name)
+            new = np.full(capacity, fill, dtype=old.dtype)
+            new[:n] = old
+            setattr(self, name, new)
+
+    # ---------- Portfolio interface
+    def generate_orders(self, signals: list[SignalEvent], market_events: list[MarketEvent]) -> list[OrderEvent]:
+        if not signals:
+            return []
+        self.mark_to_market_events(market_events)
+        ids = self.symbol_ids([s.symbol for s in signals])
+        direction = np.fromiter((s.direction for s in signals), dtype=np.int64, count=len(signals))
+        qty = np.fromiter((s.qty for s in signals), dtype=float, count=len(signals))
+        px = self.last_price[ids]
+        accepted = ((direction == 1) & (self.cash >= qty * px)) | ((direction == -1) & (self.qty[ids] >= qty))
+        return [
+            OrderEvent.from_signal(s)
+            for s, ok in zip(signals, accepted.tolist())
+            if ok
+        ]
+
+    def update_on_fill(self, fills: list[FillEvent], market_events: list[MarketEvent]) -> None:
+        if fills:
+            n = len(fills)
+            self.apply_fills(
+                self.symbol_ids([f.symbol for f in fills]),
+                np.fromiter((f.direction for f in fills), dtype=np.int64, count=n),
+                np.fromiter((f.qty for f in fills), dtype=float, count=n),
+                np.fromiter((f.fill_price for f in fills), dtype=float, count=n),
+                np.fromiter((f.commission for f in fills), dtype=float, count=n),
+                np.fromiter((f.slippage for f in fills), dtype=float, count=n),
+            )
+        self.mark_to_market_events(market_events)
+        if market_events:
+            self.record_equity(market_events[0].timestamp)
+
+    # ---------- BatchEngine (core/batch.py)
+    def _ids_for(self, universe: Universe) -> np.ndarray:
+        """ids de l'univers -> ids du portefeuille (table mise en cache, étendue si l'univers grandit)."""
+        cached = self._universe_ids
+        if cached is None or cached[0] is not universe or len(cached[1]) != len(universe):
+            cached = self._universe_ids = (universe, self.symbol_ids(universe.symbols))
+        return cached[1]
+
+    def generate_orders_batch(self, signals: SignalBatch, ctx: BarContext) -> OrderBatch:
+        ids = self._ids_for(ctx.universe)
+        self.mark_to_market(ids[ctx.mask], ctx.close[ctx.mask])
+        px = self.last_price[ids[signals.ids]]
+        keep = ((signals.direction == 1) & (self.cash >= signals.qty * px)) | (
+            (signals.direction == -1) & (self.qty[ids[signals.ids]] >= signals.qty)
+        )
+        return OrderBatch.from_signals(signals, keep, ctx)
+
+    def update_on_fills_batch(self, fills: FillBatch, ctx: BarContext) -> None:
+        ids = self._ids_for(ctx.universe)
+        if len(fills):
+            self.apply_fills(
+                ids[fills.ids], fills.direction, fills.qty, fills.fill_price, fills.commission, fills.slippage
+            )
+        self.mark_to_market(ids[ctx.mask], ctx.close[ctx.mask])
+        self.record_equity(ctx.timestamp)
+
+    # ---------- vectorized core
+    def apply_fills(
+        self,
+        ids: np.ndarray,
+        direction: np.ndarray,
+        qty: np.ndarray,
+        price: np.ndarray,
+        commission: np.ndarray,
+        slippage: np.ndarray,
+    ) -> None:
+        """Applique un lot de fills. Vectorisé si chaque symbole n'apparaît qu'une fois dans le lot."""
+        if len(np.unique(ids)) != len(ids):
+            for k in range(len(ids)):
+                self.apply_fills(ids[k:k + 1], direction[k:k + 1], qty[k:k + 1], price[k:k + 1],
+                                 commission[k:k + 1], slippage[k:k + 1])
+            return
+
+        buy = direction > 0
+        old_qty = self.qty[ids]
+        # vente plafonnée à la quantité détenue (comme SimplePortfolio): pas de cash créé à partir de rien
+        capped = ~buy & (qty > old_qty)
+        if capped.any():
+            held = np.maximum(old_qty, 0.0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                slippage = np.where(capped, np.where(held > 0, slippage * held / qty, 0.0), slippage)
+            commission = np.where(capped & (held <= 0), 0.0, commission)
+            qty = np.where(capped, held, qty)
+        change = qty * direction
+        new_qty = np.where(buy, old_qty + change, np.maximum(0.0, old_qty + change))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            bought_avg = (self.avg_price[ids] * old_qty + price * change) / new_qty
+        avg = np.where(buy, np.where(new_qty == 0, 0.0, bought_avg), self.avg_price[ids])
+        avg = np.where(~buy & (new_qty == 0), 0.0, avg)
+
+        self.qty[ids] = new_qty
+        self.avg_price[ids] = avg
+        self.traded[ids] = True
+        notional = price * qty
+        cash_delta = np.where(buy, -(notional + commission + slippage), notional - commission - slippage)
+        self.cash += float(cash_delta.sum()) if len(cash_delta) > 1 else float(cash_delta[0])
+
+    def mark_to_market(self, ids: np.ndarray, prices: np.ndarray) -> None:
+        self.last_price[ids] = prices
+        n = len(self.symbols)
+        held = self.qty[:n] != 0
+        self.value[:n] = np.where(held, self.qty[:n] * self.last_price[:n], 0.0)
+        self.net_liquidation_value = float(self.value[:n].sum())
+
+    def mark_to_market_events(self, market_events: list[MarketEvent]) -> None:
+        if not market_events:
+            return
+        ids = self.symbol_ids([e.symbol for e in market_events])
+        prices = np.array([e.data["close"] for e in market_events], dtype=float)
+        self.mark_to_market(ids, prices)
+
+    def mark_to_market_batch(self, batch: MarketBatch, field: str = "close") -> None:
+        """Mark-to-market depuis une MarketBatch; les ids du tableau de symboles sont mis en cache."""
+        if self._batch_ids is None or self._batch_ids[0] is not batch.symbols:
+            self._batch_ids = (batch.symbols, self.symbol_ids(batch.symbols))
+        ids = self._batch_ids[1][batch.mask]
+        self.mark_to_market(ids, batch.field(field)[batch.mask])
+
+    # ---------- equity curve
+    def record_equity(self, timestamp) -> None:
+        if self._n_equity == len(self._equity):
+            self._equity = np.resize(self._equity, 2 * len(self._equity))
+            self._equity_ts = np.resize(self._equity_ts, 2 * len(self._equity_ts))
+        self._equity[self._n_equity] = self.cash + self.net_liquidation_value
+        self._equity_ts[self._n_equity] = pd.Timestamp(timestamp).to_datetime64()
+        self._n_equity += 1
+
+    @property
+    def equity_curve(self) -> np.ndarray:
+        return self._equity[: self._n_equity]
+
+    def equity_series(self) -> pd.Series:
+        return pd.Series(self.equity_curve.copy(), index=pd.DatetimeIndex(self._equity_ts[: self._n_equity]))
+
+    # ---------- compat (API, affichage): pas pour la boucle chaude
+    @property
+    def positions(self) -> dict[str, Position]:
+        return {
+            sym: Position(sym, float(self.qty[i]), float(self.avg_price[i]), float(self.value[i]))
+            for i, sym in enumerate(self.symbols)
+            if self.traded[i]
+        }
+
+    def __str__(self):
+        return (
+            f"Current cash is: {self.cash}\nCurrent positions value is: {self.net_liquidation_value}\n"
+            f"Current total value: {self.cash + self.net_liquidation_value}\n\n"
+        )
@@ -1,7 +1,10 @@
 from __future__ import annotations
+from collections import deque
 from dataclasses import dataclass, field
+import numpy as np
 from src.backtester.core.interfaces import Portfolio
 from src.backtester.core.events import SignalEvent, OrderEvent, FillEvent, MarketEvent
+from src.backtester.core.batch import BarContext, SignalBatch, OrderBatch, FillBatch
 
 @dataclass
 class Position:
@@ -12,10 +15,17 @@ class Position:
 
 @dataclass
 class SimplePortfolio(Portfolio):
+    """`equity_window`: ne garder que les N dernières valeurs de `equity_curve` (deque bornée) au lieu
+    de tout l'historique, pour les runs en streaming où la mémoire ne doit pas croître avec T."""
     cash: float
     net_liquidation_value: float = 0.0
     positions: dict[str, Position] = field(default_factory=dict)
-    equity_curve: list[float] = field(default_factory=list)
+    equity_curve: list[float] | deque[float] = field(default_factory=list)
+    equity_window: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.equity_window is not None:
+            self.equity_curve = deque(self.equity_curve, maxlen=self.equity_window)
 
     def generate_orders(self, signals: list[SignalEvent], market_events: list[MarketEvent]) -> list[OrderEvent]:
         price_map = {market_event.symbol: market_event.data["close"] for market_event in market_events}
@@ -25,49 +35,46 @@ class SimplePortfolio(Portfolio):
 
             if signal.direction == 1:
                 if self.cash >= signal.qty * px:
-                    orders.append(
-                        OrderEvent(
-                            signal.symbol,
-                            signal.timestamp,
-                            signal.direction,
-                            signal.qty
-                        )
-                    )
+                    orders.append(OrderEvent.from_signal(signal))
 
             elif signal.direction == -1:
-                if self.positions.get(signal.symbol) >= signal.qty:
-                    orders.append(
-                        OrderEvent(
-                            signal.symbol,
-                            signal.timestamp,
-                            signal.direction,
-                            signal.qty
-                        )
-                    )
+                position = self.positions.get(signal.symbol)
+                if position is not None and position.qty >= signal.qty:
+                    orders.append(OrderEvent.from_signal(signal))
 
         return orders
 
     def update_on_fill(self, fills: list[FillEvent], market_events: list[MarketEvent]) -> None:
         for fill in fills:
-            position = self.positions.setdefault(fill.symbol, Position(symbol=fill.symbol))
-            qty_change = fill.qty * fill.direction
-
-            if qty_change > 0:  #buy
-                new_qty = position.qty + qty_change
-                position.avg_price = (
-                    0.0 if new_qty == 0 else 
-                    (position.avg_price * position.qty + fill.fill_price * qty_change) / new_qty
-                )
-                position.qty = new_qty
-                self.cash -= fill.fill_price * fill.qty + fill.commission + fill.slippage
-
-            else:               #sell           
-                position.qty = max(0.0, position.qty + qty_change)
-                self.cash += fill.fill_price * fill.qty - fill.commission - fill.slippage
-                if position.qty == 0:
-                    position.avg_price = 0.0
-                    
+            self._apply_fill(fill.symbol, fill.direction, fill.qty, fill.fill_price, fill.commission, fill.slippage)
         self.refresh_mark_to_market(market_events)
+        self.equity_curve.append(self.cash + self.net_liquidation_value)
+
+    def _apply_fill(
+        self, symbol: str, direction: int, qty: float, fill_price: float, commission: float, slippage: float
+    ) -> None:
+        position = self.positions.setdefault(symbol, Position(symbol=symbol))
+        qty_change = qty * direction
+
+        if qty_change > 0:  #buy
+            new_qty = position.qty + qty_change
+            position.avg_price = (
+                0.0 if new_qty == 0 else 
+                (position.avg_price * position.qty + fill_price * qty_change) / new_qty
+            )
+            position.qty = new_qty
+            self.cash -= fill_price * qty + commission + slippage
+
+        else:               #sell: jamais plus que la quantité détenue (pas de cash créé à partir de rien)
+            if qty > position.qty:
+                if position.qty <= 0.0:
+                    return
+                slippage *= position.qty / qty
+                qty = position.qty
+            position.qty = position.qty - qty
+            self.cash += fill_price * qty - commission - slippage
+            if position.qty == 0:
+                position.avg_price = 0.0
 
     def refresh_mark_to_market(self, market_events: list[MarketEvent]) -> None:
         net_liq = 0
@@ -79,6 +86,36 @@ class SimplePortfolio(Portfolio):
                 net_liq += position.current_value
 
         self.net_liquidation_value = net_liq
+
+    # ---------- BatchEngine (core/batch.py): prix lus dans le contexte de barre, pas de dict reconstruit
+    def generate_orders_batch(self, signals: SignalBatch, ctx: BarContext) -> OrderBatch:
+        px = ctx.close[signals.ids]
+        symbols = ctx.universe.symbols
+        held = np.array(
+            [getattr(self.positions.get(symbols[i]), "qty", -np.inf) for i in signals.ids.tolist()], dtype=float
+        )
+        keep = ((signals.direction == 1) & (self.cash >= signals.qty * px)) | (
+            (signals.direction == -1) & (held >= signals.qty)
+        )
+        return OrderBatch.from_signals(signals, keep, ctx)
+
+    def update_on_fills_batch(self, fills: FillBatch, ctx: BarContext) -> None:
+        symbols = ctx.universe.symbols
+        for i, d, q, p, c, s in zip(
+            fills.ids.tolist(), fills.direction.tolist(), fills.qty.tolist(),
+            fills.fill_price.tolist(), fills.commission.tolist(), fills.slippage.tolist(),
+        ):
+            self._apply_fill(symbols[i], d, q, p, c, s)
+
+        net_liq = 0
+        index, mask, close = ctx.universe.index, ctx.mask, ctx.close
+        for symbol, position in self.positions.items():
+            i = index.get(symbol)
+            if i is not None and i < len(mask) and mask[i]:
+                position.current_value = position.qty * float(close[i])
+                net_liq += position.current_value
+        self.net_liquidation_value = net_liq
+        self.equity_curve.append(self.cash + self.net_liquidation_value)
     
     def get_positions_current_prices(self) -> dict:
         positions_prices = {}
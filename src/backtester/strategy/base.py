@@ -1,6 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any
+import pandas as pd
 from src.backtester.core.interfaces import Strategy
 from src.backtester.core.events import MarketEvent, SignalEvent
 
@@ -16,4 +17,12 @@ class BaseStrategy(Strategy):
         self.params = params
 
     def on_market_event(self, events: list[MarketEvent]) -> list[SignalEvent]:
+        raise NotImplementedError
+
+    def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Version vectorisée de on_market_event.
+
+        `df` a une ligne par barre et les mêmes colonnes que MarketEvent.data.
+        Retourne un DataFrame aligné sur `df.index` avec les colonnes `direction` (+1/-1/0) et `qty`.
+        """
         raise NotImplementedError
\ No newline at end of file
@@ -1,6 +1,7 @@
 from src.backtester.strategy.base import BaseStrategy, StrategyParams
 from src.backtester.core.events import MarketEvent, SignalEvent
 from dataclasses import dataclass
+import numpy as np
 import pandas as pd 
 
 @dataclass
@@ -43,6 +44,13 @@ class PERatioStrategy(BaseStrategy):
             )
             
         return signals
+
+    def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
+        pe = df["pe"].to_numpy(dtype=float)
+        px = df["close"].to_numpy(dtype=float)
+        direction = np.where(pe > self.params.hi, -1, np.where(pe < self.params.lo, 1, 0))
+        qty = (self.params.pct * self.initial_amount) / px
+        return pd.DataFrame({"direction": direction, "qty": qty}, index=df.index)
     
     def new_signal(self, market_event: MarketEvent) -> bool:
         new_signal = True
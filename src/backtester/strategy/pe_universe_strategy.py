@@ -0,0 +1,38 @@
+from __future__ import annotations
+import numpy as np
+
+from src.backtester.strategy.base import BaseStrategy
+from src.backtester.strategy.pe_ratio_strategy import PEParams
+from src.backtester.core.events import MarketEvent, SignalEvent
+from src.backtester.core.batch import BarContext, SignalBatch
+
+
+class PEUniverseStrategy(BaseStrategy):
+    """Règle de PERatioStrategy appliquée à chaque symbole de la barre (et non au premier seulement).
+
+    `on_market_event` pour BacktestEngine, `on_bar` (vectorisé sur l'univers) pour BatchEngine:
+    mêmes signaux, dans le même ordre (ids croissants de l'univers = ordre des symboles du handler).
+    """
+
+    def __init__(self, params: PEParams, initial_amount: float, field: str = "pe"):
+        super().__init__(params)
+        self.initial_amount = initial_amount
+        self.field = field
+
+    def on_market_event(self, market_events: list[MarketEvent]) -> list[SignalEvent]:
+        signals: list[SignalEvent] = []
+        budget = self.params.pct * self.initial_amount
+        for e in market_events:
+            pe = e.data[self.field]
+            if pe > self.params.hi:
+                signals.append(SignalEvent(e.symbol, e.timestamp, -1, budget / e.data["close"]))
+            elif pe < self.params.lo:
+                signals.append(SignalEvent(e.symbol, e.timestamp, 1, budget / e.data["close"]))
+        return signals
+
+    def on_bar(self, ctx: BarContext) -> SignalBatch:
+        pe = ctx.field(self.field)
+        with np.errstate(invalid="ignore"):
+            direction = np.where(pe > self.params.hi, -1, np.where(pe < self.params.lo, 1, 0))
+        ids = np.flatnonzero(ctx.mask & (direction != 0))
+        return SignalBatch(ids, direction[ids], (self.params.pct * self.initial_amount) / ctx.close[ids])
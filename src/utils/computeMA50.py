@@ -1,16 +1,18 @@
 import pandas
 
-def computeMA50(df: pandas.DataFrame):
-    #df is a time serie dataframe, sorted on index = date
-    #prices = df["prices"]
-    #on commence rang 50
-    #on itère sur les 50 derniers row
-    #MA50 = somme 50 / 50
-    #return df avec nouvelle colonne "MA50", on supprime les lignes qui ne contiennet pas MA50 (donc les 50 premières lignes)
-    return True
+from src.backtester.indicators import batch
+
 
+def computeMA50(df: pandas.DataFrame, column: str = "close") -> pandas.DataFrame:
+    #df is a time serie dataframe, sorted on index = date
+    #return df avec nouvelle colonne "MA50", on supprime les lignes qui ne contiennent pas MA50 (donc les 49 premières lignes)
+    out = df.copy()
+    out["MA50"] = batch.sma(out[column].astype(float), 50)
+    return out.dropna(subset=["MA50"])
 
-def computeFristDerivativeMA50():
-    #does this makes sense ? 
 
-    return True
\ No newline at end of file
+def computeFristDerivativeMA50(df: pandas.DataFrame, column: str = "close") -> pandas.DataFrame:
+    #variation jour à jour de la MA50 (colonne "dMA50")
+    out = computeMA50(df, column)
+    out["dMA50"] = batch.derivative(out["MA50"])
+    return out
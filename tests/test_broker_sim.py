@@ -0,0 +1,76 @@
+import pandas as pd
+
+from src.backtester.core.events import MarketEvent, OrderEvent
+from src.backtester.execution.broker_sim import SimulatedBroker
+from src.backtester.portfolio.portfolio import SimplePortfolio
+
+
+def bar(day: int, close: float, high: float | None = None, low: float | None = None) -> list[MarketEvent]:
+    data = {"open": close, "close": close, "high": high or close, "low": low or close}
+    return [MarketEvent("X", pd.Timestamp("2024-01-01") + pd.Timedelta(days=day), data)]
+
+
+def step(broker, portfolio, orders, events):
+    fills = broker.execute(orders, events)
+    portfolio.update_on_fill(fills, events)
+    return fills
+
+
+def test_oco_stop_and_take_profit_sell_only_the_position_once():
+    broker = SimulatedBroker()
+    portfolio = SimplePortfolio(cash=10_000.0)
+    ts = pd.Timestamp("2024-01-01")
+    step(broker, portfolio, [OrderEvent("X", ts, 1, 10.0)], bar(0, 100.0))
+    resting = [
+        OrderEvent("X", ts, -1, 10.0, order_type="stop", stop_price=95.0),
+        OrderEvent("X", ts, -1, 10.0, order_type="limit", limit_price=110.0),
+    ]
+    step(broker, portfolio, resting, bar(1, 100.0))
+    fills = step(broker, portfolio, [], bar(2, 100.0, high=112.0, low=90.0))
+
+    assert sum(f.qty for f in fills) == 10.0
+    assert portfolio.positions["X"].qty == 0.0
+    assert portfolio.cash == 10_000.0 - 1_000.0 + fills[0].fill_price * 10.0
+    assert broker.open_orders() == []
+
+
+def test_resting_sell_after_position_closed_does_not_fill():
+    broker = SimulatedBroker()
+    portfolio = SimplePortfolio(cash=10_000.0)
+    ts = pd.Timestamp("2024-01-01")
+    step(broker, portfolio, [OrderEvent("X", ts, 1, 5.0)], bar(0, 100.0))
+    step(broker, portfolio, [OrderEvent("X", ts, -1, 5.0, order_type="limit", limit_price=120.0)], bar(1, 100.0))
+    step(broker, portfolio, [OrderEvent("X", ts, -1, 5.0)], bar(2, 100.0))
+    fills = step(broker, portfolio, [], bar(3, 125.0, high=125.0))
+
+    assert fills == []
+    assert portfolio.cash == 10_000.0
+
+
+def test_portfolio_caps_sell_fill_at_held_qty():
+    portfolio = SimplePortfolio(cash=0.0)
+    portfolio._apply_fill("X", 1, 2.0, 10.0, 0.0, 0.0)
+    portfolio._apply_fill("X", -1, 5.0, 10.0, 0.0, 0.0)
+    assert portfolio.positions["X"].qty == 0.0
+    assert portfolio.cash == 0.0
+
+
+def test_cancel_replace_keeps_heaps_bounded():
+    broker = SimulatedBroker()
+    ts = pd.Timestamp("2024-01-01")
+    for day in range(200):
+        broker.execute([], bar(day, 100.0))            # active l'ordre de la veille (jamais atteint)
+        for order in broker.open_orders("X"):
+            broker.cancel(order.order_id)
+        broker.submit(OrderEvent("X", ts, 1, 1.0, order_type="limit", limit_price=50.0 - day * 0.01))
+    book = broker._books["X"]
+    assert len(broker.open_orders()) == 1
+    assert len(book.buy_limit) <= 4
+
+
+def test_expired_day_orders_are_compacted():
+    broker = SimulatedBroker()
+    ts = pd.Timestamp("2024-01-01")
+    for day in range(100):
+        broker.execute([OrderEvent("X", ts, -1, 1.0, order_type="stop", stop_price=10.0, tif="day")], bar(day, 100.0))
+    assert len(broker._books["X"].sell_stop) <= 4
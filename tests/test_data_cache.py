@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.backtester.data.loaders.cached_csv_loader import CachedCSVLoader
+from src.backtester.data.loaders.feature_pipeline import FeaturePipeline, Source
+from src.backtester.data.loaders.frame_loader import FrameLoader
+from src.backtester.indicators.registry import sma
+
+
+def write_csv(path, n: int = 20_000) -> None:
+    index = pd.date_range("2000-01-01", periods=n, freq="h", name="Date")
+    pd.DataFrame({"close": np.arange(n, dtype=float)}, index=index).to_csv(path)
+
+
+def test_concurrent_cold_loads_share_one_cache(tmp_path):
+    path = tmp_path / "bars.csv"
+    write_csv(path)
+    with ThreadPoolExecutor(6) as pool:
+        frames = list(pool.map(lambda _: CachedCSVLoader(str(path)).load(), range(6)))
+
+    for df in frames:
+        pd.testing.assert_frame_equal(df, frames[0])
+    loader = CachedCSVLoader(str(path))
+    assert loader.is_fresh()
+    loader.load()
+    assert loader.last_load["hit"]
+    assert [p.name for p in tmp_path.iterdir() if p.name != "bars.csv"] == ["bars.csv.npcache"]
+
+
+def test_stale_cache_is_replaced(tmp_path):
+    path = tmp_path / "bars.csv"
+    write_csv(path, 100)
+    CachedCSVLoader(str(path)).load()
+    write_csv(path, 200)
+    loader = CachedCSVLoader(str(path))
+    assert not loader.is_fresh()
+    assert len(loader.load()) == 200
+    assert loader.is_fresh()
+
+
+def test_concurrent_feature_pipeline_loads(tmp_path):
+    index = pd.date_range("2000-01-01", periods=5_000, freq="D")
+    base = pd.DataFrame({"close": np.arange(5_000, dtype=float)}, index=index)
+
+    def load(_):
+        pipeline = FeaturePipeline(
+            Source("spx", FrameLoader(base)), features={"ma": sma(10)}, cache_dir=str(tmp_path / "cache")
+        )
+        return pipeline.load()
+
+    with ThreadPoolExecutor(6) as pool:
+        frames = list(pool.map(load, range(6)))
+
+    for df in frames:
+        np.testing.assert_array_equal(df["ma"].to_numpy(), frames[0]["ma"].to_numpy())
+    assert len(list((tmp_path / "cache").iterdir())) == 1
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from src.backtester.analytics.downsample import METHODS, LODPyramid, downsample, lttb, minmax
+
+N = 20_000
+
+
+@pytest.fixture
+def run():
+    rng = np.random.default_rng(5)
+    t = np.arange(N, dtype=np.int64) * 60_000_000_000
+    series = {"close": 100.0 + np.cumsum(rng.normal(0.0, 1.0, N)), "equity": 1e6 + np.cumsum(rng.normal(0.0, 50.0, N))}
+    keep = np.sort(rng.choice(N, 200, replace=False))      # barres avec signal ou fill
+    return t, series, keep
+
+
+@pytest.mark.parametrize("method", METHODS)
+@pytest.mark.parametrize("pyramid", [False, True])
+@pytest.mark.parametrize("bounds", [(None, None), (3_000, 9_000)])
+def test_signal_and_fill_bars_are_always_kept(run, method, pyramid, bounds):
+    t, series, keep = run
+    start, end = (None if b is None else int(t[b]) for b in bounds)
+    points = 100
+    if pyramid:
+        idx = LODPyramid.build(series, base_points=256).query(t, series, points, start, end, keep, method)
+    else:
+        idx = downsample(t, series, points, start, end, keep, method)
+
+    i0, i1 = bounds[0] or 0, N if bounds[1] is None else bounds[1] + 1
+    inside = keep[(keep >= i0) & (keep < i1)]
+    assert np.isin(inside, idx).all()
+    assert idx[0] == i0 and idx[-1] == i1 - 1
+    assert (np.diff(idx) > 0).all()
+    assert len(idx) <= points + len(inside) + 2
+
+
+def test_leading_nans_take_the_first_valid_value():
+    # warm-up d'un indicateur: NaN en tête, valeurs autour de 4000 ensuite (un 0 écraserait l'échelle)
+    y = np.r_[np.full(50, np.nan), 4000.0 + np.sin(np.arange(950) / 20.0)]
+    filled = np.r_[np.full(50, y[50]), y[50:]]
+    x = np.arange(len(y), dtype=float)
+
+    np.testing.assert_array_equal(minmax(y, 20), minmax(filled, 20))
+    np.testing.assert_array_equal(lttb(x, y, 30), lttb(x, filled, 30))
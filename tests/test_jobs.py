@@ -0,0 +1,81 @@
+import os
+from concurrent.futures import CancelledError
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import main
+from src.api.jobs import JobCancelled, JobManager, JobTimeout, QueueFull
+from src.backtester.bench.synthetic import pe_frame
+from src.backtester.io.persistence import RunStore
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs os.mkfifo")
+
+SPEC = {
+    "symbol": "X",
+    "strategy": "PERatioStrategy",
+    "loader": "CSVLoader",
+    "handler": "PERatioSingleCSVDataHandler",
+    "initial_cash": 1e6,
+}
+
+
+@pytest.fixture
+def paths(tmp_path):
+    csv = tmp_path / "pe.csv"
+    pe_frame(300).to_csv(csv)
+    hang = tmp_path / "hang.csv"
+    os.mkfifo(hang)                     # un worker qui l'ouvre bloque jusqu'à ce qu'on le tue
+    return {"csv": str(csv), "hang": str(hang), "runs": tmp_path / "runs"}
+
+
+@pytest.fixture
+def jobs(paths):
+    manager = JobManager(paths["runs"], max_workers=1, max_queue=1, grace=0.2, poll=0.05)
+    yield manager
+    manager.shutdown()
+
+
+def test_job_runs_and_stores_its_run(jobs, paths):
+    job = jobs.submit({**SPEC, "csv_path": paths["csv"]})
+    run_id = job.future.result(timeout=60)
+
+    status = jobs.status(job.id)
+    assert status["state"] == "done" and status["run_id"] == run_id
+    assert RunStore(paths["runs"]).load(run_id).meta["summary"]["n_bars"] == 300
+
+
+def test_full_queue_is_rejected_with_429(jobs, paths, monkeypatch):
+    jobs.submit({**SPEC, "csv_path": paths["hang"]})            # occupe le seul worker
+    jobs.submit({**SPEC, "csv_path": paths["csv"]})             # remplit la file
+    with pytest.raises(QueueFull):
+        jobs.submit({**SPEC, "csv_path": paths["csv"]})
+
+    monkeypatch.setattr(main, "JOBS", jobs)
+    response = TestClient(main.app).post("/jobs", params={"symbol": "X", "csv_path": paths["csv"]})
+    assert response.status_code == 429
+
+
+def test_cancel_queued_and_running_jobs(jobs, paths):
+    running = jobs.submit({**SPEC, "csv_path": paths["hang"]})
+    queued = jobs.submit({**SPEC, "csv_path": paths["csv"]})
+
+    assert jobs.cancel(queued.id)["state"] == "cancelled"
+    with pytest.raises(CancelledError):
+        queued.future.result(timeout=0)
+
+    assert jobs.status(running.id)["state"] == "running"
+    jobs.cancel(running.id)                                     # bloqué hors des points de contrôle: tué
+    with pytest.raises(JobCancelled):
+        running.future.result(timeout=30)
+    assert jobs.status(running.id)["state"] == "cancelled"
+
+
+def test_timeout_terminates_a_stuck_job(jobs, paths):
+    job = jobs.submit({**SPEC, "csv_path": paths["hang"]}, timeout=0.5)
+    with pytest.raises(JobTimeout):
+        job.future.result(timeout=30)
+    assert jobs.status(job.id)["state"] == "timeout"
+
+    after = jobs.submit({**SPEC, "csv_path": paths["csv"]})       # le worker libéré reprend la file
+    assert after.future.result(timeout=60)
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtester.bench.synthetic import pe_frame
+from src.backtester.core.engine import BacktestEngine, EngineConfig
+from src.backtester.core.events import MarketEvent
+from src.backtester.core.vectorized import VectorizedEngine, assert_matches_event_engine
+from src.backtester.data.csv_handler import PERatioSingleCSVDataHandler
+from src.backtester.data.loaders.frame_loader import FrameLoader
+from src.backtester.execution.broker_sim import SimulatedBroker
+from src.backtester.indicators.covariance import EWCovariance, RollingCovariance
+from src.backtester.indicators.registry import _BATCH, _STREAMING, IndicatorSet, IndicatorSpec, compute_batch, sma
+from src.backtester.portfolio.portfolio import SimplePortfolio
+from src.backtester.strategy.pe_ratio_strategy import PEParams, PERatioStrategy
+
+PARAMS = PEParams(hi=22.0, lo=18.0, pct=0.05)
+
+
+def event_engine(df: pd.DataFrame, config: EngineConfig | None = None) -> BacktestEngine:
+    return BacktestEngine(
+        PERatioSingleCSVDataHandler(FrameLoader(df), "X"),
+        PERatioStrategy(PARAMS, 1e6),
+        SimplePortfolio(cash=1e6),
+        SimulatedBroker(commission_per_trade=1.0, slippage_bp=5.0),
+        config=config,
+    )
+
+
+def test_vectorized_engine_matches_event_engine():
+    df = pe_frame(2_000, seed=1)
+    handler = PERatioSingleCSVDataHandler(FrameLoader(df), "X")
+    broker = SimulatedBroker(commission_per_trade=1.0, slippage_bp=5.0)
+    result = VectorizedEngine(handler.to_frame(), PERatioStrategy(PARAMS, 1e6), "X", 1e6, broker).run()
+
+    assert len(result.fills) > 0
+    assert_matches_event_engine(result, event_engine(df))
+
+
+@pytest.mark.parametrize("kind", sorted(_STREAMING))
+def test_streaming_indicators_match_batch(kind):
+    x = pd.Series(np.random.default_rng(0).normal(100.0, 5.0, 500))
+    indicator = _STREAMING[kind](20)
+    streamed = np.array([indicator.update(v) for v in x.tolist()])
+    expected = _BATCH[kind](x, 20).to_numpy()
+
+    np.testing.assert_allclose(streamed, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize("kind", sorted(_STREAMING))
+def test_indicator_set_matches_compute_batch_with_gaps_and_chains(kind):
+    x = np.random.default_rng(1).normal(100.0, 5.0, 300)
+    x[[5, 6, 40, 41, 42, 150]] = np.nan
+    index = pd.date_range("2024-01-01", periods=len(x), freq="D")
+    specs = {"raw": IndicatorSpec(kind, 5), "chained": IndicatorSpec(kind, 4, "close", sma(3))}
+    expected = compute_batch(pd.DataFrame({"close": x}, index=index), specs)
+
+    indicators = IndicatorSet()
+    for spec in specs.values():
+        indicators.register("X", spec)
+    streamed = {name: [] for name in specs}
+    for ts, v in zip(index, x.tolist()):
+        indicators.update([MarketEvent("X", ts, {"close": v})])
+        for name, spec in specs.items():
+            streamed[name].append(indicators.value("X", spec))
+
+    for name in specs:
+        np.testing.assert_allclose(
+            streamed[name], expected[name].to_numpy(), rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=name
+        )
+
+
+def test_covariance_matches_pandas():
+    x = pd.DataFrame(np.random.default_rng(0).normal(0.0, 0.01, (300, 4)), columns=list("abcd"))
+    rolling, ew = RollingCovariance(4, period=30, refresh=0), EWCovariance(4, span=20)
+    for row in x.to_numpy():
+        rolling.update(row)
+        ew.update(row)
+
+    np.testing.assert_allclose(rolling.cov(), x.iloc[-30:].cov().to_numpy(), rtol=1e-9)
+    expected = x.ewm(alpha=ew.alpha, adjust=False).cov(bias=True).loc[len(x) - 1].to_numpy()
+    np.testing.assert_allclose(ew.cov(), expected, rtol=1e-9)
+    np.testing.assert_allclose(rolling.corr(), x.iloc[-30:].corr().to_numpy(), rtol=1e-9)
+
+
+def test_snapshot_resume_matches_uninterrupted_run():
+    df = pe_frame(1_000, seed=2)
+    full = event_engine(df)
+    full.run()
+
+    first = event_engine(df)
+    for _ in range(400):
+        first.step()
+    resumed = BacktestEngine.from_snapshot(first.snapshot(), PERatioSingleCSVDataHandler(FrameLoader(df), "X"))
+    resumed.run()
+
+    assert resumed.bars == full.bars
+    assert resumed.portfolio.cash == full.portfolio.cash
+    assert resumed.portfolio.net_liquidation_value == full.portfolio.net_liquidation_value
+    assert list(resumed.portfolio.equity_curve) == list(full.portfolio.equity_curve)
+
+
+def test_profiled_run_matches_unprofiled_run():
+    df = pe_frame(1_000, seed=3)
+    plain, profiled = event_engine(df), event_engine(df, EngineConfig(profile=True))
+    plain.run()
+    profiled.run()
+
+    assert profiled.profiler.bars == plain.bars == len(df)
+    assert profiled.last_bar == plain.last_bar
+    assert list(profiled.portfolio.equity_curve) == list(plain.portfolio.equity_curve)
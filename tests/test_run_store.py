@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from src.backtester.bench.synthetic import pe_frame
+from src.backtester.core.engine import BacktestEngine
+from src.backtester.data.csv_handler import PERatioSingleCSVDataHandler
+from src.backtester.data.loaders.frame_loader import FrameLoader
+from src.backtester.execution.broker_sim import SimulatedBroker
+from src.backtester.io.logger import RunLogger
+from src.backtester.io.persistence import RunStore
+from src.backtester.portfolio.portfolio import SimplePortfolio
+from src.backtester.strategy.pe_ratio_strategy import PEParams, PERatioStrategy
+
+
+def engine() -> BacktestEngine:
+    return BacktestEngine(
+        PERatioSingleCSVDataHandler(FrameLoader(pe_frame(500, seed=4)), "X"),
+        PERatioStrategy(PEParams(hi=22.0, lo=18.0, pct=0.05), 1e6),
+        SimplePortfolio(cash=1e6),
+        SimulatedBroker(commission_per_trade=1.0, slippage_bp=5.0),
+    )
+
+
+def tables(equity: list[float]) -> dict[str, dict[str, np.ndarray]]:
+    equity = np.asarray(equity, dtype=float)
+    return {"bars": {"t": np.arange(len(equity), dtype=np.int64), "close": equity, "equity": equity}}
+
+
+def test_record_then_load_with_mmap(tmp_path):
+    store = RunStore(tmp_path)
+    run_id = store.record(engine(), {"name": "pe"})
+    expected = RunLogger().run(engine()).arrays()
+
+    run = store.load(run_id)
+    assert isinstance(run.equity, np.memmap)
+    for table, cols in expected.items():
+        for col, values in cols.items():
+            np.testing.assert_array_equal(run.tables[table][col], values)
+    assert len(run.tables["fills"]["idx"]) > 0
+    assert set(run.tables["fills"]["idx"].tolist()) <= set(run.keep_indices().tolist())
+    assert run.meta["summary"]["final_equity"] == expected["bars"]["equity"][-1]
+
+    only_bars = store.load(run_id, mmap=False, tables=["bars"])
+    assert list(only_bars.tables) == ["bars"]
+    assert not isinstance(only_bars.equity, np.memmap)
+    with pytest.raises(KeyError):
+        store.load("missing")
+
+
+def test_query_sorts_and_filters_on_the_index(tmp_path):
+    store = RunStore(tmp_path)
+    ids = {final: store.save(tables([100.0, 100.0 + final / 2, 100.0 + final]), {"final": final}) for final in (5, 20, 10)}
+
+    assert [r["run_id"] for r in store.query("final_equity")] == [ids[20], ids[10], ids[5]]
+    assert [r["run_id"] for r in store.query("final_equity", top=1, ascending=True)] == [ids[5]]
+    assert [r["run_id"] for r in store.query("final_equity", where=lambda r: r["spec"]["final"] < 20)] == [ids[10], ids[5]]
+
+
+def test_compact_and_reindex(tmp_path):
+    store = RunStore(tmp_path)
+    ids = [store.save(tables([100.0, 100.0 + k]), {"k": k}) for k in range(3)]
+    index = tmp_path / "index.ndjson"
+
+    store.delete(ids[1])
+    assert [r["run_id"] for r in store.index()] == [ids[0], ids[2]]    # filtré à la lecture
+    assert len(index.read_text().splitlines()) == 3
+    assert store.compact() == 2
+    assert len(index.read_text().splitlines()) == 2
+
+    index.unlink()
+    assert store.query("final_equity") == []
+    assert store.reindex() == 2
+    assert [r["run_id"] for r in store.query("final_equity")] == [ids[2], ids[0]]
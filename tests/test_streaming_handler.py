@@ -0,0 +1,30 @@
+import pandas as pd
+import pytest
+
+from src.backtester.bench.synthetic import write_synthetic_csv
+from src.backtester.data.loaders.chunked_csv_loader import ChunkedCSVLoader
+from src.backtester.data.streaming_handler import StreamingDataHandler
+
+
+def drain(handler: StreamingDataHandler) -> list[list]:
+    bars = []
+    while handler.has_next():
+        bars.append(handler.get_next())
+    return bars
+
+
+# 3 symboles par timestamp: 4 et 5 lignes par bloc coupent les groupes, 3 tombe juste, 1 coupe tout
+@pytest.mark.parametrize("chunk_rows", [1, 3, 4, 5, 1000])
+@pytest.mark.parametrize("prefetch", [0, 1])
+def test_timestamps_straddling_chunks_are_grouped(tmp_path, chunk_rows, prefetch):
+    path = write_synthetic_csv(tmp_path / "long.csv", n_symbols=3, n_bars=10)
+    expected = pd.read_csv(path, parse_dates=["Date"])
+    loader = ChunkedCSVLoader(str(path), chunk_rows=chunk_rows, prefetch=prefetch)
+
+    bars = drain(StreamingDataHandler(loader, symbol_col="symbol", fields=["close"]))
+
+    assert len(bars) == 10
+    for bar, (ts, rows) in zip(bars, expected.groupby("Date", sort=True)):
+        assert [e.timestamp for e in bar] == [ts] * 3
+        assert [e.symbol for e in bar] == rows["symbol"].tolist()
+        assert [e.data["close"] for e in bar] == pytest.approx(rows["close"].tolist())